@@ -1,11 +1,25 @@
 # inventory_management/inventory/admin.py
 
 from django.contrib import admin
+from . import pagecache
 # Make sure to import Location, InventoryItem, Project, and the new InventoryLog
-from .models import Location, InventoryItem, Project, InventoryLog
+from .models import Location, InventoryItem, Project, InventoryLog, ItemChange
+
+
+class InventoryLogAdmin(admin.ModelAdmin):
+    # Deleted log rows don't invalidate cached pages one by one (see signals.py); do it once.
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        pagecache.invalidate()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        pagecache.invalidate()
+
 
 # Register your models here.
 admin.site.register(Location)
 admin.site.register(InventoryItem)
 admin.site.register(Project)
-admin.site.register(InventoryLog)  # <--- THIS IS THE CORRECTION: Register the new log model
\ No newline at end of file
+admin.site.register(InventoryLog, InventoryLogAdmin)  # <--- THIS IS THE CORRECTION: Register the new log model
+admin.site.register(ItemChange)
\ No newline at end of file
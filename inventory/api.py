@@ -0,0 +1,394 @@
+# inventory_management/inventory/api.py
+#
+# Read-only JSON API for scanners and scripts:
+#
+#   GET api/items/  api/locations/  api/projects/  api/logs/
+#
+#   ?fields=uid_no,status,location   sparse fieldset (defaults to each resource's DEFAULT_FIELDS)
+#   ?ids=3,7,9  (items also ?uids=LAP-2501-0001,...)   bulk fetch, answered in request order with
+#                                                     a "not_found" list; no pagination
+#   ?cursor=...&limit=100&ordering=-updated_at         cursor-paginated listing otherwise
+#   plus per-resource filters (items: category, status, location, project, updated_since;
+#   logs: item, uid_no, action, since, until)
+#
+# Rows are serialised straight from .values(), with the joined names (location, project, user)
+# selected by the same query: no model instances and no templates.
+#
+#   GET/POST api/status/   batch status check for barcode scanners (see uidstatus.py):
+#   ?uids=A,B,C or a JSON body {"uids": [...]}  ->  {"items": {"A": {"status": ..., "location": ...,
+#   "project": ...}, "B": null}, "found": 1, "not_found": 1}; up to INVENTORY_UID_STATUS MAX_UIDS.
+#
+#   GET api/dashboard/   the dashboard's item list (see DashboardListing)
+#
+# Each of these has an async twin under api/async/ (see asyncapi.py) for ASGI deployments.
+
+import json
+from urllib.parse import urlencode
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+
+from . import search, uidstatus
+from .forms import InventoryFilterForm
+from .models import InventoryItem, InventoryLog, Location, Project
+from .pagination import InvalidCursor, KeysetPaginator, LookaheadPage
+from .querybudget import query_budget
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BULK = 500
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _int_list(value, name):
+    try:
+        return [int(part) for part in _split(value)]
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a comma-separated list of integers.")
+
+
+def _datetime(value, name):
+    """Parses an ISO 8601 datetime; one without an offset is taken in the current time zone."""
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:  # well-formed but impossible, e.g. 2025-13-01T00:00
+        parsed = None
+    if parsed is None:
+        raise BadRequest(f"'{name}' must be an ISO 8601 datetime.")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Resource:
+    model = None
+    # API field name -> .values() lookup
+    FIELDS = {}
+    DEFAULT_FIELDS = ()
+    # Orderings the paginator can seek on through a (column, id) index; the first is the default.
+    ORDERINGS = ('id',)
+    # Bulk lookup parameter -> model field
+    LOOKUPS = {'ids': 'id'}
+
+    def queryset(self):
+        return self.model.objects.all()
+
+    def filter(self, queryset, params):
+        return queryset
+
+    def parse_lookup(self, param, value):
+        if self.LOOKUPS[param] == 'id':
+            return _int_list(value, param)
+        return _split(value)
+
+
+class ItemResource(Resource):
+    model = InventoryItem
+    FIELDS = {
+        'id': 'id', 'uid_no': 'uid_no', 'item_name': 'item_name', 'category': 'category', 'status': 'status',
+        'serial_number': 'serial_number', 'quantity': 'quantity', 'description': 'description',
+        'location_id': 'location_id', 'location': 'location__name',
+        'project_id': 'project_id', 'project': 'project__name',
+        'cpu': 'cpu', 'gpu': 'gpu', 'os': 'os', 'installed_software': 'installed_software',
+        'created_at': 'created_at', 'updated_at': 'updated_at', 'version': 'version',
+    }
+    DEFAULT_FIELDS = ('id', 'uid_no', 'item_name', 'category', 'status', 'location', 'project', 'quantity')
+    ORDERINGS = ('item_name', '-item_name', 'id', 'category', 'status', 'created_at', '-created_at',
+                 'updated_at', '-updated_at')
+    LOOKUPS = {'ids': 'id', 'uids': 'uid_no'}
+
+    def filter(self, queryset, params):
+        for name in ('category', 'status'):
+            if params.get(name):
+                queryset = queryset.filter(**{name: params[name]})
+        for name in ('location', 'project'):
+            if params.get(name):
+                queryset = queryset.filter(**{f'{name}_id__in': _int_list(params[name], name)})
+        if params.get('updated_since'):
+            queryset = queryset.filter(updated_at__gte=_datetime(params['updated_since'], 'updated_since'))
+        return queryset
+
+
+class LocationResource(Resource):
+    model = Location
+    FIELDS = {'id': 'id', 'name': 'name', 'description': 'description'}
+    DEFAULT_FIELDS = ('id', 'name')
+    ORDERINGS = ('name', 'id')
+
+
+class ProjectResource(LocationResource):
+    model = Project
+
+
+class LogResource(Resource):
+    model = InventoryLog
+    FIELDS = {
+        'id': 'id', 'timestamp': 'timestamp', 'action': 'action', 'uid_no': 'uid_no', 'item_id': 'item_id',
+        'item_name': 'item__item_name', 'user': 'user__username', 'details': 'details',
+        'old_value': 'old_value', 'new_value': 'new_value',
+    }
+    DEFAULT_FIELDS = ('id', 'timestamp', 'action', 'uid_no', 'item_id', 'user', 'details')
+    ORDERINGS = ('-timestamp', 'timestamp', 'id')
+
+    def filter(self, queryset, params):
+        if params.get('item'):
+            queryset = queryset.filter(item_id__in=_int_list(params['item'], 'item'))
+        if params.get('uid_no'):
+            queryset = queryset.filter(uid_no=params['uid_no'])
+        if params.get('action'):
+            queryset = queryset.filter(action__in=_split(params['action']))
+        if params.get('since'):
+            queryset = queryset.filter(timestamp__gte=_datetime(params['since'], 'since'))
+        if params.get('until'):
+            queryset = queryset.filter(timestamp__lt=_datetime(params['until'], 'until'))
+        return queryset
+
+
+def _select(resource, params):
+    """(requested API field names, .values() lookups to select)."""
+    names = _split(params.get('fields')) or list(resource.DEFAULT_FIELDS)
+    unknown = [name for name in names if name not in resource.FIELDS]
+    if unknown:
+        raise BadRequest(f"Unknown field(s) {', '.join(unknown)}; available: {', '.join(resource.FIELDS)}.")
+    return names, [resource.FIELDS[name] for name in names]
+
+
+def _rows(queryset, names, lookups):
+    """values() rows renamed to the API field names (location__name -> location)."""
+    for row in queryset:
+        yield {name: row[lookup] for name, lookup in zip(names, lookups)}
+
+
+def _limit(params):
+    try:
+        limit = min(int(params.get('limit') or DEFAULT_LIMIT), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest("'limit' must be an integer.")
+    if limit < 1:
+        raise BadRequest("'limit' must be at least 1.")
+    return limit
+
+
+def _plan(params, resource):
+    """
+    Validates `params` and builds the (still unevaluated) query. Returns (names, lookups, bulk,
+    listing): bulk is (lookup field, keys, queryset) for ?ids=/?uids= requests, else None, and
+    listing is (KeysetPaginator, cursor). Shared by the sync views and their async twins.
+    """
+    names, lookups = _select(resource, params)
+    queryset = resource.filter(resource.queryset(), params)
+
+    bulk = [param for param in resource.LOOKUPS if params.get(param)]
+    if len(bulk) > 1:
+        raise BadRequest(f"Use only one of {', '.join(bulk)}.")
+    if bulk:
+        param = bulk[0]
+        field = resource.LOOKUPS[param]
+        keys = list(dict.fromkeys(resource.parse_lookup(param, params[param])))
+        if len(keys) > MAX_BULK:
+            raise BadRequest(f"At most {MAX_BULK} values per '{param}' request.")
+        # The lookup key is selected even if not requested, to put rows back in request order.
+        return names, lookups, (field, keys, queryset.filter(**{f'{field}__in': keys}).values(*lookups, field)), None
+
+    ordering = params.get('ordering') or resource.ORDERINGS[0]
+    if ordering not in resource.ORDERINGS:
+        raise BadRequest(f"'ordering' must be one of {', '.join(resource.ORDERINGS)}.")
+    limit = _limit(params)
+
+    # The paginator builds cursors from the sort column and id, so both are always selected.
+    paginator = KeysetPaginator(queryset.values(*lookups, ordering.lstrip('-'), 'id'), limit, ordering)
+    return names, lookups, None, (paginator, params.get('cursor'))
+
+
+def _bulk_result(names, lookups, field, keys, rows):
+    found = {row[field]: row for row in rows}
+    return {
+        'results': [{name: found[key][lookup] for name, lookup in zip(names, lookups)}
+                    for key in keys if key in found],
+        'not_found': [key for key in keys if key not in found],
+    }
+
+
+def _page_result(names, lookups, page):
+    return {
+        'results': list(_rows(page, names, lookups)),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def _serve(params, resource):
+    names, lookups, bulk, listing = _plan(params, resource)
+    if bulk:
+        field, keys, queryset = bulk
+        return _bulk_result(names, lookups, field, keys, list(queryset))
+    paginator, cursor = listing
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor as e:
+        raise BadRequest(str(e))
+    return _page_result(names, lookups, page)
+
+
+def _respond(request, resource):
+    # Scripts get 401/400 as JSON rather than a login redirect or an HTML error page.
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    try:
+        return JsonResponse(_serve(request.GET, resource))
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+class DashboardListing:
+    """
+    The dashboard's item list as JSON: ?search= (ranked full-text search), ?sort= (one of the
+    dashboard's sort choices), ?limit=, and the 'next'/'previous' query strings of the response.
+    Keyset pages like the dashboard, except relevance-ranked results, which use numbered pages.
+    """
+    FIELDS = ('id', 'uid_no', 'item_name', 'category', 'status', 'quantity', 'location', 'project', 'updated_at',
+              'version')
+    SORTS = [value for value, _ in InventoryFilterForm.SORT_CHOICES if value]
+
+    def __init__(self, params):
+        search_query = params.get('search', '').strip()
+        sort = params.get('sort', '')
+        if sort and sort not in self.SORTS:
+            raise BadRequest(f"'sort' must be one of {', '.join(self.SORTS)}.")
+        self.limit = _limit(params)
+        self.base = {key: value for key, value in (('search', search_query), ('sort', sort),
+                                                   ('limit', params.get('limit'))) if value}
+        self.lookups = [ItemResource.FIELDS[name] for name in self.FIELDS]
+
+        items = InventoryItem.objects.all()
+        if search_query:
+            items = search.search(items, search_query)
+        if search_query and not sort:
+            self.paginator = None
+            self.queryset = items.values(*self.lookups)
+            try:
+                self.number = int(params.get('page', 1))
+            except ValueError:
+                raise BadRequest("'page' must be an integer.")
+        else:
+            ordering = sort or 'item_name'
+            self.paginator = KeysetPaginator(items.values(*self.lookups, ordering.lstrip('-')), self.limit, ordering)
+            self.cursor = params.get('cursor')
+
+    def _result(self, page):
+        if self.paginator:
+            next_params = {**self.base, 'cursor': page.next_cursor}
+            previous_params = {**self.base, 'cursor': page.previous_cursor}
+        else:
+            next_params = {**self.base, 'page': page.number + 1}
+            previous_params = {**self.base, 'page': page.number - 1}
+        return {
+            'results': list(_rows(page, self.FIELDS, self.lookups)),
+            'next': urlencode(next_params) if page.has_next else None,
+            'previous': urlencode(previous_params) if page.has_previous else None,
+        }
+
+    def serve(self):
+        if not self.paginator:
+            return self._result(LookaheadPage(self.queryset, self.number, self.limit))
+        try:
+            return self._result(self.paginator.page(self.cursor))
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+
+    async def aserve(self):
+        if not self.paginator:
+            return self._result(await LookaheadPage.afetch(self.queryset, self.number, self.limit))
+        try:
+            return self._result(await self.paginator.apage(self.cursor))
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+
+
+ITEMS = ItemResource()
+LOCATIONS = LocationResource()
+PROJECTS = ProjectResource()
+LOGS = LogResource()
+
+
+@query_budget(4)  # session + user + one SELECT
+@require_GET
+def items(request):
+    return _respond(request, ITEMS)
+
+
+@query_budget(4)
+@require_GET
+def locations(request):
+    return _respond(request, LOCATIONS)
+
+
+@query_budget(4)
+@require_GET
+def projects(request):
+    return _respond(request, PROJECTS)
+
+
+@query_budget(4)
+@require_GET
+def logs(request):
+    return _respond(request, LOGS)
+
+
+@query_budget(4)
+@require_GET
+def dashboard(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    try:
+        return JsonResponse(DashboardListing(request.GET).serve())
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+def _status_uids(request):
+    if request.method == 'POST':
+        try:
+            uids = json.loads(request.body or b'{}').get('uids')
+        except (ValueError, AttributeError):
+            raise BadRequest("The body must be a JSON object with a 'uids' list.")
+        if not isinstance(uids, list) or not all(isinstance(uid, str) for uid in uids):
+            raise BadRequest("'uids' must be a list of strings.")
+        uids = [uid.strip() for uid in uids if uid.strip()]
+    else:
+        uids = _split(request.GET.get('uids'))
+    uids = list(dict.fromkeys(uids))
+    if not uids:
+        raise BadRequest("Pass at least one UID in 'uids'.")
+    limit = uidstatus.get_config()['MAX_UIDS']
+    if len(uids) > limit:
+        raise BadRequest(f"At most {limit} UIDs per request.")
+    return uids
+
+
+# Read-only, so scanners may POST long UID lists without a CSRF token.
+@csrf_exempt
+@query_budget(7)  # session + user + generation + one IN query + refdata check (and reload)
+@require_http_methods(['GET', 'POST'])
+def status(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    try:
+        uids = _status_uids(request)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _status_response(uidstatus.resolve(uids))
+
+
+def _status_response(items):
+    found = sum(1 for entry in items.values() if entry is not None)
+    return JsonResponse({'items': items, 'found': found, 'not_found': len(items) - found},
+                        json_dumps_params={'separators': (',', ':')})
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401  (connects the model signal handlers)
+        from .sqlite import apply_profile
+
+        connection_created.connect(apply_profile, dispatch_uid='inventory.sqlite.apply_profile')
@@ -0,0 +1,196 @@
+# inventory_management/inventory/archive.py
+#
+# Moves InventoryLog rows older than a retention window out of the database into one gzip JSONL
+# file per month, keeping the hot table small while the full history stays searchable.
+# Configured by settings.INVENTORY_LOG_ARCHIVE:
+#
+#   'DIRECTORY':      where the monthly files are written (logs-YYYY-MM.jsonl.gz)
+#   'RETENTION_DAYS': rows older than this many days are archived
+#   'BATCH_SIZE':     rows moved per transaction; each batch holds the write lock only briefly
+#   'PAUSE':          seconds to sleep between batches, letting other writers in
+#
+# Each batch is appended to its month's file as a new gzip member (gzip readers concatenate
+# members), fsync'ed, and only then deleted from the table in the same transaction that records
+# the new file length in the LogArchive manifest. A crash between the two leaves bytes past the
+# recorded length: readers ignore them and the next run truncates them, so nothing is lost or
+# read twice. Run one archiver at a time. ItemChange rows outlive their archived log entry.
+
+import gzip
+import io
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+DEFAULTS = {
+    'DIRECTORY': os.path.join(settings.BASE_DIR, 'log_archive'),
+    'RETENTION_DAYS': 365,
+    'BATCH_SIZE': 500,
+    'PAUSE': 0.0,
+}
+# .values() lookups written for each entry, and the names they're stored under.
+FIELDS = {
+    'id': 'id', 'timestamp': 'timestamp', 'action': 'action', 'uid_no': 'uid_no',
+    'item_id': 'item_id', 'item_name': 'item__item_name', 'user_id': 'user_id', 'user': 'user__username',
+    'details': 'details', 'old_value': 'old_value', 'new_value': 'new_value',
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_LOG_ARCHIVE', {})}
+
+
+def month_of(moment):
+    moment = moment.astimezone(dt_timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def file_name_for(month):
+    return f'logs-{month:%Y-%m}.jsonl.gz'
+
+
+def _path(file_name):
+    return os.path.join(get_config()['DIRECTORY'], file_name)
+
+
+def archive_logs(before=None, batch_size=None, pause=None, progress=None):
+    """
+    Archives every InventoryLog row with a timestamp before `before` (default: the retention
+    window). Returns {month: rows archived}. `progress(month, rows)` is called after each batch.
+    """
+    from .models import InventoryLog
+
+    config = get_config()
+    if before is None:
+        before = timezone.now() - timedelta(days=config['RETENTION_DAYS'])
+    batch_size = batch_size or config['BATCH_SIZE']
+    pause = config['PAUSE'] if pause is None else pause
+    os.makedirs(config['DIRECTORY'], exist_ok=True)
+
+    archived = {}
+    old_logs = (InventoryLog.objects.filter(timestamp__lt=before).order_by('timestamp', 'id')
+                .values(*FIELDS.values()))
+    while True:
+        rows = list(old_logs[:batch_size])
+        if not rows:
+            return archived
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(month_of(row['timestamp']), []).append(row)
+        for month, month_rows in by_month.items():
+            _archive_batch(month, month_rows)
+            archived[month] = archived.get(month, 0) + len(month_rows)
+            if progress:
+                progress(month, len(month_rows))
+        if pause:
+            time.sleep(pause)
+
+
+def _archive_batch(month, rows):
+    from . import pagecache
+    from .models import InventoryLog, ItemChange, LogArchive
+
+    archive = LogArchive.objects.filter(month=month).first() or LogArchive(month=month, file_name=file_name_for(month))
+    logs = [{name: _jsonable(row[lookup]) for name, lookup in FIELDS.items()} for row in rows]
+    size = _append(archive, logs)
+
+    ids = [row['id'] for row in rows]
+    with transaction.atomic():
+        # One UPDATE and one DELETE per batch. QuerySet.delete() would collect the rows and send
+        # post_delete for each; the only thing it would do besides is ItemChange.log's SET_NULL.
+        ItemChange.objects.filter(log_id__in=ids).update(log=None)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {InventoryLog._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                           ids)
+        # Item pages list the item's log entries (see signals.invalidate_cached_item_pages).
+        if any(row['item_id'] or row['uid_no'] for row in rows):
+            pagecache.invalidate()
+        first, last = rows[0]['timestamp'], rows[-1]['timestamp']
+        archive.rows += len(rows)
+        archive.size = size
+        archive.first_timestamp = min(archive.first_timestamp or first, first)
+        archive.last_timestamp = max(archive.last_timestamp or last, last)
+        archive.save()
+
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _append(archive, logs):
+    """Writes `logs` as a new gzip member after the committed part of the file; returns its new length."""
+    path = _path(archive.file_name)
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as raw:
+        raw.truncate(archive.size)  # drops what an interrupted run wrote but never committed
+        raw.seek(archive.size)
+        with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as member:
+            for log in logs:
+                member.write(json.dumps(log, separators=(',', ':')).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+        return raw.tell()
+
+
+class _CommittedPart(io.RawIOBase):
+    """The first `size` bytes of a file."""
+
+    def __init__(self, raw, size):
+        self.raw = raw
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer)[:self.remaining]
+        count = self.raw.readinto(view) if len(view) else 0
+        self.remaining -= count
+        return count
+
+
+def iter_month(archive):
+    """Every entry of one LogArchive month in the order archived, with 'timestamp' as a datetime."""
+    try:
+        raw = open(_path(archive.file_name), 'rb')
+    except FileNotFoundError:
+        return
+    with raw, gzip.GzipFile(fileobj=io.BufferedReader(_CommittedPart(raw, archive.size))) as lines:
+        for line in lines:
+            log = json.loads(line)
+            log['timestamp'] = datetime.fromisoformat(log['timestamp'])
+            yield log
+
+
+def read(uid_no=None, since=None, until=None, action=None, user=None, item=None, limit=None):
+    """
+    Archived log entries matching every given filter, newest first. `since`/`until` bound the
+    timestamp (until is exclusive) and also decide which monthly files are opened at all.
+    """
+    from .models import LogArchive
+
+    months = LogArchive.objects.order_by('-month')
+    if since:
+        months = months.filter(last_timestamp__gte=since)
+    if until:
+        months = months.filter(first_timestamp__lt=until)
+
+    results = []
+    for archive in months:
+        matches = [
+            log for log in iter_month(archive)
+            if (uid_no is None or log['uid_no'] == uid_no)
+            and (action is None or log['action'] == action)
+            and (user is None or log['user'] == user)
+            and (item is None or log['item_id'] == item)
+            and (since is None or log['timestamp'] >= since)
+            and (until is None or log['timestamp'] < until)
+        ]
+        matches.sort(key=lambda log: (log['timestamp'], log['id']), reverse=True)
+        results.extend(matches)
+        if limit is not None and len(results) >= limit:
+            return results[:limit]
+    return results
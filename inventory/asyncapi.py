@@ -0,0 +1,96 @@
+# inventory_management/inventory/asyncapi.py
+#
+# Async twins of the read-heavy JSON endpoints in api.py, for ASGI deployments (see
+# inventory_management/asgi.py): under an ASGI server a request waiting on a slow scanner or
+# on the database is a suspended coroutine rather than a busy worker, so a few processes can
+# hold hundreds of connections.
+#
+#   GET api/async/items/  api/async/logs/  api/async/dashboard/  GET/POST api/async/status/
+#
+# Parameters and responses are exactly those of the sync views; the queries are built by the
+# same api.py code and only evaluated here through the async ORM. Under WSGI these views still
+# work, but each call spins up an event loop: keep WSGI clients on the sync endpoints.
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from . import api, uidstatus
+from .api import BadRequest
+from .pagination import InvalidCursor
+from .querybudget import query_budget
+
+
+def _require(*methods):
+    # Django 4.2's require_http_methods/csrf_exempt wrap views in sync functions, which would hide
+    # the coroutine from the handler; this does the method check inside the coroutine instead.
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _authenticated(request):
+    # request.user is loaded lazily from the session; Django 4.2 has no request.auser().
+    return await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+async def _serve(params, resource):
+    names, lookups, bulk, listing = api._plan(params, resource)
+    if bulk:
+        field, keys, queryset = bulk
+        return api._bulk_result(names, lookups, field, keys, [row async for row in queryset])
+    paginator, cursor = listing
+    try:
+        page = await paginator.apage(cursor)
+    except InvalidCursor as e:
+        raise BadRequest(str(e))
+    return api._page_result(names, lookups, page)
+
+
+async def _respond(request, serve):
+    if not await _authenticated(request):
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    try:
+        return JsonResponse(await serve())
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@query_budget(4)  # session + user + one SELECT
+@_require('GET')
+async def items(request):
+    return await _respond(request, lambda: _serve(request.GET, api.ITEMS))
+
+
+@query_budget(4)
+@_require('GET')
+async def logs(request):
+    return await _respond(request, lambda: _serve(request.GET, api.LOGS))
+
+
+@query_budget(4)
+@_require('GET')
+async def dashboard(request):
+    return await _respond(request, lambda: api.DashboardListing(request.GET).aserve())
+
+
+@query_budget(7)  # session + user + generation + one IN query + refdata check (and reload)
+@_require('GET', 'POST')
+async def status(request):
+    if not await _authenticated(request):
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    try:
+        uids = api._status_uids(request)
+    except BadRequest as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return api._status_response(await uidstatus.aresolve(uids))
+
+
+# Read-only, so scanners may POST long UID lists without a CSRF token (set directly: see _require).
+status.csrf_exempt = True
@@ -0,0 +1,167 @@
+# inventory_management/inventory/disposals.py
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import pagecache, search, summary
+from .models import InventoryItem, InventoryLog, ItemChange, supports_update_returning
+
+NO_REASON = 'No reason provided'
+# UIDs per guarded UPDATE: each takes five parameters, and SQLite allows 999 per statement.
+_UPDATE_CHUNK = 150
+_DELETE_CHUNK = 500
+
+
+def _as_quantity(value):
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        return None
+    return quantity if quantity > 0 else None
+
+
+def _decrement(requested, now):
+    """
+    Subtracts each UID's quantity where at least that much is left and returns the set of UIDs
+    whose row the database changed. One `UPDATE ... RETURNING uid_no` per _UPDATE_CHUNK UIDs;
+    without RETURNING, one guarded UPDATE per UID, whose row count tells the same.
+    """
+    if not supports_update_returning(connection):
+        return {
+            uid for uid, (quantity, _) in requested.items()
+            if InventoryItem.objects.filter(uid_no=uid, quantity__gte=quantity).update(
+                quantity=F('quantity') - quantity, updated_at=now, version=F('version') + 1)
+        }
+
+    quote = connection.ops.quote_name
+    table = quote(InventoryItem._meta.db_table)
+    uid_no, quantity, updated_at, version = map(quote, ('uid_no', 'quantity', 'updated_at', 'version'))
+    updated_at_value = InventoryItem._meta.get_field('updated_at').get_db_prep_value(now, connection)
+    decremented = set()
+    uids = list(requested)
+    with connection.cursor() as cursor:
+        for start in range(0, len(uids), _UPDATE_CHUNK):
+            chunk = uids[start:start + _UPDATE_CHUNK]
+            # One CASE for the amount, used in both SET and WHERE: an OR of one guard per UID
+            # would nest past SQLite's expression depth limit on large batches.
+            amount = f"CASE {uid_no} {' '.join(['WHEN %s THEN %s'] * len(chunk))} END"
+            amounts = [value for uid in chunk for value in (uid, requested[uid][0])]
+            cursor.execute(
+                f"UPDATE {table} SET {quantity} = {quantity} - {amount}, {updated_at} = %s, "
+                f"{version} = {version} + 1 "
+                f"WHERE {uid_no} IN ({', '.join(['%s'] * len(chunk))}) AND {quantity} >= {amount} "
+                f"RETURNING {uid_no}",
+                [*amounts, updated_at_value, *chunk, *amounts],
+            )
+            decremented.update(row[0] for row in cursor.fetchall())
+    return decremented
+
+
+def dispose_items(entries, user=None):
+    """
+    Removes quantities from a batch of items without reading them into Python first: guarded
+    UPDATEs (`quantity = quantity - n WHERE quantity >= n` per UID) that return the UIDs they
+    changed, one SELECT of the results, one DELETE (plus two UPDATEs unlinking their history) for
+    the items that reached zero and one bulk insert each for the log entries and their ItemChange
+    rows. Two concurrent disposals of the same item can't both succeed past what is in stock.
+
+    `entries` are dicts with 'uid_no', 'quantity' and optional 'reason'. Returns (disposed
+    entries as {'uid_no', 'item_name', 'quantity', 'remaining', 'details'}, failed entries as
+    {'uid_no', 'reason'}); items disposed down to zero are deleted and have 'remaining' 0.
+    'details' is the text of the entry's log record.
+    """
+    failed = []
+    requested = {}  # uid -> (quantity, reason)
+    for entry in entries:
+        uid = (entry.get('uid_no') or '').strip()
+        quantity = _as_quantity(entry.get('quantity'))
+        if not uid:
+            failed.append({'uid_no': uid, 'reason': 'Missing UID.'})
+        elif quantity is None:
+            failed.append({'uid_no': uid, 'reason': f"Invalid quantity {entry.get('quantity')!r}."})
+        elif uid in requested:
+            failed.append({'uid_no': uid, 'reason': 'UID listed more than once in this disposal.'})
+        else:
+            requested[uid] = (quantity, (entry.get('reason') or '').strip() or NO_REASON)
+
+    if not requested:
+        return [], failed
+
+    with transaction.atomic():
+        # The guard is checked by the database against the current row, and the UPDATE holds the
+        # row (or, on SQLite, the database) until commit, so no other writer can interleave.
+        decremented = _decrement(requested, timezone.now())
+        items = {
+            item.uid_no: item for item in InventoryItem.objects.filter(uid_no__in=list(requested)).only(
+                'id', 'item_name', 'uid_no', *InventoryItem.SUMMARY_FIELDS
+            ).order_by()
+        }
+
+        counters = summary.SummaryDelta()
+        logs = []
+        log_changes = []
+        disposed = []
+        consumed = []
+        for uid, (quantity, reason) in requested.items():
+            item = items.get(uid)
+            if item is None:
+                failed.append({'uid_no': uid, 'reason': f'Item with UID "{uid}" not found.'})
+                continue
+            if uid not in decremented:
+                failed.append({'uid_no': uid, 'reason': (f"Cannot delete {quantity} of item {uid}. "
+                                                         f"Only {item.quantity} available.")})
+                continue
+
+            original = item.quantity + quantity
+            old_state = {**item.summary_state(), 'quantity': original}
+            if item.quantity == 0:
+                consumed.append(item.pk)
+                counters.add(old_state, -1)
+                logs.append(InventoryLog(
+                    user=user if user and user.is_authenticated else None,
+                    uid_no=uid,
+                    action='deleted',
+                    details=(f"Item '{item.item_name}' (UID: {uid}) fully deleted. "
+                             f"Original Quantity: {original}. Reason: {reason}."),
+                ))
+            else:
+                counters.change(old_state, item.summary_state())
+                logs.append(InventoryLog(
+                    user=user if user and user.is_authenticated else None,
+                    item=item,
+                    uid_no=uid,
+                    action='quantity_reduced',
+                    details=(f"Reduced quantity of '{item.item_name}' (UID: {uid}) by {quantity}. "
+                             f"New quantity: {item.quantity}. Reason: {reason}."),
+                ))
+            log_changes.append([('quantity', original, item.quantity)])
+            disposed.append({'uid_no': uid, 'item_name': item.item_name, 'quantity': quantity,
+                             'remaining': item.quantity, 'details': logs[-1].details})
+
+        if consumed:
+            # Deleting through the ORM would fetch the rows again and send post_delete per item.
+            # This DELETE bypasses signals.unindex_deleted_item, uncount_deleted_item and
+            # invalidate_cached_pages: their work is the remove_items() call here, the SummaryDelta
+            # applied below and the single pagecache.invalidate(). The SET_NULL references are
+            # cleared by hand first.
+            ItemChange.objects.filter(item_id__in=consumed).update(item=None)
+            InventoryLog.objects.filter(item_id__in=consumed).update(item=None)
+            with connection.cursor() as cursor:
+                for start in range(0, len(consumed), _DELETE_CHUNK):
+                    chunk = consumed[start:start + _DELETE_CHUNK]
+                    cursor.execute(f"DELETE FROM {InventoryItem._meta.db_table} "
+                                   f"WHERE id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+            search.remove_items(consumed)
+
+        # Written with the disposal rather than through logsink, so they commit or roll back together.
+        InventoryLog.objects.bulk_create(logs, batch_size=500)
+        ItemChange.objects.bulk_create(
+            [change for log, changes in zip(logs, log_changes) for change in ItemChange.for_log(log, changes)],
+            batch_size=500,
+        )
+        counters.apply()
+        if disposed:
+            pagecache.invalidate()
+
+    return disposed, failed
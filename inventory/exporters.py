@@ -0,0 +1,120 @@
+# inventory_management/inventory/exporters.py
+
+import csv
+import json
+import tempfile
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+# Export column key -> (header, values_list lookup). Dict order is the default column order.
+EXPORT_COLUMNS = {
+    'item_name': ("Item Name", 'item_name'),
+    'uid_no': ("UID No", 'uid_no'),
+    'category': ("Category", 'category'),
+    'serial_number': ("Serial Number", 'serial_number'),
+    'quantity': ("Quantity", 'quantity'),
+    'location': ("Location", 'location__name'),
+    'status': ("Status", 'status'),
+    'description': ("Description", 'description'),
+    'project': ("Project", 'project__name'),
+    'created_at': ("Date Added", 'created_at'),
+    'updated_at': ("Last Modified", 'updated_at'),
+    'cpu': ("CPU", 'cpu'),
+    'gpu': ("GPU", 'gpu'),
+    'os': ("OS", 'os'),
+    'installed_software': ("Installed Software", 'installed_software'),
+}
+
+EXPORT_FORMATS = {
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def parse_columns(value):
+    """Turns a comma-separated ?columns= value into known column keys; empty means all columns."""
+    if not value:
+        return list(EXPORT_COLUMNS)
+    columns = [key.strip() for key in value.split(',') if key.strip()]
+    unknown = [key for key in columns if key not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export column(s): {', '.join(unknown)}.")
+    return columns
+
+
+def iter_export_rows(queryset, columns, chunk_size=2000):
+    """Yields plain tuples straight from the database cursor, chunk_size rows at a time."""
+    lookups = [EXPORT_COLUMNS[key][1] for key in columns]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def _display(value):
+    if value is None or value == '':
+        return 'N/A'
+    if hasattr(value, 'strftime'):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands back the value, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([EXPORT_COLUMNS[key][0] for key in columns])
+    for row in rows:
+        yield writer.writerow([_display(value) for value in row])
+
+
+def stream_jsonl(rows, columns):
+    for row in rows:
+        record = {
+            key: value.isoformat() if hasattr(value, 'isoformat') else value
+            for key, value in zip(columns, row)
+        }
+        yield json.dumps(record) + '\n'
+
+
+def stream_xlsx(rows, columns):
+    """
+    Writes rows into a write-only workbook (spooled to a temp file, never held in memory)
+    and streams the finished file back in chunks. xlsx is a zip, so bytes can only start
+    flowing once the last row has been written.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Inventory Data")
+    header_font = Font(bold=True)
+    header = []
+    for key in columns:
+        cell = WriteOnlyCell(sheet, value=EXPORT_COLUMNS[key][0])
+        cell.font = header_font
+        header.append(cell)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([_display(value) for value in row])
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+STREAM_WRITERS = {
+    'xlsx': stream_xlsx,
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+}
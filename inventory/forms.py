@@ -1,11 +1,59 @@
 # inventory/forms.py
 
+import re
+
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
-from .models import InventoryItem, Location, Project
+from django.core.exceptions import ValidationError
+from .models import InventoryItem, InventoryLog, Location, Project
+from . import labels, refdata
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+
+# ---------------------------
+# Cached reference-data choices
+# ---------------------------
+
+class CachedChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.cached_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.cached_objects()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.cached_objects())
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField for Location/Project that renders its options and resolves submitted ids
+    from the per-process refdata cache instead of querying the table on every form.
+    """
+    iterator = CachedChoiceIterator
+
+    def __init__(self, model, **kwargs):
+        super().__init__(queryset=model.objects.all(), **kwargs)
+
+    def cached_objects(self):
+        return refdata.locations() if self.queryset.model is Location else refdata.projects()
+
+    def to_python(self, value):
+        if value in self.empty_values or isinstance(value, self.queryset.model):
+            return super().to_python(value)
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        snapshot = refdata.get()
+        by_pk = snapshot.location_by_pk if self.queryset.model is Location else snapshot.project_by_pk
+        # Not cached yet if another worker created it moments ago: fall back to the table.
+        return by_pk.get(pk) or super().to_python(value)
+
 # ---------------------------
 # User Authentication Forms
 # ---------------------------
@@ -45,8 +93,8 @@ class InventoryItemBaseForm(forms.ModelForm):
         required=False,
         widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Serial Number (Optional)'})
     )
-    location = forms.ModelChoiceField(
-        queryset=Location.objects.all(),
+    location = CachedModelChoiceField(
+        Location,
         empty_label="Select Location",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
@@ -66,8 +114,8 @@ class InventoryItemBaseForm(forms.ModelForm):
         required=False,
         widget=forms.ClearableFileInput(attrs={'class': 'form-control-file'})
     )
-    project = forms.ModelChoiceField(
-        queryset=Project.objects.all(),
+    project = CachedModelChoiceField(
+        Project,
         required=False,
         empty_label="Select Project (Optional)",
         widget=forms.Select(attrs={'class': 'form-control'})
@@ -104,6 +152,17 @@ class InventoryItemBaseForm(forms.ModelForm):
 
 
 class AddItemForm(InventoryItemBaseForm):
+    # Not a model field: creates this many identical units, each with its own UID.
+    units = forms.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=5000,
+        initial=1,
+        label="Identical Units",
+        help_text="Create this many separate assets with the same details (each gets its own UID).",
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'min': 1})
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if 'uid_no' in self.fields:
@@ -117,11 +176,41 @@ class AddItemForm(InventoryItemBaseForm):
 
 
 class EditItemForm(InventoryItemBaseForm):
+    # The item version the form was rendered from; saving over a newer version is a conflict.
+    version = forms.IntegerField(min_value=1, required=False, widget=forms.HiddenInput())
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if 'uid_no' in self.fields:
             self.fields['uid_no'].widget.attrs['readonly'] = 'readonly'
             self.fields['uid_no'].required = False
+        self.fields['version'].initial = self.instance.version
+
+
+# ---------------------------
+# Bulk Import Form
+# ---------------------------
+
+class ImportItemsForm(forms.Form):
+    file = forms.FileField(
+        label="Excel/CSV File",
+        help_text="An .xlsx or .csv file with a header row (Item Name, Category, Serial Number, Location, Project, Status, Quantity, ...).",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control-file', 'accept': '.xlsx,.csv'})
+    )
+    create_missing = forms.BooleanField(
+        required=False, label="Create missing locations/projects",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    dry_run = forms.BooleanField(
+        required=False, label="Validate only (don't import)",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def clean_file(self):
+        uploaded = self.cleaned_data['file']
+        if not uploaded.name.lower().endswith(('.xlsx', '.xlsm', '.csv')):
+            raise forms.ValidationError("Upload an .xlsx or .csv file.")
+        return uploaded
 
 
 # ---------------------------
@@ -144,6 +233,42 @@ class DeleteItemForm(forms.Form):
     )
 
 
+class BatchDisposalForm(forms.Form):
+    # One "UID, quantity, reason" row per line; quantity defaults to 1, reason to the shared one.
+    MAX_ROWS = 5000
+
+    rows = forms.CharField(
+        label="Items to Delete",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 10,
+                                     'placeholder': 'UID, quantity, reason (one item per line)'})
+    )
+    reason_for_deletion = forms.CharField(
+        max_length=255, label="Reason for Rows Without One", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+
+    def clean_rows(self):
+        rows = []
+        for number, line in enumerate(self.cleaned_data['rows'].splitlines(), 1):
+            if not line.strip():
+                continue
+            uid, _, rest = (part.strip() for part in line.partition(','))
+            quantity, _, reason = (part.strip() for part in rest.partition(','))
+            if quantity and not quantity.isdigit():
+                raise ValidationError(f"Line {number}: quantity '{quantity}' is not a whole number.")
+            rows.append({'uid_no': uid, 'quantity': int(quantity or 1), 'reason': reason})
+        if not rows:
+            raise ValidationError("Enter at least one UID.")
+        if len(rows) > self.MAX_ROWS:
+            raise ValidationError(f"At most {self.MAX_ROWS} rows per batch.")
+        return rows
+
+    def entries(self):
+        """The parsed rows with the shared reason filled in, as dispose_items() takes them."""
+        default = self.cleaned_data['reason_for_deletion']
+        return [{**row, 'reason': row['reason'] or default} for row in self.cleaned_data['rows']]
+
+
 # ---------------------------
 # Status Check Form
 # ---------------------------
@@ -171,6 +296,18 @@ class ModifyItemForm(forms.Form):
 # ---------------------------
 
 class InventoryFilterForm(forms.Form):
+    # Sortable columns all have a (column, id) index for keyset pagination.
+    SORT_CHOICES = [
+        ('', 'Sort: Relevance / Name'),
+        ('item_name', 'Name (A-Z)'),
+        ('-item_name', 'Name (Z-A)'),
+        ('category', 'Category'),
+        ('status', 'Status'),
+        ('-created_at', 'Newest First'),
+        ('created_at', 'Oldest First'),
+        ('-updated_at', 'Recently Modified'),
+    ]
+
     search = forms.CharField(
         required=False,
         label='',
@@ -193,18 +330,103 @@ class InventoryFilterForm(forms.Form):
         required=False, label="Status",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    location = forms.ModelChoiceField(
-        queryset=Location.objects.all(),
+    location = CachedModelChoiceField(
+        Location,
         required=False, label="Location",
         empty_label="All Locations",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    project = forms.ModelChoiceField(
-        queryset=Project.objects.all(),
+    project = CachedModelChoiceField(
+        Project,
         required=False, label="Project",
         empty_label="All Projects",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES,
+        required=False, label="Sort",
+        widget=forms.Select(attrs={'class': 'form-control', 'onchange': 'this.form.submit()'})
+    )
+
+
+# ---------------------------
+# Log Filter Form
+# ---------------------------
+
+class LogFilterForm(forms.Form):
+    # Actions written by the views in addition to the model's item actions.
+    ACTION_CHOICES = [('', 'All Actions')] + list(InventoryLog.ITEM_ACTION_CHOICES) + [
+        ('quantity_reduced', 'Quantity Reduced'),
+        ('imported', 'Imported'),
+        ('exported', 'Exported'),
+        ('login', 'Login'),
+        ('logout', 'Logout'),
+        ('registered', 'Registered'),
+    ]
+
+    action = forms.ChoiceField(
+        choices=ACTION_CHOICES, required=False, label="Action",
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    user = forms.CharField(
+        max_length=150, required=False, label="User",
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Username'})
+    )
+    uid_no = forms.CharField(
+        max_length=100, required=False, label="UID",
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Exact UID'})
+    )
+    item = forms.IntegerField(
+        required=False, min_value=1, label="Item ID",
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Item ID'})
+    )
+    date_from = forms.DateField(
+        required=False, label="From",
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    date_to = forms.DateField(
+        required=False, label="To",
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    # Archived months live in compressed files (see archive.py) and are searched by UID or date range.
+    include_archived = forms.BooleanField(
+        required=False, label="Include archived",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+
+# ---------------------------
+# Label Sheet Form
+# ---------------------------
+
+class LabelSheetForm(forms.Form):
+    # Labels for a pasted/scanned UID list, or for every item matching the dashboard search.
+    uids = forms.CharField(
+        required=False, label="UIDs",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 8,
+                                     'placeholder': 'UIDs separated by commas or new lines; empty for the dashboard filter'})
+    )
+    search = forms.CharField(required=False, widget=forms.HiddenInput())
+    sort = forms.ChoiceField(choices=InventoryFilterForm.SORT_CHOICES, required=False, widget=forms.HiddenInput())
+    format = forms.ChoiceField(
+        choices=[('pdf', 'PDF'), ('png', 'PNG')], initial='pdf', required=False, label="Format",
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    symbology = forms.ChoiceField(
+        choices=[(name, {'code128': 'Code 128', 'qr': 'QR code'}[name]) for name in labels.symbologies()],
+        initial='code128', required=False, label="Barcode",
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    def clean_uids(self):
+        uids = [uid for uid in re.split(r'[\s,;]+', self.cleaned_data['uids']) if uid]
+        return list(dict.fromkeys(uids))
+
+    def clean_format(self):
+        return self.cleaned_data['format'] or self.fields['format'].initial
+
+    def clean_symbology(self):
+        return self.cleaned_data['symbology'] or self.fields['symbology'].initial
 
 
 # ---------------------------
@@ -212,15 +434,15 @@ class InventoryFilterForm(forms.Form):
 # ---------------------------
 
 class TransferForm(forms.Form):
-    new_location = forms.ModelChoiceField(
-        queryset=Location.objects.all(),
+    new_location = CachedModelChoiceField(
+        Location,
         empty_label="Select New Location",
         widget=forms.Select(attrs={'class': 'form-control', 'id': 'id_new_location_transfer'}),
         label="Transfer To Location"
     )
 
-    new_project = forms.ModelChoiceField(
-        queryset=Project.objects.all(),
+    new_project = CachedModelChoiceField(
+        Project,
         required=False,
         empty_label="Select Project (Optional)",
         widget=forms.Select(attrs={'class': 'form-control', 'id': 'id_project_transfer'}),
@@ -0,0 +1,193 @@
+# inventory_management/inventory/importers.py
+
+import csv
+import io
+import os
+import time
+
+import openpyxl
+
+from .models import InventoryItem, Location, Project
+
+# Spreadsheet header (lower-cased, spaces/dashes as underscores) -> InventoryItem field.
+COLUMN_ALIASES = {
+    'item_name': 'item_name',
+    'name': 'item_name',
+    'category': 'category',
+    'serial_number': 'serial_number',
+    'serial_no': 'serial_number',
+    's/n': 'serial_number',
+    'location': 'location',
+    'project': 'project',
+    'status': 'status',
+    'quantity': 'quantity',
+    'qty': 'quantity',
+    'description': 'description',
+    'cpu': 'cpu',
+    'gpu': 'gpu',
+    'os': 'os',
+    'operating_system': 'os',
+    'installed_software': 'installed_software',
+}
+
+TEXT_FIELDS = ('item_name', 'serial_number', 'description', 'cpu', 'gpu', 'os', 'installed_software')
+
+
+class ImportResult:
+    """Outcome of one import run: counters, per-row errors and throughput."""
+
+    def __init__(self, max_errors=1000):
+        self.rows_read = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []  # (row_number, message), capped at max_errors
+        self.max_errors = max_errors
+        self.elapsed = 0.0
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((row_number, message))
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def iter_xlsx_rows(file_obj):
+    """Yields each data row as a tuple; the workbook is opened read-only so rows are streamed from disk."""
+    workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(file_obj):
+    """Yields each CSV row as a list, reading the (binary or text) file one line at a time."""
+    if isinstance(file_obj.read(0), bytes):
+        file_obj = io.TextIOWrapper(file_obj, encoding='utf-8-sig', newline='')
+    yield from csv.reader(file_obj)
+
+
+def iter_rows(file_obj, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        return iter_xlsx_rows(file_obj)
+    if extension == '.csv':
+        return iter_csv_rows(file_obj)
+    raise ValueError(f"Unsupported file type '{extension}'. Upload an .xlsx or .csv file.")
+
+
+class InventoryImporter:
+    """
+    Streams rows from an .xlsx/.csv file into InventoryItem in chunked bulk inserts.
+    Location and project names are resolved through lookup maps built once per import.
+    """
+
+    def __init__(self, user=None, batch_size=1000, create_missing=False, dry_run=False, max_errors=1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.create_missing = create_missing
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+
+        self.locations = {name.lower(): pk for pk, name in Location.objects.values_list('pk', 'name')}
+        self.projects = {name.lower(): pk for pk, name in Project.objects.values_list('pk', 'name')}
+        # Accept either the category name ('Laptop') or its UID prefix ('LAP').
+        self.categories = {}
+        for category, prefix in InventoryItem.CATEGORY_CHOICES:
+            self.categories[category.lower()] = category
+            self.categories[prefix.lower()] = category
+        self.statuses = {status.lower(): status for status, _ in InventoryItem.STATUS_CHOICES}
+        self.max_lengths = {name: InventoryItem._meta.get_field(name).max_length for name in TEXT_FIELDS}
+
+    def run(self, file_obj, filename):
+        result = ImportResult(max_errors=self.max_errors)
+        started = time.perf_counter()
+        rows = iter_rows(file_obj, filename)
+
+        columns = None
+        batch = []
+        for row_number, row in enumerate(rows, start=1):
+            if columns is None:
+                columns = [COLUMN_ALIASES.get(_normalize_header(cell)) for cell in row]
+                if 'item_name' not in columns:
+                    raise ValueError("The header row must contain an 'Item Name' column.")
+                continue
+            if not any(cell not in (None, '') for cell in row):
+                continue  # Skip blank lines
+
+            result.rows_read += 1
+            values = {field: cell for field, cell in zip(columns, row) if field}
+            item, error = self.build_item(values)
+            if error:
+                result.add_error(row_number, error)
+                continue
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                result.created += self.flush(batch)
+                batch = []
+
+        if batch:
+            result.created += self.flush(batch)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def build_item(self, values):
+        """Validates one row and returns (unsaved InventoryItem, None) or (None, error message)."""
+        cleaned = {}
+        for name in TEXT_FIELDS:
+            value = values.get(name)
+            value = str(value).strip() if value not in (None, '') else None
+            max_length = self.max_lengths[name]
+            if value and max_length and len(value) > max_length:
+                return None, f"{name.replace('_', ' ').title()} is longer than {max_length} characters."
+            cleaned[name] = value
+        if not cleaned['item_name']:
+            return None, "Item Name is required."
+
+        category = str(values.get('category') or 'Other').strip().lower()
+        if category not in self.categories:
+            return None, f"Unknown category '{values.get('category')}'."
+        cleaned['category'] = self.categories[category]
+
+        status = str(values.get('status') or 'Available').strip().lower()
+        if status not in self.statuses:
+            return None, f"Unknown status '{values.get('status')}'."
+        cleaned['status'] = self.statuses[status]
+
+        quantity = values.get('quantity')
+        try:
+            quantity = int(float(quantity)) if quantity not in (None, '') else 1
+        except (TypeError, ValueError):
+            return None, f"Quantity '{values.get('quantity')}' is not a number."
+        if quantity < 1:
+            return None, "Quantity must be at least 1."
+        cleaned['quantity'] = quantity
+
+        for name, lookup, model in (('location', self.locations, Location), ('project', self.projects, Project)):
+            ref = values.get(name)
+            ref = str(ref).strip() if ref not in (None, '') else ''
+            if not ref:
+                cleaned[f'{name}_id'] = None
+                continue
+            pk = lookup.get(ref.lower())
+            if pk is None:
+                if not self.create_missing:
+                    return None, f"{model._meta.verbose_name} '{ref}' does not exist."
+                pk = lookup[ref.lower()] = ref if self.dry_run else model.objects.create(name=ref).pk
+            cleaned[f'{name}_id'] = pk
+
+        return InventoryItem(**cleaned), None
+
+    def flush(self, batch):
+        if self.dry_run:
+            return len(batch)
+        # One transaction per chunk: UID block reservation, item insert and log insert.
+        InventoryItem.objects.bulk_create_with_uids(batch, user=self.user, batch_size=self.batch_size)
+        return len(batch)
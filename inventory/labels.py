@@ -0,0 +1,309 @@
+# inventory_management/inventory/labels.py
+#
+# Printable asset-tag sheets: one label per item, with a barcode of its UID plus the item name
+# and UID in text, laid out COLUMNS x ROWS to a page. Configured by settings.INVENTORY_LABELS:
+#
+#   'PAGE_MM':    (width, height) of a sheet in millimetres (A4 by default)
+#   'MARGIN_MM':  blank border around the label grid
+#   'COLUMNS', 'ROWS': labels per sheet, matching the label stock
+#   'DPI':        raster resolution; Code128 bars are whole pixels wide, so keep it at or above 200
+#   'WORKERS':    processes rendering sheets in parallel (1 renders inline)
+#   'MAX_LABELS': the most labels one request may ask for
+#
+# Sheets are rendered by render_sheet(), which touches neither the database nor settings and so
+# runs in a process pool; stream() hands them back in order as they finish. PDFs are written
+# incrementally (a page per sheet, each a losslessly compressed 1-bit image), PNG sheets come
+# back as one PNG, or as a ZIP of PNGs when there is more than one sheet.
+# Code128 (set B) is drawn here with Pillow alone; QR labels need the optional qrcode package.
+
+import io
+import os
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+
+from django.conf import settings
+
+try:
+    import qrcode
+except ImportError:  # QR labels are unavailable; Code128 works without it
+    qrcode = None
+
+DEFAULTS = {
+    'PAGE_MM': (210, 297),
+    'MARGIN_MM': 8,
+    'COLUMNS': 3,
+    'ROWS': 8,
+    'DPI': 200,
+    'WORKERS': os.cpu_count() or 1,
+    'MAX_LABELS': 5000,
+}
+FORMATS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'png': ('image/png', 'png'),
+}
+ZIP_FORMAT = ('application/zip', 'zip')
+POINTS_PER_MM = 72 / 25.4
+
+# Code128 bar/space widths (in modules) of symbol values 0-106: 103-105 are START A/B/C, 106 STOP.
+CODE128_PATTERNS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+CODE128_START_B = 104
+CODE128_STOP = 106
+CODE128_QUIET_ZONE = 10  # modules of white required on either side
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_LABELS', {})}
+
+
+def symbologies():
+    return ('code128', 'qr') if qrcode is not None else ('code128',)
+
+
+def layout(symbology='code128', config=None):
+    """Sheet geometry in pixels for render_sheet(); a plain dict so it can be sent to a worker."""
+    config = config or get_config()
+    if symbology not in symbologies():
+        raise ValueError(f"Unsupported label symbology '{symbology}'.")
+    dpi = config['DPI']
+    width_mm, height_mm = config['PAGE_MM']
+    to_px = lambda mm: round(mm * dpi / 25.4)
+    margin = to_px(config['MARGIN_MM'])
+    width, height = to_px(width_mm), to_px(height_mm)
+    return {
+        'symbology': symbology,
+        'dpi': dpi,
+        'page_mm': (width_mm, height_mm),
+        'size': (width, height),
+        'margin': margin,
+        'columns': config['COLUMNS'],
+        'rows': config['ROWS'],
+        'cell': ((width - 2 * margin) // config['COLUMNS'], (height - 2 * margin) // config['ROWS']),
+    }
+
+
+def code128_modules(text):
+    """The bar/space widths of `text` in Code128 set B, including start, checksum and stop."""
+    values = []
+    for char in text:
+        code = ord(char) - 32
+        if not 0 <= code <= 95:
+            raise ValueError(f"Code128 set B can't encode {char!r}.")
+        values.append(code)
+    checksum = (CODE128_START_B + sum(position * value for position, value in enumerate(values, 1))) % 103
+    symbols = [CODE128_START_B, *values, checksum, CODE128_STOP]
+    return [int(width) for symbol in symbols for width in CODE128_PATTERNS[symbol]]
+
+
+@lru_cache(maxsize=None)
+def _font(size):
+    from PIL import ImageFont
+
+    return ImageFont.load_default(size=size)
+
+
+def _fit(draw, text, font, width):
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + '…', font=font) > width:
+        text = text[:-1]
+    return text + '…'
+
+
+def _draw_code128(draw, uid, box):
+    left, top, width, height = box
+    modules = code128_modules(uid)
+    module = max(1, width // (sum(modules) + 2 * CODE128_QUIET_ZONE))
+    x = left + (width - sum(modules) * module) // 2
+    for index, count in enumerate(modules):
+        if index % 2 == 0:  # even elements are bars
+            draw.rectangle((x, top, x + count * module - 1, top + height - 1), fill=0)
+        x += count * module
+
+
+def _draw_qr(draw, uid, box):
+    left, top, width, height = box
+    code = qrcode.QRCode(border=0, error_correction=qrcode.constants.ERROR_CORRECT_M)
+    code.add_data(uid)
+    code.make(fit=True)
+    matrix = code.get_matrix()
+    module = max(1, min(width, height) // len(matrix))
+    for y, row in enumerate(matrix):
+        for x, dark in enumerate(row):
+            if dark:
+                draw.rectangle((left + x * module, top + y * module,
+                                left + (x + 1) * module - 1, top + (y + 1) * module - 1), fill=0)
+    return len(matrix) * module
+
+
+def _draw_label(draw, label, box, symbology):
+    uid, name = label
+    left, top, width, height = box
+    pad = max(2, height // 12)
+    left, top, width, height = left + pad, top + pad, width - 2 * pad, height - 2 * pad
+    font_size = max(8, height // 8)
+    font = _font(font_size)
+    if symbology == 'qr':
+        side = _draw_qr(draw, uid, (left, top, width // 2, height))
+        text_left, text_width, text_top = left + side + pad, width - side - pad, top
+    else:
+        bar_height = height - 2 * (font_size + pad)
+        _draw_code128(draw, uid, (left, top, width, bar_height))
+        text_left, text_width, text_top = left, width, top + bar_height + pad
+    draw.text((text_left, text_top), _fit(draw, uid, font, text_width), font=font, fill=0)
+    draw.text((text_left, text_top + font_size + pad), _fit(draw, name or '', font, text_width), font=font, fill=0)
+
+
+def render_sheet(labels, sheet_layout, image_format):
+    """
+    Draws one sheet of (uid, item name) labels. Returns PNG bytes for 'png' and, for 'pdf',
+    (width, height, zlib-compressed 1-bit rows) ready to embed as a PDF image.
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new('1', sheet_layout['size'], 1)
+    draw = ImageDraw.Draw(image)
+    draw.fontmode = '1'  # the sheet is 1-bit: skip antialiasing glyphs that would be thresholded anyway
+    cell_width, cell_height = sheet_layout['cell']
+    margin = sheet_layout['margin']
+    for index, label in enumerate(labels):
+        row, column = divmod(index, sheet_layout['columns'])
+        box = (margin + column * cell_width, margin + row * cell_height, cell_width, cell_height)
+        _draw_label(draw, label, box, sheet_layout['symbology'])
+
+    if image_format == 'png':
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue()
+    # Mode '1' rows are packed MSB-first with 1 = white, exactly PDF's 1-bit DeviceGray.
+    return image.width, image.height, zlib.compress(image.tobytes(), 6)
+
+
+def render_sheets(labels, sheet_layout, image_format, workers=None):
+    """Yields each sheet's render_sheet() result in order, rendering across a process pool."""
+    per_sheet = sheet_layout['columns'] * sheet_layout['rows']
+    sheets = [labels[start:start + per_sheet] for start in range(0, len(labels), per_sheet)]
+    workers = min(workers or get_config()['WORKERS'], len(sheets))
+    if workers <= 1:
+        for sheet in sheets:
+            yield render_sheet(sheet, sheet_layout, image_format)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield from pool.map(render_sheet, sheets, repeat(sheet_layout), repeat(image_format))
+    finally:
+        # A client that disconnects closes the generator: don't render sheets nobody will read.
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _PDFWriter:
+    """Writes a PDF of full-page images one page at a time, so pages can be sent as they're made."""
+
+    def __init__(self, page_mm):
+        self.page = tuple(round(mm * POINTS_PER_MM, 2) for mm in page_mm)
+        self.offsets = {}
+        self.position = 0
+        self.kids = []
+
+    def _chunk(self, data):
+        self.position += len(data)
+        return data
+
+    def _object(self, number, body, stream=None):
+        self.offsets[number] = self.position
+        data = f'{number} 0 obj\n'.encode() + body
+        if stream is not None:
+            data += b'\nstream\n' + stream + b'\nendstream'
+        return self._chunk(data + b'\nendobj\n')
+
+    def header(self):
+        # Object 2 is the page tree, written last once every page is known.
+        return self._chunk(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n') + self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    def page_image(self, width, height, data):
+        image, content, page = (3 + 3 * len(self.kids) + offset for offset in range(3))
+        self.kids.append(page)
+        drawing = f'q {self.page[0]} 0 0 {self.page[1]} 0 0 cm /Im0 Do Q'.encode()
+        return b''.join([
+            self._object(image, f'<< /Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                                f'/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode '
+                                f'/Length {len(data)} >>'.encode(), data),
+            self._object(content, f'<< /Length {len(drawing)} >>'.encode(), drawing),
+            self._object(page, f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page[0]} {self.page[1]}] '
+                               f'/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>'.encode()),
+        ])
+
+    def trailer(self):
+        kids = ' '.join(f'{page} 0 R' for page in self.kids)
+        data = self._object(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>'.encode())
+        size = max(self.offsets) + 1
+        xref = self.position
+        entries = ''.join(f'{self.offsets[number]:010d} 00000 n \n' for number in range(1, size))
+        data += (f'xref\n0 {size}\n0000000000 65535 f \n{entries}'
+                 f'trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n').encode()
+        return data
+
+
+def _stream_pdf(sheets, page_mm):
+    writer = _PDFWriter(page_mm)
+    yield writer.header()
+    for width, height, data in sheets:
+        yield writer.page_image(width, height, data)
+    yield writer.trailer()
+
+
+class _ZipChunks(io.RawIOBase):
+    """Unseekable sink for zipfile; whatever it wrote so far is collected with take()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def _stream_zip(sheets):
+    sink = _ZipChunks()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:  # PNGs are already compressed
+        for number, png in enumerate(sheets, 1):
+            archive.writestr(f'labels-{number:03d}.png', png)
+            yield sink.take()
+    yield sink.take()
+
+
+def stream(labels, image_format='pdf', symbology='code128', workers=None):
+    """
+    Returns (content type, file extension, iterator of bytes) for a label sheet document of
+    `labels`, a list of (uid, item name) pairs.
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f"Unsupported label format '{image_format}'.")
+    sheet_layout = layout(symbology)
+    sheets = render_sheets(labels, sheet_layout, image_format, workers)
+    if image_format == 'pdf':
+        return (*FORMATS['pdf'], _stream_pdf(sheets, sheet_layout['page_mm']))
+    if len(labels) <= sheet_layout['columns'] * sheet_layout['rows']:
+        return (*FORMATS['png'], iter(sheets))
+    return (*ZIP_FORMAT, _stream_zip(sheets))
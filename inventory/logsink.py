@@ -0,0 +1,220 @@
+# inventory_management/inventory/logsink.py
+#
+# Where create_log_entry() sends audit records. Configured by settings.INVENTORY_LOG_SINK:
+#
+#   'MODE': 'sync'       write each record immediately on the request path (tests, debugging)
+#           'on_commit'  queue the record once the surrounding transaction commits, so rolled-back
+#                        work is never logged; a background thread bulk-inserts the queue
+#           'buffered'   queue immediately (lowest latency; records of rolled-back work are kept)
+#   'BATCH_SIZE':     flush once this many records are waiting
+#   'FLUSH_INTERVAL': ...or once the oldest waiting record is this many seconds old
+#   'RETRIES':        a batch whose write fails stays queued and is retried, waiting twice as
+#                     long each time; after this many failures in a row it is dropped and its
+#                     records are written to the error log instead
+#
+# Queued records live in process memory until flushed; they are flushed at interpreter exit,
+# but a hard kill of the worker loses whatever is still waiting.
+#
+# The batch paths don't go through the sink: transfers.transfer_items, disposals.dispose_items
+# and InventoryItem.objects.bulk_create_with_uids bulk-insert their InventoryLog (and ItemChange)
+# rows themselves, in the same transaction as the item changes they describe. Their entries are
+# written whatever MODE says and are never lost to a failed flush, but they cost that request
+# its inserts.
+
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import pagecache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'on_commit',
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'RETRIES': 5,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_LOG_SINK', {})}
+
+
+def _write(records):
+    """Bulk-inserts queued records, dropping references to items/users deleted in the meantime."""
+    from django.contrib.auth.models import User
+    from .models import InventoryItem, InventoryLog
+
+    item_ids = {record['item_id'] for record in records if record['item_id']}
+    user_ids = {record['user_id'] for record in records if record['user_id']}
+    live_items = set(InventoryItem.objects.filter(pk__in=item_ids).values_list('pk', flat=True)) if item_ids else set()
+    live_users = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)) if user_ids else set()
+
+    logs = []
+    changes = []
+    for record in records:
+        record = dict(record)
+        changes.append(record.pop('changes', None) or [])
+        if record['item_id'] not in live_items:
+            record['item_id'] = None  # uid_no still identifies the item, as for deletions
+        if record['user_id'] not in live_users:
+            record['user_id'] = None
+        logs.append(InventoryLog(**record))
+    with transaction.atomic():
+        InventoryLog.objects.bulk_create(logs, batch_size=500)
+        _write_changes(logs, changes)
+        if any(log.item_id or log.uid_no for log in logs):
+            pagecache.invalidate()
+
+
+def _write_changes(logs, changes):
+    from .models import ItemChange
+
+    rows = []
+    for log, log_changes in zip(logs, changes):
+        # Without returned ids (older SQLite) the change rows are still written, just unlinked.
+        rows.extend(ItemChange.for_log(log, log_changes))
+    if rows:
+        ItemChange.objects.bulk_create(rows, batch_size=500)
+
+
+class BufferedLogWriter:
+    """Per-process queue of log records drained by a daemon thread in bulk_create batches."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Serialises flushes from the background thread and from flush() callers, which share _failed.
+        self._flush_lock = threading.Lock()
+        self._failed = []  # records of a batch that couldn't be written, retried before newer ones
+        self._failures = 0  # failed writes in a row
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def _ensure_thread(self):
+        # Started lazily, and restarted after a fork (e.g. gunicorn preload), since threads don't survive it.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._failed, self._failures = [], 0
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='inventory-log-writer', daemon=True)
+            self._thread.start()
+
+    def put(self, record):
+        self._ensure_thread()
+        self._queue.put(record)
+        if self._queue.qsize() >= get_config()['BATCH_SIZE']:
+            self._wake.set()
+
+    def _drain(self):
+        records = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return records
+
+    def flush(self):
+        """
+        Writes everything queued so far from the calling thread. Returns the number of records
+        written; when a batch fails, it and everything after it stay queued for the next flush.
+        """
+        config = get_config()
+        with self._flush_lock:
+            records = self._failed + self._drain()
+            self._failed = []
+            written = 0
+            for start in range(0, len(records), config['BATCH_SIZE']):
+                batch = records[start:start + config['BATCH_SIZE']]
+                try:
+                    _write(batch)
+                except Exception:
+                    self._failures += 1
+                    if self._failures <= config['RETRIES']:
+                        logger.exception("Failed to write %d buffered inventory log record(s); will retry.",
+                                         len(records) - start)
+                        self._failed = records[start:]
+                        return written
+                    logger.exception("Dropping %d inventory log record(s) after %d failed writes: %r",
+                                     len(batch), self._failures, batch)
+                else:
+                    written += len(batch)
+                self._failures = 0
+            return written
+
+    def _run(self):
+        while not self._stopping:
+            config = get_config()
+            # Back off while writes are failing, e.g. while the database is locked or unreachable.
+            self._wake.wait(config['FLUSH_INTERVAL'] * 2 ** min(self._failures, 6))
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # This thread's connections would otherwise stay open for the life of the worker.
+                connections.close_all()
+
+    def shutdown(self):
+        self._stopping = True
+        self._wake.set()
+        self.flush()
+        if self._failed:
+            logger.error("Exiting with %d unwritten inventory log record(s): %r", len(self._failed), self._failed)
+
+
+writer = BufferedLogWriter()
+atexit.register(writer.shutdown)
+
+
+def record(user, item, action, details=None, uid_no=None, changes=None):
+    """
+    Hands one audit record to the configured sink. `changes` is an optional list of
+    (field, old value, new value) written as ItemChange rows with the log entry.
+    """
+    from .models import InventoryLog
+
+    changes = list(changes or [])
+    fields = {
+        'user_id': user.pk if user and user.is_authenticated else None,
+        'item_id': item.pk if item else None,
+        'uid_no': uid_no,
+        'action': action,
+        'details': details,
+        # Stamped now, not when the batch reaches the database.
+        'timestamp': timezone.now(),
+    }
+    if len(changes) == 1:
+        # A single-field change also fills the log row's own old/new columns.
+        _, old_value, new_value = changes[0]
+        fields['old_value'] = old_value[:255] if old_value else old_value
+        fields['new_value'] = new_value[:255] if new_value else new_value
+
+    mode = get_config()['MODE']
+    if mode == 'sync':
+        with transaction.atomic():
+            log = InventoryLog.objects.create(**fields)
+            _write_changes([log], [changes])
+    elif mode == 'on_commit':
+        transaction.on_commit(lambda: writer.put({**fields, 'changes': changes}))
+    elif mode == 'buffered':
+        writer.put({**fields, 'changes': changes})
+    else:
+        raise ValueError(f"Unknown INVENTORY_LOG_SINK mode '{mode}'.")
+
+
+def flush():
+    return writer.flush()
@@ -0,0 +1,45 @@
+# inventory_management/inventory/management/commands/archive_inventory_logs.py
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import archive
+from inventory.models import InventoryLog
+
+
+class Command(BaseCommand):
+    help = ("Moves InventoryLog rows older than the retention window into monthly gzip JSONL files "
+            "(see inventory/archive.py), deleting them from the table in small batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Archive rows older than this many days (default: INVENTORY_LOG_ARCHIVE RETENTION_DAYS).")
+        parser.add_argument('--batch-size', type=int, help="Rows per transaction.")
+        parser.add_argument('--pause', type=float, help="Seconds to sleep between batches.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived per month.")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else archive.get_config()['RETENTION_DAYS']
+        if days < 0:
+            raise CommandError("--days must be 0 or more.")
+        before = timezone.now() - timedelta(days=days)
+
+        if options['dry_run']:
+            counts = {}
+            for moment in InventoryLog.objects.filter(timestamp__lt=before).values_list('timestamp', flat=True).iterator():
+                month = archive.month_of(moment)
+                counts[month] = counts.get(month, 0) + 1
+            for month, rows in sorted(counts.items()):
+                self.stdout.write(f"{month:%Y-%m}: {rows} entries")
+            self.stdout.write(f"Would archive {sum(counts.values())} log entries older than {before:%Y-%m-%d}.")
+            return
+
+        archived = archive.archive_logs(before=before, batch_size=options['batch_size'], pause=options['pause'])
+        for month, rows in sorted(archived.items()):
+            self.stdout.write(f"{month:%Y-%m}: archived {rows} entries to {archive.file_name_for(month)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {sum(archived.values())} log entries older than {before:%Y-%m-%d}."))
+        if archived:
+            self.stdout.write("Run sqlite_maintenance to return the freed pages to the filesystem.")
@@ -0,0 +1,87 @@
+# inventory_management/inventory/management/commands/backfill_item_changes.py
+
+import re
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.models import InventoryItem, InventoryLog, ItemChange
+
+# "Updated item 'X' (UID: Y). Changes: CPU: 'a' to 'b'; Location: 'L1' to 'L2'"
+EDIT_CHANGE_RE = re.compile(r"(?:^|; )(?P<label>[^:;]+): '(?P<old>.*?)' to '(?P<new>.*?)'(?=; |$)")
+# "... transferred from 'A' to 'B'. Project changed from 'P' to 'Q'. Status set to 'S'."
+TRANSFER_RE = re.compile(
+    r"transferred from '(?P<old_location>.*?)' to '(?P<new_location>.*?)'\. "
+    r"Project changed from '(?P<old_project>.*?)' to '(?P<new_project>.*?)'\. "
+    r"Status set to '(?P<new_status>.*?)'\."
+)
+EMPTY_DISPLAY = ('', 'Empty', 'None', 'N/A')
+
+
+def _value(text):
+    return None if text in EMPTY_DISPLAY else text
+
+
+def parse_changes(log, labels):
+    """Recovers [(field, old, new), ...] from a log entry's free-text details."""
+    details = log.details or ''
+    if log.action == 'updated' and 'Changes: ' in details:
+        changes = []
+        for match in EDIT_CHANGE_RE.finditer(details.split('Changes: ', 1)[1]):
+            field = labels.get(match.group('label').strip().lower())
+            if field:
+                changes.append((field, _value(match.group('old')), _value(match.group('new'))))
+        return changes
+    if log.action == 'transferred':
+        match = TRANSFER_RE.search(details)
+        if not match:
+            return []
+        changes = [
+            ('location', _value(match.group('old_location')), _value(match.group('new_location'))),
+            ('project', _value(match.group('old_project')), _value(match.group('new_project'))),
+            # The old status was never written down.
+            ('status', None, _value(match.group('new_status'))),
+        ]
+        return [change for change in changes if change[0] == 'status' or change[1] != change[2]]
+    return []
+
+
+class Command(BaseCommand):
+    help = ("Parses the free-text details of existing 'updated' and 'transferred' log entries "
+            "into structured ItemChange rows. Entries that already have change rows are skipped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        # Edit logs use the model fields' verbose names ("Operating System", "CPU", "item name").
+        labels = {str(field.verbose_name).lower(): field.name for field in InventoryItem._meta.concrete_fields}
+
+        logs = (InventoryLog.objects.filter(action__in=['updated', 'transferred'], changes__isnull=True)
+                .only('id', 'item_id', 'action', 'details', 'timestamp').order_by('id'))
+        scanned = created = unparsed = 0
+        pending = []
+        for log in logs.iterator(chunk_size=options['batch_size']):
+            scanned += 1
+            changes = parse_changes(log, labels)
+            if not changes:
+                unparsed += 1
+                continue
+            pending.extend(ItemChange.for_log(log, changes))
+            if len(pending) >= options['batch_size']:
+                created += self.write(pending, options['dry_run'])
+                pending = []
+        created += self.write(pending, options['dry_run'])
+
+        verb = "Would create" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} log entries. {verb} {created} change record(s); "
+            f"{unparsed} entr{'y' if unparsed == 1 else 'ies'} had no parsable changes."
+        ))
+
+    def write(self, rows, dry_run):
+        if rows and not dry_run:
+            with transaction.atomic():
+                ItemChange.objects.bulk_create(rows)
+        return len(rows)
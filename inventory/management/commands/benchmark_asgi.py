@@ -0,0 +1,200 @@
+# inventory_management/inventory/management/commands/benchmark_asgi.py
+
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from inventory.models import InventoryItem
+
+from .benchmark_views import BENCH_USER, percentile
+
+# Each stack is gunicorn with the same number of worker processes; only the worker model differs.
+SERVERS = {
+    'wsgi': (['inventory_management.wsgi:application', '--worker-class', 'sync'], '/api/'),
+    'asgi': (['inventory_management.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+             '/api/async/'),
+}
+ENDPOINTS = ('status', 'items', 'dashboard', 'logs')
+
+# gunicorn config for --query-latency-ms: every query of every worker waits as if the database
+# were across a network (SQLite answers in-process, so a sync worker never sits idle otherwise).
+LATENCY_CONFIG = """
+def post_fork(server, worker):
+    import time
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep({seconds})
+        return execute(sql, params, many, context)
+
+    def add_delay(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:  # the wrapper object outlives each reconnect
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(add_delay, weak=False)
+"""
+
+
+async def _request(reader, writer, raw, slow_send):
+    """Sends one request (the headers in two halves `slow_send` seconds apart) and reads the reply."""
+    if slow_send:
+        writer.write(raw[:len(raw) // 2])
+        await writer.drain()
+        await asyncio.sleep(slow_send)
+        writer.write(raw[len(raw) // 2:])
+    else:
+        writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def _client(port, requests, deadline, slow_send, rng, latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            # Requests still in flight at the deadline are abandoned rather than waited for.
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port),
+                                                        deadline - time.perf_counter())
+            start = time.perf_counter()
+            status, keep_alive = await asyncio.wait_for(
+                _request(reader, writer, rng.choice(requests), slow_send), deadline - start)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except asyncio.TimeoutError:
+            break
+        except (OSError, asyncio.IncompleteReadError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port, requests, concurrency, seconds, slow_send, seed):
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(
+        _client(port, requests, deadline, slow_send, random.Random(seed + n), latencies, errors)
+        for n in range(concurrency)
+    ))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = ("Starts the project under gunicorn twice, with sync WSGI workers serving the /api/ read "
+            "endpoints and with uvicorn ASGI workers serving their /api/async/ twins, and compares "
+            "throughput and latency at high client concurrency against the current database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Worker processes per server.")
+        parser.add_argument('--concurrency', type=int, default=200, help="Concurrent client connections.")
+        parser.add_argument('--seconds', type=float, default=10.0, help="Measured duration per server.")
+        parser.add_argument('--slow-send-ms', type=float, default=50.0,
+                            help="Pause in the middle of sending each request, as from a slow scanner link.")
+        parser.add_argument('--query-latency-ms', type=float, default=0.0,
+                            help="Delay added to every query in the servers, modelling a database over the network.")
+        parser.add_argument('--endpoints', nargs='*', choices=ENDPOINTS, default=list(ENDPOINTS))
+        parser.add_argument('--servers', nargs='*', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        uids = list(InventoryItem.objects.exclude(uid_no=None).order_by().values_list('uid_no', flat=True)[:1000])
+        if not uids:
+            raise CommandError("No items to benchmark against; run generate_inventory_data first.")
+        client = Client()
+        client.force_login(User.objects.get_or_create(username=BENCH_USER)[0])
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+        rng = random.Random(options['seed'])
+        report = {}
+        for name in options['servers']:
+            argv, prefix = SERVERS[name]
+            requests = self.requests(prefix, options['endpoints'], uids, cookie, rng)
+            with self.server(argv, options['workers'], options['port'], options['query_latency_ms']):
+                latencies, errors = asyncio.run(_load(options['port'], requests, options['concurrency'],
+                                                      options['seconds'], options['slow_send_ms'] / 1000,
+                                                      options['seed']))
+            report[name] = {
+                'requests': len(latencies),
+                'requests_per_s': round(len(latencies) / options['seconds'], 1),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+                'p95_ms': round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+                'errors': errors,
+            }
+            self.stdout.write(f"{name}: {report[name]['requests_per_s']} req/s, p95 {report[name]['p95_ms']} ms, "
+                              f"{sum(errors.values())} error(s)")
+
+        if {'wsgi', 'asgi'} <= report.keys() and report['wsgi']['requests']:
+            report['speedup'] = round(report['asgi']['requests'] / report['wsgi']['requests'], 2)
+        report['settings'] = {key: options[key] for key in ('workers', 'concurrency', 'seconds', 'slow_send_ms',
+                                                        'query_latency_ms', 'endpoints')}
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def requests(self, prefix, endpoints, uids, cookie, rng):
+        paths = {
+            'status': lambda: f"status/?{urlencode({'uids': ','.join(rng.sample(uids, min(50, len(uids))))})}",
+            'items': lambda: f"items/?{urlencode({'uids': ','.join(rng.sample(uids, min(20, len(uids))))})}",
+            'dashboard': lambda: 'dashboard/?limit=25',
+            'logs': lambda: 'logs/?limit=50',
+        }
+        # A pool of ready-made requests per endpoint; clients pick from it at random.
+        return [
+            (f"GET {prefix}{paths[endpoint]()} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n"
+             f"Connection: keep-alive\r\n\r\n").encode()
+            for endpoint in endpoints for _ in range(20)
+        ]
+
+    @contextmanager
+    def server(self, argv, workers, port, query_latency_ms):
+        with tempfile.NamedTemporaryFile('w', suffix='.py') as config:
+            config.write(LATENCY_CONFIG.format(seconds=query_latency_ms / 1000) if query_latency_ms else '')
+            config.flush()
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', *argv, '--workers', str(workers), '--config', config.name,
+                 '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+                cwd=settings.BASE_DIR,
+            )
+            try:
+                self.wait_for(port, process)
+                yield process
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    def wait_for(self, port, process, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"The server exited with status {process.returncode}.")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                time.sleep(1.0)  # let every worker finish booting
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f"The server didn't start listening on port {port}.")
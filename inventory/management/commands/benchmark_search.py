@@ -0,0 +1,93 @@
+# inventory_management/inventory/management/commands/benchmark_search.py
+
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventory import search
+from inventory.models import InventoryItem, Location, Project
+
+WORDS = ['dell', 'latitude', 'thinkpad', 'lenovo', 'hp', 'elitebook', 'monitor', 'ultrasharp', 'cisco',
+         'catalyst', 'switch', 'printer', 'laserjet', 'server', 'poweredge', 'intel', 'xeon', 'ryzen',
+         'nvidia', 'quadro', 'windows', 'ubuntu', 'office', 'autocad', 'spare', 'refurbished', 'loaner']
+QUERIES = ['thinkpad', 'dell lat', 'xeon', 'LAP-', 'autocad', 'quadro ubuntu', 'refurb', 'nomatchword']
+
+
+class Command(BaseCommand):
+    help = ("Seeds synthetic items and compares the full-text search index with the original "
+            "icontains Q-chain on the same dashboard query.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded items afterwards.")
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError("This database backend has no search index to benchmark.")
+
+        tag = f"bench-{uuid.uuid4().hex[:6]}"
+        self.stdout.write(f"Seeding {options['items']} items...")
+        ids = self.seed(tag, options['items'])
+        try:
+            base = InventoryItem.objects.order_by('item_name').select_related('location', 'project')
+            self.stdout.write(f"{'query':<16}{'matches':>9}{'Q-chain ms':>12}{'index ms':>10}{'speedup':>9}")
+            for query in QUERIES:
+                legacy_ms, legacy_count = self.measure(
+                    lambda: base.filter(search.legacy_filter(query)).distinct(), options['repeat'])
+                index_ms, index_count = self.measure(lambda: search.search(base, query), options['repeat'])
+                speedup = legacy_ms / index_ms if index_ms else 0
+                self.stdout.write(f"{query:<16}{index_count:>9}{legacy_ms:>12.1f}{index_ms:>10.1f}{speedup:>8.1f}x"
+                                  + ("" if legacy_count == index_count else f"  (Q-chain matched {legacy_count})"))
+        finally:
+            if not options['keep']:
+                self.stdout.write("Removing seeded items...")
+                with transaction.atomic():
+                    InventoryItem.objects.filter(pk__in=ids).delete()
+                    Location.objects.filter(name__startswith=tag).delete()
+                    Project.objects.filter(name__startswith=tag).delete()
+
+    def measure(self, build_queryset, repeat):
+        """Median time for a dashboard page: COUNT for the paginator plus the first 10 rows."""
+        timings = []
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = build_queryset()
+            count = queryset.count()
+            list(queryset[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), count
+
+    def seed(self, tag, total):
+        rng = random.Random(42)
+        locations = [Location.objects.get_or_create(name=f"{tag} site {n}")[0] for n in range(20)]
+        projects = [Project.objects.get_or_create(name=f"{tag} project {n}")[0] for n in range(10)]
+        categories = [category for category, _ in InventoryItem.CATEGORY_CHOICES]
+        ids = []
+        with transaction.atomic():
+            for start in range(0, total, 5000):
+                batch = []
+                for n in range(start, min(start + 5000, total)):
+                    category = rng.choice(categories)
+                    batch.append(InventoryItem(
+                        item_name=f"{tag} {' '.join(rng.sample(WORDS, 2))}",
+                        uid_no=f"{dict(InventoryItem.CATEGORY_CHOICES)[category]}-{tag}-{n:06d}",
+                        serial_number=f"SN{rng.randrange(10**9):09d}",
+                        category=category,
+                        location=rng.choice(locations),
+                        project=rng.choice(projects),
+                        description=' '.join(rng.choices(WORDS, k=12)),
+                        installed_software=', '.join(rng.sample(WORDS, 4)),
+                        cpu=rng.choice(['intel xeon', 'intel i7', 'ryzen 7']),
+                        os=rng.choice(['windows 11', 'ubuntu 22.04']),
+                    ))
+                InventoryItem.objects.bulk_create(batch)
+                ids.extend(InventoryItem.objects.filter(uid_no__in=[item.uid_no for item in batch])
+                           .values_list('pk', flat=True))
+            search.index_items(ids)
+        return ids
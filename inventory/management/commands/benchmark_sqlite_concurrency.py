@@ -0,0 +1,124 @@
+# inventory_management/inventory/management/commands/benchmark_sqlite_concurrency.py
+
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from inventory import sqlite
+from inventory.models import InventoryItem, InventoryLog
+
+# 'baseline' is how the database ran before INVENTORY_SQLITE: rollback journal, SQLite's defaults.
+PROFILES = {
+    'baseline': None,
+    'tuned': sqlite.DEFAULT_PROFILE,
+}
+
+
+def _worker(role, path, profile, start_at, seconds, seed):
+    """Runs in a forked process against its own copy of the database; returns (role, ops, lock errors)."""
+    settings.INVENTORY_SQLITE = profile
+    connections['default'].settings_dict['NAME'] = path
+    rng = random.Random(seed)
+    item_ids = list(InventoryItem.objects.order_by().values_list('pk', flat=True)[:1000])
+    ops = errors = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + seconds
+    while time.time() < deadline:
+        try:
+            if role == 'writer':
+                with transaction.atomic():
+                    item_id = rng.choice(item_ids)
+                    InventoryItem.objects.filter(pk=item_id).update(updated_at=timezone.now())
+                    InventoryLog.objects.create(item_id=item_id, action='updated', details='concurrency benchmark')
+            else:
+                list(InventoryItem.objects.values('status').annotate(n=Count('id')).order_by())
+                list(InventoryItem.objects.order_by('item_name', 'id').values('id', 'item_name', 'status')[:25])
+                list(InventoryLog.objects.filter(item_id=rng.choice(item_ids)).values('action', 'timestamp')[:10])
+            ops += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            errors += 1
+    connections.close_all()
+    return role, ops, errors
+
+
+class Command(BaseCommand):
+    help = ("Measures reader/writer throughput on copies of the current SQLite database, once with "
+            "SQLite's defaults (rollback journal) and once with the INVENTORY_SQLITE profile.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0, help="Measured duration per profile.")
+        parser.add_argument('--profiles', nargs='*', choices=sorted(PROFILES), default=['baseline', 'tuned'])
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("benchmark_sqlite_concurrency only applies to SQLite databases.")
+        if not InventoryItem.objects.exists():
+            raise CommandError("No items to benchmark against; run generate_inventory_data first.")
+        source = connection.settings_dict['NAME']
+
+        report = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in options['profiles']:
+                path = os.path.join(workdir, f'{name}.sqlite3')
+                self.copy_database(source, path, PROFILES[name])
+                report[name] = self.run_profile(path, PROFILES[name], options)
+                self.stdout.write(f"{name}: {report[name]['reads_per_s']} reads/s, "
+                                  f"{report[name]['writes_per_s']} writes/s, "
+                                  f"{report[name]['lock_errors']} lock error(s)")
+
+        if {'baseline', 'tuned'} <= report.keys():
+            report['speedup'] = {
+                kind: round(report['tuned'][kind] / report['baseline'][kind], 2) if report['baseline'][kind] else None
+                for kind in ('reads_per_s', 'writes_per_s')
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def copy_database(self, source, path, profile):
+        # The backup API copies a consistent snapshot even while the live database is in WAL mode.
+        src, dst = sqlite3.connect(source), sqlite3.connect(path)
+        try:
+            src.backup(dst)
+            journal_mode = (profile or {}).get('JOURNAL_MODE') or 'DELETE'
+            dst.execute(f"PRAGMA journal_mode = {journal_mode}")
+        finally:
+            src.close()
+            dst.close()
+
+    def run_profile(self, path, profile, options):
+        roles = ['reader'] * options['readers'] + ['writer'] * options['writers']
+        start_at = time.time() + 1.0  # lets every process connect before the clock starts
+        jobs = [(role, path, profile, start_at, options['seconds'], options['seed'] + n)
+                for n, role in enumerate(roles)]
+        # Forked children must not inherit open database connections.
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(len(roles)) as pool:
+            results = pool.starmap(_worker, jobs)
+
+        totals = {'reader': 0, 'writer': 0}
+        errors = 0
+        for role, ops, lock_errors in results:
+            totals[role] += ops
+            errors += lock_errors
+        return {
+            'readers': options['readers'],
+            'writers': options['writers'],
+            'reads_per_s': round(totals['reader'] / options['seconds'], 1),
+            'writes_per_s': round(totals['writer'] / options['seconds'], 1),
+            'lock_errors': errors,
+        }
@@ -0,0 +1,197 @@
+# inventory_management/inventory/management/commands/benchmark_views.py
+
+import json
+import math
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import InventoryItem, InventoryLog, Location
+
+BENCH_USER = 'benchmark'
+# Scenarios that write; each runs in a transaction that is rolled back afterwards.
+WRITE_SCENARIOS = {'add_item', 'transfer'}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = ("Drives the main views through the test client against the current database and reports "
+            "p50/p95 latency, query counts and peak memory per view as JSON (see generate_inventory_data).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per view.")
+        parser.add_argument('--only', nargs='*', help="Benchmark just these scenario names.")
+        parser.add_argument('--read-only', action='store_true',
+                            help="Skip the scenarios that write (add_item, transfer; their changes are rolled back anyway).")
+        parser.add_argument('--page-cache', action='store_true',
+                            help="Keep the page cache on: cached views then report warm (hit) timings.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument('--compare', help="A previous report to print p50/p95/query deltas against.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        item_ids = list(InventoryItem.objects.order_by().values_list('pk', flat=True)[:1000])
+        if not item_ids:
+            raise CommandError("No items to benchmark against; run generate_inventory_data first.")
+        self.rng = random.Random(options['seed'])
+        self.item_ids = item_ids
+        self.location_ids = list(Location.objects.values_list('pk', flat=True)[:50])
+        if not self.location_ids:
+            raise CommandError("No locations to benchmark against; run generate_inventory_data first.")
+        self.uids = list(InventoryItem.objects.filter(pk__in=item_ids[:200]).values_list('uid_no', flat=True))
+
+        user, _ = User.objects.get_or_create(username=BENCH_USER)
+        client = Client()
+        client.force_login(user)
+
+        scenarios = self.scenarios(options['read_only'])
+        if options['only']:
+            unknown = set(options['only']) - {name for name, *_ in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario[0] in options['only']]
+
+        # The test client talks to 'testserver', and the manifest static storage needs collectstatic output.
+        # Query counts are captured here, so the query budget middleware would only add overhead.
+        # The page cache is off unless asked for: the warm-up request would otherwise turn every
+        # timed dashboard/item_details request into a cache hit.
+        page_cache = {**getattr(settings, 'INVENTORY_PAGE_CACHE', {}), 'ENABLED': options['page_cache']}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                               STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+                               INVENTORY_QUERY_BUDGET={'ENABLED': False}, INVENTORY_PAGE_CACHE=page_cache):
+            results = {}
+            for name, request in scenarios:
+                with self.rolled_back() if name in WRITE_SCENARIOS else nullcontext():
+                    results[name] = self.run_scenario(client, request, options['repeat'])
+
+        report = {
+            'commit': self.git_commit(),
+            'recorded_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'items': InventoryItem.objects.count(),
+            'logs': InventoryLog.objects.count(),
+            'repeat': options['repeat'],
+            'page_cache': options['page_cache'],
+            'views': results,
+        }
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(text + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def scenarios(self, read_only):
+        """(name, callable(client) -> response) pairs; callables pick fresh arguments every call."""
+        pick = lambda: self.rng.choice(self.item_ids)
+        scenarios = [
+            ('dashboard', lambda c: c.get(reverse('inventory:dashboard'))),
+            ('dashboard_sorted', lambda c: c.get(reverse('inventory:dashboard'), {'sort': '-updated_at'})),
+            # The dashboard filters by its full-text 'search' alone; sorting a search keyset-pages it.
+            ('dashboard_filtered', lambda c: c.get(reverse('inventory:dashboard'),
+                                                   {'search': 'laptop', 'sort': 'status'})),
+            ('search', lambda c: c.get(reverse('inventory:dashboard'),
+                                       {'search': self.rng.choice(['thinkpad', 'dell', 'xeon', 'ubuntu', 'dock'])})),
+            ('item_details', lambda c: c.get(reverse('inventory:item_details', args=[pick()]))),
+            ('item_log_timeline', lambda c: c.get(reverse('inventory:item_log_timeline', args=[pick()]))),
+            ('status_check', lambda c: c.get(reverse('inventory:status_check'), {'uid_no': self.rng.choice(self.uids)})),
+            ('inventory_logs', lambda c: c.get(reverse('inventory:inventory_logs'))),
+            ('inventory_logs_filtered', lambda c: c.get(reverse('inventory:inventory_logs'),
+                                                        {'action': 'transferred'})),
+            ('export_csv', lambda c: c.get(reverse('inventory:export_inventory_excel'), {'format': 'csv'})),
+        ]
+        if not read_only:
+            scenarios += [
+                ('add_item', lambda c: c.post(reverse('inventory:add_item'), {
+                    'item_name': 'Benchmark laptop', 'category': 'Laptop', 'status': 'Available', 'quantity': 1,
+                    'location': self.rng.choice(self.location_ids),
+                })),
+                ('transfer', lambda c: c.post(
+                    reverse('inventory:transfer_inventory_items'),
+                    json.dumps({'items': [{'id': pick(), 'new_location': self.rng.choice(self.location_ids)}
+                                          for _ in range(10)]}),
+                    content_type='application/json')),
+            ]
+        return scenarios
+
+    @contextmanager
+    def rolled_back(self):
+        # Keeps the write scenarios from changing the database being measured; commit-time
+        # work (the on_commit log sink) doesn't run, so their timings leave it out.
+        with transaction.atomic():
+            yield
+            transaction.set_rollback(True)
+
+    def run_scenario(self, client, request, repeat):
+        self.send(client, request)  # warm-up: URL resolver, template loading, connection
+        timings, queries = [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.send(client, request)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        # Memory is measured on a separate request: tracemalloc slows everything it traces.
+        tracemalloc.start()
+        try:
+            self.send(client, request)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': max(queries),
+            'peak_memory_kib': round(peak / 1024, 1),
+        }
+
+    def send(self, client, request):
+        response = request(client)
+        if response.streaming:
+            # Streamed exports only do their work while being consumed.
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def compare(self, path, results):
+        with open(path) as handle:
+            baseline = json.load(handle)['views']
+        self.stderr.write(f"{'view':<26}{'p50 ms':>16}{'p95 ms':>16}{'queries':>12}")
+        for name, now in results.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            change = lambda key: f"{before[key]:>7}->{now[key]:<7}"
+            self.stderr.write(f"{name:<26}{change('p50_ms'):>16}{change('p95_ms'):>16}"
+                              f"{before['queries']:>5}->{now['queries']:<5}")
+
+    def git_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                  text=True, cwd=settings.BASE_DIR, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,58 @@
+# inventory_management/inventory/management/commands/dedupe_media.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory import pagecache, thumbnails
+from inventory.models import InventoryItem
+from inventory.storage import ContentAddressedStorage, content_hash
+
+FILE_FIELDS = ('document', 'image')
+
+
+class Command(BaseCommand):
+    help = ("Moves item documents and images stored under their original names into the "
+            "content-addressed layout, so identical files are kept once.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be moved.")
+        parser.add_argument('--delete-originals', action='store_true',
+                            help="Delete each old file once no item refers to it any more.")
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage()
+        moved = missing = 0
+        stored = set()
+        for field in FILE_FIELDS:
+            max_length = InventoryItem._meta.get_field(field).max_length
+            names = (InventoryItem.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                     .order_by(field).values_list(field, flat=True).distinct())
+            for name in list(names):
+                if content_hash(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f"Missing file: {name}")
+                    continue
+                moved += 1
+                if options['dry_run']:
+                    self.stdout.write(f"Would move {name}")
+                    continue
+
+                with storage.open(name, 'rb') as handle:
+                    new_name = storage.save(name, handle, max_length=max_length)
+                stored.add(new_name)
+                with transaction.atomic():
+                    InventoryItem.objects.filter(**{field: name}).update(**{field: new_name})
+                    pagecache.invalidate()
+                if field == 'image':
+                    thumbnails.generate(new_name)
+                if options['delete_originals']:
+                    storage.delete(name)
+                self.stdout.write(f"{name} -> {new_name}")
+
+        if options['dry_run']:
+            self.stdout.write(f"Would move {moved} file(s); {missing} missing.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Moved {moved} file(s) into {len(stored)} stored file(s); {missing} missing."))
@@ -0,0 +1,166 @@
+# inventory_management/inventory/management/commands/generate_inventory_data.py
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from inventory import pagecache, search, summary
+from inventory.models import InventoryItem, InventoryLog, ItemChange, Location, Project
+
+# Generated rows are recognisable by these prefixes, which is what --clear deletes.
+SERIAL_PREFIX = 'SYN'
+NAME_PREFIX = 'Synthetic'
+
+MODELS = {
+    'Laptop': ['Dell Latitude 5440', 'Lenovo ThinkPad T14', 'HP EliteBook 840', 'MacBook Pro 14'],
+    'Monitor': ['Dell UltraSharp U2723', 'LG 27UK850', 'Samsung S24R350'],
+    'Printer': ['HP LaserJet M404', 'Brother HL-L2350', 'Canon imageCLASS'],
+    'Server': ['Dell PowerEdge R650', 'HPE ProLiant DL380', 'Lenovo ThinkSystem SR650'],
+    'Networking Device': ['Cisco Catalyst 9200', 'Ubiquiti UniFi Switch', 'Aruba 2930F'],
+    'Desktop PC': ['Dell OptiPlex 7010', 'HP ProDesk 600', 'Lenovo ThinkCentre M70'],
+    'Software License': ['AutoCAD 2024', 'Microsoft 365 E3', 'Adobe Creative Cloud'],
+    'Other': ['USB-C Dock', 'Wireless Mouse', 'Projector', 'Headset'],
+}
+# Roughly how a real asset register is spread across categories.
+CATEGORY_WEIGHTS = {'Laptop': 30, 'Monitor': 25, 'Desktop PC': 12, 'Other': 12, 'Printer': 5,
+                    'Networking Device': 6, 'Server': 4, 'Software License': 6}
+STATUS_WEIGHTS = {'Available': 45, 'In Use': 40, 'In Repair': 7, 'In Transit': 3, 'Disposed': 5}
+# Column order of the rows built by Command.history().
+LOG_COLUMNS = ['item', 'uid_no', 'action', 'details', 'old_value', 'new_value', 'timestamp']
+HISTORY_ACTIONS = ['updated', 'transferred', 'status_change', 'location_change', 'assigned_to_project']
+CPUS = ['Intel Core i5-1345U', 'Intel Core i7-1365U', 'AMD Ryzen 7 PRO 7840U', 'Intel Xeon Silver 4314']
+SYSTEMS = ['Windows 11 Pro', 'Windows 10 Pro', 'Ubuntu 22.04', 'macOS 14']
+SOFTWARE = ['Office', 'Teams', 'Chrome', 'AutoCAD', 'Slack', 'VS Code', 'Zoom', 'Acrobat']
+
+
+class Command(BaseCommand):
+    help = ("Generates a synthetic inventory (items across categories, locations and projects, plus "
+            "audit-log history) with bulk inserts, for benchmarking at 10k/100k/1M item scale.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--logs-per-item', type=float, default=4.0,
+                            help="Average history entries per item, on top of its 'added' entry.")
+        parser.add_argument('--locations', type=int, default=40)
+        parser.add_argument('--projects', type=int, default=15)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true',
+                            help="Delete previously generated data first (and stop if --items is 0).")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            self.clear()
+        total = options['items']
+        if total <= 0:
+            return
+
+        rng = random.Random(options['seed'])
+        locations = [Location.objects.get_or_create(name=f"{NAME_PREFIX} site {n:03d}")[0]
+                     for n in range(options['locations'])]
+        projects = [Project.objects.get_or_create(name=f"{NAME_PREFIX} project {n:03d}")[0]
+                    for n in range(options['projects'])]
+        categories, category_weights = zip(*CATEGORY_WEIGHTS.items())
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        now = timezone.now()
+
+        started = time.perf_counter()
+        made_items = made_logs = 0
+        for start in range(0, total, options['batch_size']):
+            size = min(options['batch_size'], total - start)
+            items = []
+            for n in range(start, start + size):
+                category = rng.choices(categories, category_weights)[0]
+                items.append(InventoryItem(
+                    item_name=rng.choice(MODELS[category]),
+                    serial_number=f"{SERIAL_PREFIX}{n:09d}",
+                    category=category,
+                    status=rng.choices(statuses, status_weights)[0],
+                    location=rng.choice(locations),
+                    # About a quarter of the assets sit in stock without a project.
+                    project=rng.choice(projects) if rng.random() < 0.75 else None,
+                    quantity=rng.choice([1] * 8 + [2, 5, 10]),
+                    description=f"{rng.choice(MODELS[category])} issued to {rng.choice(SOFTWARE)} team",
+                    cpu=rng.choice(CPUS) if category in ('Laptop', 'Desktop PC', 'Server') else None,
+                    os=rng.choice(SYSTEMS) if category in ('Laptop', 'Desktop PC', 'Server') else None,
+                    installed_software=', '.join(rng.sample(SOFTWARE, 3)),
+                ))
+            with transaction.atomic():
+                # Real UIDs, search index rows, summary counters and 'added' entries.
+                InventoryItem.objects.bulk_create_with_uids(items, batch_size=options['batch_size'])
+                history = self.history(rng, items, locations, options['logs_per_item'], now)
+                self.insert_logs(history)
+            made_items += size
+            made_logs += size + len(history)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{made_items}/{total} items, {made_logs} log entries "
+                              f"({made_items / elapsed:,.0f} items/s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {made_items} items and {made_logs} log entries in {time.perf_counter() - started:.1f}s."))
+
+    def history(self, rng, items, locations, per_item, now):
+        """Past log entries for `items` as LOG_COLUMNS tuples, spread over the last two years."""
+        logs = []
+        for item in items:
+            # 0..2x the average, so some items have a long history and some none.
+            for _ in range(int(rng.uniform(0, 2 * per_item) + 0.5)):
+                action = rng.choice(HISTORY_ACTIONS)
+                old, new = '', ''
+                if action in ('transferred', 'location_change'):
+                    old, new = rng.choice(locations).name, item.location.name
+                elif action == 'status_change':
+                    old, new = rng.choice(list(STATUS_WEIGHTS)), item.status
+                logs.append((
+                    item.pk,
+                    item.uid_no,
+                    action,
+                    f"{action.replace('_', ' ').capitalize()} for '{item.item_name}' (UID: {item.uid_no}).",
+                    old or None,
+                    new or None,
+                    now - timedelta(seconds=rng.randrange(2 * 365 * 86400)),
+                ))
+        return logs
+
+    def insert_logs(self, rows):
+        """
+        History is several times the size of the item table, and bulk_create spends most of its
+        time compiling per-row SQL; one executemany of a single prepared INSERT is far cheaper.
+        """
+        fields = [InventoryLog._meta.get_field(name) for name in LOG_COLUMNS]
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            connection.ops.quote_name(InventoryLog._meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        adapt = connection.ops.adapt_datetimefield_value
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(*row[:-1], adapt(row[-1])) for row in rows])
+
+    def clear(self):
+        self.stdout.write("Deleting previously generated data...")
+        with transaction.atomic():
+            items = InventoryItem.objects.filter(serial_number__startswith=SERIAL_PREFIX)
+            ItemChange.objects.filter(item__in=items).update(item=None, log=None)
+            # Plain DELETEs skip the ORM's collector, its post_delete signals (search index, summary
+            # counters, page cache) and the SET_NULL cascades: ItemChange is unlinked above, the
+            # generated items' logs go with them, and the rest is rebuilt below.
+            quote = connection.ops.quote_name
+            generated = (f"SELECT id FROM {quote(InventoryItem._meta.db_table)} "
+                         f"WHERE {quote('serial_number')} LIKE %s")
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {quote(InventoryLog._meta.db_table)} "
+                               f"WHERE {quote('item_id')} IN ({generated})", [f'{SERIAL_PREFIX}%'])
+                cursor.execute(f"DELETE FROM {quote(InventoryItem._meta.db_table)} "
+                               f"WHERE {quote('serial_number')} LIKE %s", [f'{SERIAL_PREFIX}%'])
+                deleted = cursor.rowcount
+            pagecache.invalidate()
+            Location.objects.filter(name__startswith=NAME_PREFIX, inventoryitem__isnull=True).delete()
+            Project.objects.filter(name__startswith=NAME_PREFIX, inventoryitem__isnull=True).delete()
+        search.rebuild()
+        summary.reconcile(fix=True)
+        self.stdout.write(f"Deleted {deleted} items.")
@@ -0,0 +1,58 @@
+# inventory_management/inventory/management/commands/generate_thumbnails.py
+
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from inventory import thumbnails
+from inventory.models import InventoryItem
+
+
+def _render(source):
+    """Runs in a worker process: renders one image's thumbnails, no database access."""
+    try:
+        return thumbnails.render(source), None
+    except Exception as e:
+        return {'source': source}, f"{type(e).__name__}: {e}"
+
+
+class Command(BaseCommand):
+    help = ("Creates missing or outdated thumbnails for item images, rendering them in a pool "
+            "of worker processes. Items sharing an image are rendered once.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--force', action='store_true',
+                            help="Re-render every image, e.g. after changing INVENTORY_THUMBNAILS sizes.")
+
+    def handle(self, *args, **options):
+        sources = set()
+        rows = InventoryItem.objects.exclude(image='').exclude(image__isnull=True).values_list('image', 'thumbnails')
+        for image, current in rows.iterator(chunk_size=2000):
+            if options['force'] or (current or {}).get('source') != image:
+                sources.add(image)
+        if not sources:
+            self.stdout.write("All item images have thumbnails.")
+            return
+
+        self.stdout.write(f"Rendering thumbnails for {len(sources)} image(s) with {options['processes']} processes...")
+        started = time.perf_counter()
+        done = failed = updated = 0
+        # Forked children must not inherit open database connections.
+        connections.close_all()
+        with multiprocessing.Pool(options['processes']) as pool:
+            for result, error in pool.imap_unordered(_render, sorted(sources), chunksize=4):
+                # Failures are recorded too, so they aren't retried on every save; the original is shown.
+                updated += thumbnails.store(result)
+                done += 1
+                if error:
+                    failed += 1
+                    self.stderr.write(f"{result['source']}: {error}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {done - failed} image(s) ({failed} failed) for {updated} item(s) "
+            f"in {elapsed:.1f}s ({done / elapsed:.1f} images/s)."))
@@ -0,0 +1,45 @@
+# inventory_management/inventory/management/commands/import_inventory.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importers import InventoryImporter
+
+
+class Command(BaseCommand):
+    help = "Streams inventory items from an .xlsx or .csv file into the database in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--create-missing', action='store_true',
+                            help="Create locations/projects that don't exist yet instead of rejecting the row.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; nothing is written.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"File '{path}' does not exist.")
+
+        importer = InventoryImporter(
+            batch_size=options['batch_size'],
+            create_missing=options['create_missing'],
+            dry_run=options['dry_run'],
+        )
+        with open(path, 'rb') as file_obj:
+            try:
+                result = importer.run(file_obj, path)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        for row_number, message in result.errors:
+            self.stderr.write(f"Row {row_number}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... {result.error_count - len(result.errors)} more error(s) not shown.")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} of {result.rows_read} rows in {result.elapsed:.2f}s "
+            f"({result.rows_per_second:.0f} rows/s), {result.error_count} error(s)."
+        ))
@@ -0,0 +1,20 @@
+# inventory_management/inventory/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from inventory import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the dashboard full-text search index from the inventory tables."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING(
+                f"The {connection.vendor} backend has no search index; the dashboard uses icontains filters."
+            ))
+            return
+        with transaction.atomic():
+            count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} item(s)."))
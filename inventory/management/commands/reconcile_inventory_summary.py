@@ -0,0 +1,24 @@
+# inventory_management/inventory/management/commands/reconcile_inventory_summary.py
+
+from django.core.management.base import BaseCommand
+
+from inventory import summary
+
+
+class Command(BaseCommand):
+    help = ("Recomputes the dashboard summary counters from the inventory table, reports any drift "
+            "from the incrementally maintained values and repairs it.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        drift = summary.reconcile(fix=not options['dry_run'])
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Summary counters match the inventory."))
+            return
+        for dimension, key, (stored_count, stored_qty), (count, quantity) in drift:
+            self.stdout.write(f"{dimension}={key or '(none)'}: stored {stored_count} items / {stored_qty} units, "
+                              f"actual {count} items / {quantity} units")
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.WARNING(f"{verb} drift in {len(drift)} bucket(s)."))
@@ -0,0 +1,98 @@
+# inventory_management/inventory/management/commands/sqlite_maintenance.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+AUTO_VACUUM = {0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}
+
+
+class Command(BaseCommand):
+    help = ("Routine upkeep for the SQLite database: PRAGMA optimize (or a full ANALYZE), a WAL "
+            "checkpoint and incremental vacuum. Run it from cron, or keep it running with --interval.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help="Run a full ANALYZE instead of PRAGMA optimize (after bulk imports).")
+        parser.add_argument('--checkpoint', choices=CHECKPOINT_MODES, type=str.upper, default='PASSIVE',
+                            help="WAL checkpoint mode; TRUNCATE also shrinks the -wal file to zero.")
+        parser.add_argument('--vacuum-pages', type=int, default=0,
+                            help="Free pages to return to the filesystem (incremental auto_vacuum only; 0 = all).")
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help="Switch the database to auto_vacuum=INCREMENTAL. Rewrites the whole file "
+                                 "once with VACUUM, so run it during a quiet period.")
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Repeat every this many seconds instead of running once.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("sqlite_maintenance only applies to SQLite databases.")
+        if options['vacuum_pages'] < 0:
+            raise CommandError("--vacuum-pages must be 0 or more.")
+
+        if options['enable_incremental_vacuum']:
+            self.enable_incremental_vacuum()
+        while True:
+            self.run_once(options)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def run_once(self, options):
+        started = time.perf_counter()
+        before = self.stats()
+        with connection.cursor() as cursor:
+            if options['analyze']:
+                cursor.execute("ANALYZE")
+            else:
+                cursor.execute("PRAGMA optimize")
+
+            checkpoint = None
+            if before['journal_mode'] == 'wal':
+                cursor.execute(f"PRAGMA wal_checkpoint({options['checkpoint']})")
+                checkpoint = cursor.fetchone()  # (busy, wal pages, pages checkpointed)
+
+            if before['auto_vacuum'] == 'INCREMENTAL' and before['freelist_count']:
+                # incremental_vacuum returns a row per step; it must be consumed for the work to happen.
+                cursor.execute(f"PRAGMA incremental_vacuum({options['vacuum_pages'] or ''})")
+                cursor.fetchall()
+        after = self.stats()
+
+        self.stdout.write(f"{'ANALYZE' if options['analyze'] else 'optimize'} done; "
+                          f"pages {before['page_count']} -> {after['page_count']} "
+                          f"(free {before['freelist_count']} -> {after['freelist_count']}), "
+                          f"WAL {before['wal_bytes']} -> {after['wal_bytes']} bytes.")
+        if checkpoint is not None and checkpoint[0]:
+            self.stderr.write(f"Checkpoint was blocked by active readers/writers "
+                              f"({checkpoint[2]}/{checkpoint[1]} WAL pages copied).")
+        if before['auto_vacuum'] != 'INCREMENTAL' and before['freelist_count']:
+            self.stdout.write(f"{before['freelist_count']} free page(s) stay in the file; "
+                              f"see --enable-incremental-vacuum.")
+        self.stdout.write(self.style.SUCCESS(f"Maintenance finished in {time.perf_counter() - started:.2f}s."))
+
+    def enable_incremental_vacuum(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA auto_vacuum")
+            if AUTO_VACUUM.get(cursor.fetchone()[0]) == 'INCREMENTAL':
+                self.stdout.write("auto_vacuum is already INCREMENTAL.")
+                return
+            # The mode only takes effect on an existing database after a VACUUM.
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        self.stdout.write(self.style.SUCCESS("Switched auto_vacuum to INCREMENTAL."))
+
+    def stats(self):
+        values = {}
+        with connection.cursor() as cursor:
+            for pragma in ('page_count', 'freelist_count', 'auto_vacuum', 'journal_mode'):
+                cursor.execute(f"PRAGMA {pragma}")
+                values[pragma] = cursor.fetchone()[0]
+        values['auto_vacuum'] = AUTO_VACUUM.get(values['auto_vacuum'], values['auto_vacuum'])
+        values['journal_mode'] = str(values['journal_mode']).lower()
+        name = connection.settings_dict['NAME']
+        wal = f"{name}-wal"
+        values['wal_bytes'] = os.path.getsize(wal) if isinstance(name, (str, os.PathLike)) and os.path.exists(wal) else 0
+        return values
@@ -0,0 +1,82 @@
+# inventory_management/inventory/management/commands/stress_uid_allocator.py
+
+import multiprocessing
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+
+from inventory.models import InventoryItem, InventoryLog
+
+
+def _worker(args):
+    """Runs in a child process: creates `total` items in blocks of `block_size` and returns how many it made."""
+    run_tag, worker_no, total, block_size, category = args
+    # Never share the parent's database connection across a fork.
+    connections.close_all()
+    created = 0
+    try:
+        while created < total:
+            size = min(block_size, total - created)
+            items = [
+                InventoryItem(item_name=f"{run_tag}-w{worker_no}", category=category)
+                for _ in range(size)
+            ]
+            InventoryItem.objects.bulk_create_with_uids(items)
+            created += size
+    finally:
+        connections.close_all()
+    return created
+
+
+class Command(BaseCommand):
+    help = ("Stress-tests the block-reserving UID allocator from several processes at once, "
+            "checks the result for duplicate UIDs and reports items created per second.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--items-per-process', type=int, default=500)
+        parser.add_argument('--block-size', type=int, default=50,
+                            help="Items created per allocator call (1 exercises the per-item path).")
+        parser.add_argument('--category', default='Laptop',
+                            choices=[choice for choice, _ in InventoryItem.CATEGORY_CHOICES])
+        parser.add_argument('--keep', action='store_true', help="Don't delete the generated items afterwards.")
+
+    def handle(self, *args, **options):
+        if connections['default'].settings_dict['NAME'] in (':memory:', '') or \
+                'mode=memory' in str(connections['default'].settings_dict['NAME']):
+            raise CommandError("The stress test needs a file or server database shared between processes.")
+
+        run_tag = f"stress-{uuid.uuid4().hex[:8]}"
+        processes = options['processes']
+        jobs = [
+            (run_tag, n, options['items_per_process'], options['block_size'], options['category'])
+            for n in range(processes)
+        ]
+
+        connections.close_all()
+        started = time.perf_counter()
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            created = sum(pool.map(_worker, jobs))
+        elapsed = time.perf_counter() - started
+
+        run_items = InventoryItem.objects.filter(item_name__startswith=run_tag)
+        duplicates = list(
+            run_items.values('uid_no').annotate(copies=Count('id')).filter(copies__gt=1).values_list('uid_no', flat=True)
+        )
+        stored = run_items.count()
+
+        self.stdout.write(f"Created {created} items in {elapsed:.2f}s "
+                          f"({created / elapsed if elapsed else 0:.0f} items/s) "
+                          f"across {processes} processes, block size {options['block_size']}.")
+
+        if not options['keep']:
+            InventoryLog.objects.filter(item__in=run_items).delete()
+            run_items.delete()
+
+        if duplicates or stored != created:
+            raise CommandError(f"Allocator check failed: {len(duplicates)} duplicate UID(s) "
+                               f"(e.g. {duplicates[:5]}), {stored} rows stored for {created} created.")
+        self.stdout.write(self.style.SUCCESS("No duplicate UIDs found."))
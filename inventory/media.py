@@ -0,0 +1,141 @@
+# inventory_management/inventory/media.py
+#
+# Serves uploaded media (MEDIA_URL) to signed-in users in every environment, not only under
+# DEBUG: item images and documents aren't public, so the front server must not expose
+# MEDIA_ROOT itself (with SENDFILE, only through an internal location). Configured by
+# settings.INVENTORY_MEDIA:
+#
+#   'SENDFILE': None               stream the file from this worker
+#               'x-sendfile'       answer with X-Sendfile: <absolute path> (Apache mod_xsendfile,
+#                                  lighttpd) and let the front server send the bytes
+#               'x-accel-redirect' answer with X-Accel-Redirect: <ACCEL_PREFIX><name> (nginx
+#                                  'internal' location aliased to MEDIA_ROOT)
+#   'ACCEL_PREFIX': '/protected-media/'
+#   'MAX_AGE':      Cache-Control max-age for files that aren't content-addressed
+#
+# Content-addressed files (storage.py) never change under their name, so they get a year-long
+# immutable, private Cache-Control and their SHA-256 as ETag. Conditional requests (If-None-Match /
+# If-Modified-Since) get 304, and a single 'Range: bytes=' range gets a 206 partial response.
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .storage import content_hash
+
+DEFAULTS = {
+    'SENDFILE': None,
+    'ACCEL_PREFIX': '/protected-media/',
+    'MAX_AGE': 3600,
+}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+CHUNK_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_MEDIA', {})}
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range; None to ignore the header;
+    raises ValueError when it's unsatisfiable."""
+    match = RANGE.match(header.strip()) if header else None
+    if not match or not any(match.groups()) or size == 0:
+        return None  # absent, malformed or multi-range: send the whole file
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@login_required
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid media path.")
+    # Storage bookkeeping (.name markers, .incoming uploads) is never served.
+    if any(part.startswith('.') for part in path.split('/')) or not os.path.isfile(full_path):
+        raise Http404("Media file not found.")
+
+    config = get_config()
+    stat = os.stat(full_path)
+    digest = content_hash(path)
+    etag = quote_etag(digest if digest else f"{int(stat.st_mtime)}-{stat.st_size}")
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        if config['SENDFILE']:
+            # The front server handles ranges itself; the worker only sends headers.
+            response = HttpResponse(content_type=content_type)
+            if config['SENDFILE'] == 'x-accel-redirect':
+                response['X-Accel-Redirect'] = config['ACCEL_PREFIX'].rstrip('/') + '/' + path.lstrip('/')
+            else:
+                response['X-Sendfile'] = full_path
+        else:
+            response = _file_response(request, full_path, stat.st_size, etag, content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Accept-Ranges'] = 'bytes'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+
+    response['ETag'] = etag
+    if digest:
+        response['Cache-Control'] = f'private, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f"private, max-age={config['MAX_AGE']}"
+    return response
+
+
+def _file_response(request, full_path, size, etag, content_type):
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and if_range and if_range != etag:
+        range_header = None  # the client's partial copy is stale: send everything
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    start, end = byte_range
+    response = StreamingHttpResponse(_read_range(full_path, start, end - start + 1),
+                                     status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
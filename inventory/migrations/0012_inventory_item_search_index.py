@@ -0,0 +1,81 @@
+# Creates the full-text search index used by the dashboard search box
+# (FTS5 virtual table on SQLite, tsvector + GIN table on PostgreSQL) and fills it from the
+# existing items.
+#
+# The DDL and backfill are frozen here as they were when the index was introduced, instead of
+# calling inventory/search.py: later changes to its SEARCH_COLUMNS need a migration of their own.
+#
+# Behaviour change: with the index, the dashboard search matches whole words and word prefixes
+# ('lap' finds 'Laptop', 'LAP-2507' finds 'LAP-2507-0001') but no longer arbitrary substrings
+# ('top' does not find 'Laptop'), and every word of the query must match somewhere in the item.
+# Backends without an index keep the old icontains search.
+
+from django.db import migrations
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_itemsearch USING fts5("
+    "item_name, uid_no, serial_number, category, status, location, project, cpu, gpu, os, "
+    "description, installed_software, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+SQLITE_BACKFILL = (
+    "INSERT INTO inventory_itemsearch (rowid, item_name, uid_no, serial_number, category, status, "
+    "location, project, cpu, gpu, os, description, installed_software) "
+    "SELECT i.id, i.item_name, i.uid_no, i.serial_number, i.category, i.status, l.name, p.name, "
+    "i.cpu, i.gpu, i.os, i.description, i.installed_software "
+    "FROM inventory_inventoryitem i "
+    "LEFT JOIN inventory_location l ON l.id = i.location_id "
+    "LEFT JOIN inventory_project p ON p.id = i.project_id"
+)
+
+POSTGRESQL_CREATE = [
+    "CREATE TABLE IF NOT EXISTS inventory_itemsearch ("
+    "item_id bigint PRIMARY KEY REFERENCES inventory_inventoryitem(id) ON DELETE CASCADE "
+    "DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS inventory_itemsearch_document_gin ON inventory_itemsearch USING GIN (document)",
+]
+POSTGRESQL_BACKFILL = (
+    "INSERT INTO inventory_itemsearch (item_id, document) SELECT i.id, "
+    "setweight(to_tsvector('simple', coalesce(i.item_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(i.uid_no, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(i.serial_number, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(i.category, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(i.status, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(l.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(p.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(i.cpu, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(i.gpu, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(i.os, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(i.description, '')), 'D') || "
+    "setweight(to_tsvector('simple', coalesce(i.installed_software, '')), 'D') "
+    "FROM inventory_inventoryitem i "
+    "LEFT JOIN inventory_location l ON l.id = i.location_id "
+    "LEFT JOIN inventory_project p ON p.id = i.project_id"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_BACKFILL)
+        schema_editor.execute("INSERT INTO inventory_itemsearch(inventory_itemsearch) VALUES ('optimize')")
+    elif vendor == 'postgresql':
+        for statement in POSTGRESQL_CREATE:
+            schema_editor.execute(statement)
+        schema_editor.execute(POSTGRESQL_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS inventory_itemsearch")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_alter_inventoryitem_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
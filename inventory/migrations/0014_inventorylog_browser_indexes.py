@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_inventoryitem_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['timestamp'], name='inv_log_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['uid_no', 'timestamp'], name='inv_log_uid_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['action', 'timestamp'], name='inv_log_action_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['item', 'timestamp'], name='inv_log_item_timestamp_idx'),
+        ),
+    ]
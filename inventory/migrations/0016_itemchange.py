@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 17:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_inventorylog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=50)),
+                ('old_value', models.TextField(blank=True, null=True)),
+                ('new_value', models.TextField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='changes', to='inventory.inventoryitem')),
+                ('log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='changes', to='inventory.inventorylog')),
+            ],
+            options={
+                'verbose_name': 'Item Change',
+                'verbose_name_plural': 'Item Changes',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='itemchange',
+            index=models.Index(fields=['field', 'timestamp'], name='inv_change_field_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemchange',
+            index=models.Index(fields=['item', 'field'], name='inv_change_item_field_idx'),
+        ),
+    ]
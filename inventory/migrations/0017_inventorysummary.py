@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 17:49
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_summary(apps, schema_editor):
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    InventorySummary = apps.get_model('inventory', 'InventorySummary')
+    rows = []
+    for dimension, attr in (('status', 'status'), ('category', 'category'),
+                            ('location', 'location_id'), ('project', 'project_id')):
+        for row in InventoryItem.objects.order_by().values(attr).annotate(items=Count('id'), quantity=Sum('quantity')):
+            rows.append(InventorySummary(dimension=dimension, key='' if row[attr] is None else str(row[attr]),
+                                         item_count=row['items'], quantity_total=row['quantity'] or 0))
+    InventorySummary.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_itemchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'Status'), ('category', 'Category'), ('location', 'Location'), ('project', 'Project')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=100)),
+                ('item_count', models.IntegerField(default=0)),
+                ('quantity_total', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Inventory Summary',
+                'verbose_name_plural': 'Inventory Summaries',
+                'ordering': ['dimension', 'key'],
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0019_inventoryitem_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventoryitem',
+            name='document',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='documents/'),
+        ),
+        migrations.AlterField(
+            model_name='inventoryitem',
+            name='image',
+            field=models.ImageField(blank=True, max_length=255, null=True, upload_to='images/'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Single-column foreign key indexes now covered by the (item, timestamp) and (user, timestamp)
+# indexes, under the names Django generated for them. Dropped with plain SQL: an
+# AlterField(db_index=False) makes SQLite copy the whole log table. (SQLite/PostgreSQL syntax.)
+COVERED_INDEXES = (
+    ('inventory_inventorylog_item_id_542bde0d', 'item_id'),
+    ('inventory_inventorylog_user_id_d5a3e916', 'user_id'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0020_inventoryitem_file_name_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['-created_at', 'item_name'], name='inv_item_default_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['serial_number'], name='inv_item_serial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['user', 'timestamp'], name='inv_log_user_timestamp_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='inventorylog',
+                    name='item',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='logs', to='inventory.inventoryitem'),
+                ),
+                migrations.AlterField(
+                    model_name='inventorylog',
+                    name='user',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql=f'DROP INDEX "{name}"',
+                    reverse_sql=f'CREATE INDEX "{name}" ON "inventory_inventorylog" ("{column}")',
+                )
+                for name, column in COVERED_INDEXES
+            ],
+        ),
+    ]
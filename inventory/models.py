@@ -5,9 +5,11 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 import uuid # While imported, it's not directly used for UID generation in the current logic.
              # You might remove it if not used elsewhere, or keep it if future plans involve UUIDs.
-from django.db import transaction # Essential for atomic operations in UID generation
+from django.db import IntegrityError, connections, router, transaction # Essential for atomic operations in UID generation
 from django.db.models import F # Essential for atomic increments in UID generation
 
+from . import pagecache, search, thumbnails
+
 class Location(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
@@ -33,12 +35,69 @@ class Project(models.Model):
     def __str__(self):
         return self.name
 
+class UIDCategorySequenceManager(models.Manager):
+    def reserve_block(self, category_prefix, year_month, count=1):
+        """
+        Reserves `count` consecutive sequence numbers for a category-month and returns the first one.
+        The whole block is claimed with a single UPDATE, so the hot sequence row is locked once per
+        block instead of once per item.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        with transaction.atomic(using=self.db):
+            # Write before reading: on SQLite a read first would take a shared lock that
+            # can't be upgraded while another process is reserving, failing with "database is locked".
+            last_sequence_number = self._increment(category_prefix, year_month, count)
+            if last_sequence_number is None:
+                # First UID of this category-month: create the counter row already holding the block.
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(category_prefix=category_prefix, year_month=year_month,
+                                    last_sequence_number=count)
+                    last_sequence_number = count
+                except IntegrityError:
+                    # Another process created the row first; bump theirs instead.
+                    last_sequence_number = self._increment(category_prefix, year_month, count)
+        return last_sequence_number - count + 1
+
+    def _increment(self, category_prefix, year_month, count):
+        """Adds `count` to the counter row and returns its new value, or None if the row doesn't exist."""
+        connection = connections[self.db]
+        if supports_update_returning(connection):
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET last_sequence_number = last_sequence_number + %s "
+                    f"WHERE category_prefix = %s AND year_month = %s RETURNING last_sequence_number",
+                    [count, category_prefix, year_month],
+                )
+                row = cursor.fetchone()
+            return row[0] if row else None
+
+        # The UPDATE holds the row lock until commit, so the read-back is ours alone.
+        sequence = self.filter(category_prefix=category_prefix, year_month=year_month)
+        if not sequence.update(last_sequence_number=F('last_sequence_number') + count):
+            return None
+        return sequence.values_list('last_sequence_number', flat=True).get()
+
+
+def supports_update_returning(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35, 0)
+    return False
+
+
 # NEW MODEL: UIDCategorySequence for managing sequential UIDs per category-month
 class UIDCategorySequence(models.Model):
     category_prefix = models.CharField(max_length=10) # e.g., 'LAP', 'MON'
     year_month = models.CharField(max_length=4) # 'YYMM', e.g., '2507'
     last_sequence_number = models.PositiveIntegerField(default=0)
 
+    objects = UIDCategorySequenceManager()
+
     class Meta:
         # Ensures that for a given category and month, there's only one sequence counter
         unique_together = ('category_prefix', 'year_month')
@@ -49,6 +108,85 @@ class UIDCategorySequence(models.Model):
         return f"{self.category_prefix}-{self.year_month} (Last Seq: {self.last_sequence_number})"
 
 
+class VersionConflict(Exception):
+    """An item changed since the version a write was based on; nothing was written."""
+
+    def __init__(self, item, expected):
+        self.item = item
+        self.expected = expected
+        super().__init__(f"Item {item.uid_no or item.pk} was changed by someone else since version {expected}.")
+
+
+class InventoryItemManager(models.Manager):
+    def build_units(self, template, count):
+        """
+        Returns `count` unsaved copies of `template` (without UIDs).
+        Uploaded files are committed once on the template and shared by every copy.
+        """
+        values = {}
+        for field in self.model._meta.concrete_fields:
+            if field.primary_key or field.name in ('uid_no', 'created_at', 'updated_at'):
+                continue
+            value = getattr(template, field.attname)
+            if isinstance(field, models.FileField):
+                if value and not value._committed:
+                    value.save(value.name, value.file, save=False)
+                value = value.name if value else None
+            values[field.attname] = value
+        return [self.model(**values) for _ in range(count)]
+
+    def bulk_create_with_uids(self, items, user=None, batch_size=500):
+        """
+        Inserts new items with bulk_create, assigning UIDs from one reserved block per category,
+        and writes an 'added' InventoryLog row for each of them.
+        """
+        items = list(items)
+        if not items:
+            return items
+
+        year_month = timezone.now().strftime('%y%m')
+        by_prefix = {}
+        for item in items:
+            by_prefix.setdefault(item.category_prefix, []).append(item)
+
+        with transaction.atomic(using=self.db):
+            for category_prefix, group in by_prefix.items():
+                first = UIDCategorySequence.objects.db_manager(self.db).reserve_block(
+                    category_prefix, year_month, len(group)
+                )
+                for offset, item in enumerate(group):
+                    item.uid_no = InventoryItem.format_uid(category_prefix, year_month, first + offset)
+
+            self.bulk_create(items, batch_size=batch_size)
+
+            # Backends that can't return ids from a bulk insert need one lookup by UID.
+            if any(item.pk is None for item in items):
+                pks = dict(self.filter(uid_no__in=[item.uid_no for item in items]).values_list('uid_no', 'pk'))
+                for item in items:
+                    item.pk = pks[item.uid_no]
+
+            # bulk_create skips post_save, so index the new rows for search and count them here.
+            search.index_items([item.pk for item in items])
+            from . import summary
+            summary.items_created(items)
+            pagecache.invalidate()
+            thumbnails.schedule(item.image.name for item in items if item.image)
+
+            # Logged in this transaction rather than through logsink (see its header).
+            log_user = user if user and user.is_authenticated else None
+            InventoryLog.objects.db_manager(self.db).bulk_create([
+                InventoryLog(
+                    item=item,
+                    user=log_user,
+                    uid_no=item.uid_no,
+                    action='added',
+                    details=f"New item '{item.item_name}' (UID: {item.uid_no}) with quantity {item.quantity} added.",
+                )
+                for item in items
+            ], batch_size=batch_size)
+        return items
+
+
 class InventoryItem(models.Model):
     # Define CATEGORY_CHOICES for mapping item types to prefixes
     CATEGORY_CHOICES = [
@@ -78,8 +216,11 @@ class InventoryItem(models.Model):
     ]
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='Available')
     description = models.TextField(blank=True, null=True)
-    document = models.FileField(upload_to='documents/', blank=True, null=True)
-    image = models.ImageField(upload_to='images/', blank=True, null=True)
+    # 255: content-addressed names (see storage.py) carry a 64-character hash directory.
+    document = models.FileField(upload_to='documents/', max_length=255, blank=True, null=True)
+    image = models.ImageField(upload_to='images/', max_length=255, blank=True, null=True)
+    # Downscaled copies of `image` and the image name they were made from (see thumbnails.py).
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True)
     quantity = models.PositiveIntegerField(default=1)
 
@@ -91,44 +232,108 @@ class InventoryItem(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by every write; an UPDATE only applies if the row still has the version the change
+    # was based on, so concurrent edits are detected instead of overwriting each other.
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         verbose_name = "Inventory Item"
         verbose_name_plural = "Inventory Items"
         # Optional: Order items by creation date or UID
         ordering = ['-created_at', 'item_name']
+        # (column, id) pairs back the dashboard's keyset pagination for each sortable column; the
+        # status/category ones also serve plain equality filters. QueryPlanTests guards this set.
+        indexes = [
+            models.Index(fields=['-created_at', 'item_name'], name='inv_item_default_order_idx'),  # Meta.ordering
+            models.Index(fields=['serial_number'], name='inv_item_serial_idx'),
+            models.Index(fields=['item_name', 'id'], name='inv_item_name_id_idx'),
+            models.Index(fields=['category', 'id'], name='inv_item_category_id_idx'),
+            models.Index(fields=['status', 'id'], name='inv_item_status_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='inv_item_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='inv_item_updated_id_idx'),
+        ]
+
+    objects = InventoryItemManager()
+
+    # Fields that place an item in the InventorySummary buckets (see summary.py).
+    SUMMARY_FIELDS = ('status', 'category', 'location_id', 'project_id', 'quantity')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the bucket fields as loaded, so a later save() can apply summary deltas without re-reading.
+        instance._summary_snapshot = instance.summary_state()
+        return instance
+
+    def summary_state(self):
+        """The SUMMARY_FIELDS values, or None if any of them is deferred."""
+        values = self.__dict__
+        if any(name not in values for name in self.SUMMARY_FIELDS):
+            return None
+        return {name: values[name] for name in self.SUMMARY_FIELDS}
+
+    def thumbnail_url(self, size):
+        """URL of a thumbnail of the current image, or of the original until one exists."""
+        if not self.image:
+            return ''
+        thumbs = self.thumbnails or {}
+        if thumbs.get('source') == self.image.name and thumbs.get(size):
+            return self.image.storage.url(thumbs[size])
+        return self.image.url
+
+    @property
+    def small_image_url(self):
+        return self.thumbnail_url('small')
+
+    @property
+    def medium_image_url(self):
+        return self.thumbnail_url('medium')
+
+    @property
+    def category_prefix(self):
+        # Use .get(key, default) for safe lookup
+        return dict(self.CATEGORY_CHOICES).get(self.category, 'OTH')
+
+    @staticmethod
+    def format_uid(category_prefix, year_month, sequence_number):
+        # Format the UID: [CATEGORY_PREFIX]-[YYMM]-[SEQUENCE_NUMBER], sequence padded with leading zeros (e.g., 0001)
+        return f"{category_prefix}-{year_month}-{str(sequence_number).zfill(4)}"
 
     # Override save method to auto-generate uid_no based on the defined protocol
     def save(self, *args, **kwargs):
         # Only generate uid_no if it's a new instance (pk is None) or if uid_no is explicitly empty
         if not self.pk or not self.uid_no:
-            current_date = timezone.now()
-            year_month = current_date.strftime('%y%m') # YYMM format (e.g., '2507')
-
-            # Get the category prefix based on the selected category
-            # Use .get(key, default) for safe lookup
-            category_prefix = dict(self.CATEGORY_CHOICES).get(self.category, 'OTH')
-
-            with transaction.atomic():
-                # Get or create the sequence object for this specific category and month
-                # select_for_update() locks the row to prevent race conditions during increment
-                sequence_obj, created = UIDCategorySequence.objects.select_for_update().get_or_create(
-                    category_prefix=category_prefix,
-                    year_month=year_month,
-                    defaults={'last_sequence_number': 0} # Initialize if new
-                )
-                
-                # Atomically increment the sequence number in the database
-                # Using F() expression ensures a race-condition-free increment directly in the DB
-                sequence_obj.last_sequence_number = F('last_sequence_number') + 1
-                sequence_obj.save(update_fields=['last_sequence_number']) # Optimize by only updating the changed field
-                sequence_obj.refresh_from_db() # Reload the object to get the updated value
+            year_month = timezone.now().strftime('%y%m') # YYMM format (e.g., '2507')
+            category_prefix = self.category_prefix
+
+            # Reserve a block of one; the increment happens in the database in a single statement.
+            sequence_number = UIDCategorySequence.objects.reserve_block(category_prefix, year_month)
+            self.uid_no = self.format_uid(category_prefix, year_month, sequence_number)
 
-                # Format the UID: [CATEGORY_PREFIX]-[YYMM]-[SEQUENCE_NUMBER]
-                sequence_number_padded = str(sequence_obj.last_sequence_number).zfill(4) # Pad with leading zeros (e.g., 0001)
-                self.uid_no = f"{category_prefix}-{year_month}-{sequence_number_padded}"
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Write version + 1 where the row is still at self.version (see _do_update).
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        self.version += 1
+        try:
+            # Its own savepoint, so a conflict leaves any surrounding transaction usable.
+            with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+                super().save(*args, **kwargs)
+        except BaseException:
+            self.version -= 1
+            raise
 
-        super().save(*args, **kwargs)
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if self._state.adding:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        expected = self.version - 1
+        if super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update):
+            return True
+        if base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict(self, expected)
+        return False  # deleted meanwhile: save() re-inserts it, as it always has
 
     def __str__(self):
         # Prefer uid_no if available, otherwise fall back to item_name
@@ -149,10 +354,13 @@ class InventoryLog(models.Model):
     # *** CRITICAL CORRECTION APPLIED HERE (as noted by you previously) ***
     # Changed on_delete to models.SET_NULL and added null=True, blank=True
     # This ensures log entries persist if the related InventoryItem is deleted.
-    item = models.ForeignKey(InventoryItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='logs')
+    # No single-column indexes on item/user: the (item, timestamp) and (user, timestamp) indexes below cover them.
+    item = models.ForeignKey(InventoryItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='logs',
+                             db_index=False)
     action = models.CharField(max_length=30, choices=ITEM_ACTION_CHOICES) # Increased max_length for new choices
-    timestamp = models.DateTimeField(auto_now_add=True)
-    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # default rather than auto_now_add, so records queued by the log sink keep the time of the action.
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
     details = models.TextField(blank=True, null=True)
     # uid_no is also nullable, to store the UID of a deleted item.
     # This is crucial for maintaining a reference to the item even after deletion.
@@ -167,10 +375,156 @@ class InventoryLog(models.Model):
         verbose_name = "Inventory Log"
         verbose_name_plural = "Inventory Logs"
         ordering = ['-timestamp'] # Order logs by most recent first
+        # Back the log browser's cursor pagination and its UID/action/item/user filters.
+        indexes = [
+            models.Index(fields=['timestamp'], name='inv_log_timestamp_idx'),
+            models.Index(fields=['uid_no', 'timestamp'], name='inv_log_uid_timestamp_idx'),
+            models.Index(fields=['action', 'timestamp'], name='inv_log_action_timestamp_idx'),
+            models.Index(fields=['item', 'timestamp'], name='inv_log_item_timestamp_idx'),
+            models.Index(fields=['user', 'timestamp'], name='inv_log_user_timestamp_idx'),
+        ]
 
     def __str__(self):
         # Use uid_no directly for __str__ if item is null (i.e., item has been deleted)
         # This makes the log entry meaningful even after the item is gone.
         item_identifier = self.uid_no if self.uid_no else (self.item.uid_no if self.item else 'Unknown Item')
         username = self.user.username if self.user else 'System'
-        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {item_identifier} - {self.action} by {username}"
\ No newline at end of file
+        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {item_identifier} - {self.action} by {username}"
+
+class ItemChangeQuerySet(models.QuerySet):
+    def for_item(self, item, field=None):
+        """Changes to one item, optionally to a single field (e.g. every location change)."""
+        changes = self.filter(item=item)
+        return changes.filter(field=field) if field else changes
+
+    def for_field(self, field, since=None, until=None):
+        """Changes to one field across all items (e.g. all status changes last month)."""
+        changes = self.filter(field=field)
+        if since:
+            changes = changes.filter(timestamp__gte=since)
+        if until:
+            changes = changes.filter(timestamp__lt=until)
+        return changes
+
+
+class ItemChange(models.Model):
+    """One field's old -> new value, written alongside the InventoryLog entry for an edit or transfer."""
+    item = models.ForeignKey(InventoryItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='changes')
+    # SET_NULL so the structured history outlives archived or pruned log rows.
+    log = models.ForeignKey(InventoryLog, on_delete=models.SET_NULL, null=True, blank=True, related_name='changes')
+    field = models.CharField(max_length=50)
+    # Display values, as shown in the log details (location/project names rather than ids).
+    old_value = models.TextField(blank=True, null=True)
+    new_value = models.TextField(blank=True, null=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    objects = ItemChangeQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Item Change"
+        verbose_name_plural = "Item Changes"
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['field', 'timestamp'], name='inv_change_field_ts_idx'),
+            models.Index(fields=['item', 'field'], name='inv_change_item_field_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.field}: {self.old_value!r} -> {self.new_value!r}"
+
+    @classmethod
+    def for_log(cls, log, changes):
+        """Unsaved rows for `changes` [(field, old, new), ...] belonging to a saved log entry."""
+        return [
+            cls(item_id=log.item_id, log_id=log.pk, field=field, old_value=old, new_value=new, timestamp=log.timestamp)
+            for field, old, new in changes
+        ]
+
+
+class LogArchive(models.Model):
+    """
+    Manifest of one month of InventoryLog rows moved to a gzip JSONL file (see archive.py).
+    `size` is the file length committed together with the deletion of the archived rows;
+    anything past it was written by a run that didn't finish and is ignored.
+    """
+    month = models.DateField(unique=True, help_text="First day of the archived month (UTC).")
+    file_name = models.CharField(max_length=255)
+    rows = models.PositiveIntegerField(default=0)
+    size = models.BigIntegerField(default=0)
+    first_timestamp = models.DateTimeField(null=True, blank=True)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Log Archive"
+        verbose_name_plural = "Log Archives"
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.rows} entries ({self.file_name})"
+
+
+class InventorySummary(models.Model):
+    """
+    Item count and quantity total per bucket (status, category, location or project), kept
+    current by inventory/summary.py so the dashboard panel never runs GROUP BY over the items.
+    """
+    DIMENSION_CHOICES = [
+        ('status', 'Status'),
+        ('category', 'Category'),
+        ('location', 'Location'),
+        ('project', 'Project'),
+    ]
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    # The status/category value, or the location/project id; '' for items without one.
+    key = models.CharField(max_length=100, blank=True)
+    item_count = models.IntegerField(default=0)
+    quantity_total = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Inventory Summary"
+        verbose_name_plural = "Inventory Summaries"
+        unique_together = ('dimension', 'key')
+        ordering = ['dimension', 'key']
+
+    def __str__(self):
+        return f"{self.dimension}={self.key or '-'}: {self.item_count} items, {self.quantity_total} units"
+
+
+class CacheGenerationManager(models.Manager):
+    def current(self, name):
+        """The generation number of `name`; 0 until it is first bumped."""
+        return self.filter(name=name).values_list('value', flat=True).first() or 0
+
+    async def acurrent(self, name):
+        return await self.filter(name=name).values_list('value', flat=True).afirst() or 0
+
+    def bump(self, name):
+        """Moves `name` to a new generation, invalidating whatever was cached under the old one."""
+        # A single UPDATE once the row exists: this runs inside every inventory write.
+        if self.filter(name=name).update(value=F('value') + 1):
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(name=name, value=1)
+        except IntegrityError:
+            # Created concurrently; bump that row instead.
+            self.filter(name=name).update(value=F('value') + 1)
+
+
+class CacheGeneration(models.Model):
+    """
+    A counter shared by every worker process. In-process caches remember the generation they
+    were filled at and reload once it has moved on.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    objects = CacheGenerationManager()
+
+    class Meta:
+        verbose_name = "Cache Generation"
+        verbose_name_plural = "Cache Generations"
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
@@ -0,0 +1,128 @@
+# inventory_management/inventory/pagecache.py
+#
+# Rendered-page cache for the read-heavy views (dashboard, item details). Pages are cached per
+# user, query string and inventory generation: every write to items, locations, projects or item
+# log entries bumps the 'inventory' CacheGeneration row, so the next request of any worker looks
+# for a new key and re-renders. Views can add their own stamp to the key (item_details adds the
+# item's updated_at). Configured by settings.INVENTORY_PAGE_CACHE:
+#
+#   'ENABLED': False turns @cached_page into a pass-through
+#   'CACHE':   the settings.CACHES alias pages are stored in (share it between workers, e.g.
+#              Redis or memcached, to share pages and hit counters too)
+#   'TIMEOUT': seconds a page is kept; stale generations simply expire
+#
+# Requests with pending flash messages or without a CSRF cookie are rendered normally and not
+# stored: those pages differ per request. Responses carry X-Page-Cache: hit/miss/bypass and the
+# counters are readable through stats().
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.http import HttpResponse
+
+GENERATION = 'inventory'
+OUTCOMES = ('hits', 'misses', 'bypassed')
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+_views = []
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_PAGE_CACHE', {})}
+
+
+def invalidate():
+    """Moves every cached page to a stale generation; call it inside the writing transaction."""
+    from .models import CacheGeneration
+
+    CacheGeneration.objects.bump(GENERATION)
+
+
+def _cache():
+    return caches[get_config()['CACHE']]
+
+
+def _count(name, outcome):
+    cache = _cache()
+    key = f'inventory:pagecache:{name}:{outcome}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass  # evicted between add() and incr(); one lost count
+
+
+def stats():
+    """{view name: {'hits': n, 'misses': n, 'bypassed': n, 'hit_rate': fraction or None}}."""
+    cache = _cache()
+    report = {}
+    for name in _views:
+        counts = {outcome: cache.get(f'inventory:pagecache:{name}:{outcome}', 0) for outcome in OUTCOMES}
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / lookups, 3) if lookups else None
+        report[name] = counts
+    return report
+
+
+def _cacheable(request):
+    return (request.method in ('GET', 'HEAD') and request.user.is_authenticated
+            and settings.CSRF_COOKIE_NAME in request.COOKIES and not len(messages.get_messages(request)))
+
+
+def _key(name, generation, request, stamp):
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    # Pages embed a CSRF token derived from the cookie's secret: don't share them across browsers.
+    csrf = request.COOKIES[settings.CSRF_COOKIE_NAME]
+    digest = hashlib.sha1(f'{query}|{csrf}|{stamp}'.encode()).hexdigest()
+    return f'inventory:page:{name}:{generation}:{request.user.pk}:{digest}'
+
+
+def cached_page(name, stamp=None):
+    """
+    Caches the view's rendered 200 responses. `stamp(request, *args, **kwargs)` adds a value to the
+    key; when it returns None the request is passed through uncached (e.g. the item doesn't exist).
+    """
+    if name not in _views:
+        _views.append(name)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            from .models import CacheGeneration
+
+            config = get_config()
+            if not config['ENABLED']:
+                return view_func(request, *args, **kwargs)
+            cacheable = _cacheable(request)
+            extra = stamp(request, *args, **kwargs) if cacheable and stamp else ''
+            if not cacheable or extra is None:
+                _count(name, 'bypassed')
+                response = view_func(request, *args, **kwargs)
+                response['X-Page-Cache'] = 'bypass'
+                return response
+
+            cache = caches[config['CACHE']]
+            key = _key(name, CacheGeneration.objects.current(GENERATION), request, extra)
+            cached = cache.get(key)
+            if cached is not None:
+                _count(name, 'hits')
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Page-Cache'] = 'hit'
+                return response
+
+            _count(name, 'misses')
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, (response.content, response['Content-Type']), config['TIMEOUT'])
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,210 @@
+# inventory_management/inventory/pagination.py
+#
+# Count-free pagination for large listings. KeysetPaginator seeks on (sort column, id)
+# instead of OFFSET, so every page costs the same; estimated_count() stands in for the
+# COUNT(*) that Django's Paginator runs on every request.
+
+import base64
+import json
+
+from django.db import connections
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk, direction):
+    payload = json.dumps([value, pk, direction], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed pagination cursor.")
+    if direction not in ('next', 'prev') or not isinstance(pk, int):
+        raise InvalidCursor("Malformed pagination cursor.")
+    return value, pk, direction
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Pages through `queryset` (model instances or .values() rows) ordered by `ordering` (a field
+    name, '-' prefix for descending) with the primary key as tie-breaker. The sort column must be non-nullable and should
+    have a composite (column, id) index.
+    """
+
+    def __init__(self, queryset, per_page=10, ordering='item_name'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+
+    def _seek(self, queryset, value, pk, forward):
+        # Moving forward through a descending list means going to smaller keys, and vice versa.
+        greater = forward != self.descending
+        op = 'gt' if greater else 'lt'
+        # "col >= v AND (col > v OR id > pk)" rather than the plain OR: the leading range
+        # lets the database seek into the (col, id) index instead of scanning it from the start.
+        queryset = queryset.filter(
+            Q(**{f'{self.field_name}__{op}e': value}),
+            Q(**{f'{self.field_name}__{op}': value}) | Q(**{f'pk__{op}': pk}),
+        )
+        ordering = [self.field_name, 'pk'] if greater else [f'-{self.field_name}', '-pk']
+        return queryset.order_by(*ordering)
+
+    def _cursor_for(self, obj, direction):
+        if isinstance(obj, dict):
+            # .values() rows: the query must select the sort column and the primary key.
+            value, pk = obj[self.field.attname], obj[self.queryset.model._meta.pk.attname]
+        else:
+            value, pk = getattr(obj, self.field.attname), obj.pk
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return encode_cursor(value, pk, direction)
+
+    def _window(self, cursor):
+        """(unevaluated slice holding the page plus one lookahead row, whether it runs forward)."""
+        if cursor:
+            raw_value, pk, direction = decode_cursor(cursor)
+            try:
+                value = self.field.to_python(raw_value)
+            except Exception:
+                raise InvalidCursor("Pagination cursor doesn't match the sort column.")
+            forward = direction == 'next'
+            queryset = self._seek(self.queryset, value, pk, forward)
+        else:
+            forward = True
+            ordering = [f'-{self.field_name}', '-pk'] if self.descending else [self.field_name, 'pk']
+            queryset = self.queryset.order_by(*ordering)
+        # Fetch one extra row to learn whether another page exists, without counting.
+        return queryset[:self.per_page + 1], forward
+
+    def _page(self, rows, forward, cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return KeysetPage([])
+
+        if forward:
+            next_cursor = self._cursor_for(rows[-1], 'next') if has_more else None
+            previous_cursor = self._cursor_for(rows[0], 'prev') if cursor else None
+        else:
+            next_cursor = self._cursor_for(rows[-1], 'next')
+            previous_cursor = self._cursor_for(rows[0], 'prev') if has_more else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        window, forward = self._window(cursor)
+        return self._page(list(window), forward, cursor)
+
+    async def apage(self, cursor=None):
+        """page() for async views, fetching the rows through the async ORM."""
+        window, forward = self._window(cursor)
+        return self._page([row async for row in window], forward, cursor)
+
+
+class LookaheadPage:
+    """Numbered page for orderings keyset can't seek on (e.g. search relevance); never counts."""
+
+    def __init__(self, queryset, number, per_page=10, rows=None):
+        self.number = max(number, 1)
+        if rows is None:
+            rows = list(self.window(queryset, self.number, per_page))
+        self.has_next = len(rows) > per_page
+        self.has_previous = self.number > 1
+        self.object_list = rows[:per_page]
+
+    @staticmethod
+    def window(queryset, number, per_page):
+        start = (max(number, 1) - 1) * per_page
+        return queryset[start:start + per_page + 1]
+
+    @classmethod
+    async def afetch(cls, queryset, number, per_page=10):
+        """A page fetched through the async ORM, for async views."""
+        rows = [row async for row in cls.window(queryset, number, per_page)]
+        return cls(queryset, number, per_page, rows)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CountEstimate:
+    def __init__(self, value, approximate=False, lower_bound=False):
+        self.value = value
+        self.approximate = approximate
+        self.lower_bound = lower_bound
+
+    def __str__(self):
+        if self.lower_bound:
+            return f"{self.value:,}+"
+        if self.approximate:
+            return f"~{self.value:,}"
+        return f"{self.value:,}"
+
+
+def _table_row_estimate(model, using):
+    """Row count from the planner's statistics, or None when the table hasn't been analyzed."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if not cursor.fetchone():
+                return None
+            # The first number of any stat row for the table is its row count.
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
+
+
+def estimated_count(queryset, cap=1000):
+    """
+    Cheap stand-in for queryset.count(): planner statistics for an unfiltered table,
+    otherwise a count that stops at `cap` rows.
+    """
+    if not queryset.query.where:
+        estimate = _table_row_estimate(queryset.model, queryset.db)
+        if estimate is not None and estimate > cap:
+            return CountEstimate(estimate, approximate=True)
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return CountEstimate(cap, lower_bound=True)
+    return CountEstimate(count)
@@ -0,0 +1,160 @@
+# inventory_management/inventory/querybudget.py
+#
+# Per-request query accounting. When enabled, QueryBudgetMiddleware wraps every database
+# connection for the duration of a request and records each query's SQL fingerprint and
+# duration. Configured by settings.INVENTORY_QUERY_BUDGET:
+#
+#   'ENABLED':    turn the middleware on (it is a pass-through otherwise)
+#   'N_PLUS_ONE': a fingerprint executed at least this many times in one request is reported
+#                 as a likely N+1 (a query issued inside a loop)
+#   'BUDGETS':    {'inventory:dashboard': 20, ...} query budgets by URL name; views can also
+#                 declare one with the @query_budget(n) decorator, which wins over the setting
+#   'RAISE':      raise QueryBudgetExceeded when a view goes over its budget (used by the test
+#                 suite so a regression fails the test that exercises the view)
+#
+# Every request gets X-Query-Count / X-Query-Time-Ms headers (plus X-Query-Budget and
+# X-Query-Repeated when relevant) and one JSON line on the 'inventory.querybudget' logger.
+# Queries run while a StreamingHttpResponse is being consumed happen after the middleware
+# returns and are not counted.
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'N_PLUS_ONE': 5,
+    'BUDGETS': {},
+    'RAISE': False,
+}
+
+# "IN (%s, %s, %s)" -> "IN (...)" so the same lookup over different id lists shares a fingerprint;
+# numeric literals (LIMIT 21, OFFSET 50) are folded the same way.
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its declared budget (only raised when 'RAISE' is set)."""
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_QUERY_BUDGET', {})}
+
+
+def query_budget(limit):
+    """Declares the most queries a view may run per request. Apply above @login_required."""
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+def fingerprint(sql):
+    return _NUMBER.sub('N', _IN_LIST.sub('IN (...)', sql))
+
+
+class QueryRecorder:
+    """execute_wrapper callable collecting per-fingerprint counts and total database time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        """(fingerprint, times) for every statement executed at least `threshold` times."""
+        return [(sql, times) for sql, times in self.fingerprints.most_common() if times >= threshold]
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        config = get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+        return self.measure(request, self.get_response, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return await self.get_response(request)
+        # Connections are per thread, and the async ORM runs a request's queries in that request's
+        # sync thread: record from there, as Django would for a sync-only middleware.
+        return await sync_to_async(self.measure)(request, async_to_sync(self.get_response), config)
+
+    def measure(self, request, get_response, config):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = get_response(request)
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        budget = getattr(request, '_query_budget', None)
+        if budget is None:
+            budget = config['BUDGETS'].get(view_name)
+        repeated = recorder.repeated(config['N_PLUS_ONE'])
+        over_budget = budget is not None and recorder.count > budget
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time-Ms'] = f"{recorder.duration * 1000:.1f}"
+        if budget is not None:
+            response['X-Query-Budget'] = str(budget)
+        if repeated:
+            # Short hashes keep the header small; the log line carries the SQL itself.
+            response['X-Query-Repeated'] = ', '.join(
+                f"{hashlib.sha1(sql.encode()).hexdigest()[:8]}*{times}" for sql, times in repeated)
+
+        record = {
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_time_ms': round(recorder.duration * 1000, 1),
+            'budget': budget,
+            'repeated': [{'sql': sql[:300], 'times': times} for sql, times in repeated],
+        }
+        level = logging.WARNING if (over_budget or repeated) else logging.DEBUG
+        logger.log(level, json.dumps(record), extra={'query_budget': record})
+
+        if over_budget and config['RAISE']:
+            raise QueryBudgetExceeded(
+                f"{view_name or request.path} ran {recorder.count} queries (budget {budget}); "
+                f"most repeated: {recorder.fingerprints.most_common(3)}")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = getattr(view_func, 'query_budget', None)
+        if budget is not None:
+            request._query_budget = budget
+        return None
@@ -0,0 +1,73 @@
+# inventory_management/inventory/refdata.py
+#
+# Per-process cache of the reference tables (locations and projects). They change rarely but
+# feed every dashboard render and every item/filter/transfer form, which used to evaluate
+# Location.objects.all() and Project.objects.all() again each time.
+#
+# Every Location/Project save or delete bumps the 'refdata' CacheGeneration row (see signals.py)
+# and drops this process's copy. Other workers compare their copy's generation with that row at
+# most once every settings.INVENTORY_REFDATA_CHECK_INTERVAL seconds and reload when it moved, so
+# they pick up a change within that interval. The cached model instances are shared between
+# requests: read them, don't modify them.
+
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import CacheGeneration, Location, Project
+
+GENERATION = 'refdata'
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+class Snapshot:
+    def __init__(self, generation):
+        self.generation = generation
+        self.locations = tuple(Location.objects.all())
+        self.projects = tuple(Project.objects.all())
+        self.location_by_pk = {location.pk: location for location in self.locations}
+        self.project_by_pk = {project.pk: project for project in self.projects}
+
+
+def get():
+    """The current Snapshot, reloading it if another process changed the reference tables."""
+    global _snapshot, _checked_at
+    interval = getattr(settings, 'INVENTORY_REFDATA_CHECK_INTERVAL', 2.0)
+    with _lock:
+        now = time.monotonic()
+        if _snapshot is not None and now - _checked_at < interval:
+            return _snapshot
+        generation = CacheGeneration.objects.current(GENERATION)
+        if _snapshot is None or _snapshot.generation != generation:
+            _snapshot = Snapshot(generation)
+        _checked_at = now
+        return _snapshot
+
+
+async def aget():
+    """get() for async views: answers from the event loop until the copy is due for a check."""
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < getattr(settings, 'INVENTORY_REFDATA_CHECK_INTERVAL', 2.0):
+        return snapshot
+    return await sync_to_async(get)()
+
+
+def locations():
+    return get().locations
+
+
+def projects():
+    return get().projects
+
+
+def invalidate():
+    """Called when a location or project changes: bump the shared generation, drop our copy."""
+    global _snapshot
+    CacheGeneration.objects.bump(GENERATION)
+    with _lock:
+        _snapshot = None
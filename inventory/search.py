@@ -0,0 +1,169 @@
+# inventory_management/inventory/search.py
+#
+# Full-text index over InventoryItem used by the dashboard search box.
+# SQLite keeps an FTS5 virtual table keyed by item id (rowid); PostgreSQL keeps a
+# tsvector table with a GIN index. Other backends fall back to the icontains chain.
+#
+# With an index, a search matches word prefixes, not substrings: every word of the query has
+# to start a word somewhere in the item ('dell lat' finds "Dell Latitude", 'top' doesn't find
+# "Laptop"). The tables are created by migration 0012, which has its own copy of the columns
+# below; changing SEARCH_COLUMNS needs a migration that recreates the table, then rebuild().
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_TABLE = 'inventory_itemsearch'
+
+# Indexed columns, in FTS5 column order, with their bm25/setweight importance.
+# (column, SQL expression over the joined item/location/project rows, weight)
+SEARCH_COLUMNS = [
+    ('item_name', 'i.item_name', 10.0, 'A'),
+    ('uid_no', 'i.uid_no', 10.0, 'A'),
+    ('serial_number', 'i.serial_number', 8.0, 'A'),
+    ('category', 'i.category', 4.0, 'B'),
+    ('status', 'i.status', 2.0, 'B'),
+    ('location', 'l.name', 4.0, 'B'),
+    ('project', 'p.name', 4.0, 'B'),
+    ('cpu', 'i.cpu', 2.0, 'C'),
+    ('gpu', 'i.gpu', 2.0, 'C'),
+    ('os', 'i.os', 2.0, 'C'),
+    ('description', 'i.description', 1.0, 'D'),
+    ('installed_software', 'i.installed_software', 1.0, 'D'),
+]
+
+_SOURCE_SQL = (
+    "FROM inventory_inventoryitem i "
+    "LEFT JOIN inventory_location l ON l.id = i.location_id "
+    "LEFT JOIN inventory_project p ON p.id = i.project_id"
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_ID_CHUNK = 500
+
+
+def is_supported(using=connection):
+    return using.vendor in ('sqlite', 'postgresql')
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), _ID_CHUNK):
+        yield ids[start:start + _ID_CHUNK]
+
+
+def _insert_sql(where):
+    if connection.vendor == 'sqlite':
+        columns = ', '.join(name for name, _, _, _ in SEARCH_COLUMNS)
+        expressions = ', '.join(expression for _, expression, _, _ in SEARCH_COLUMNS)
+        return f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) SELECT i.id, {expressions} {_SOURCE_SQL} {where}"
+    document = ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({expression}, '')), '{weight}')"
+        for _, expression, _, weight in SEARCH_COLUMNS
+    )
+    return (
+        f"INSERT INTO {SEARCH_TABLE} (item_id, document) SELECT i.id, {document} {_SOURCE_SQL} {where} "
+        f"ON CONFLICT (item_id) DO UPDATE SET document = EXCLUDED.document"
+    )
+
+
+def _key_column():
+    return 'rowid' if connection.vendor == 'sqlite' else 'item_id'
+
+
+def index_items(item_ids):
+    """(Re)indexes the given item ids; call after any write that bypasses save()."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(item_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            if connection.vendor == 'sqlite':
+                # FTS5 has no upsert, so replace the rows outright.
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", chunk)
+            cursor.execute(_insert_sql(f"WHERE i.id IN ({placeholders})"), chunk)
+
+
+def remove_items(item_ids):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(item_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {_key_column()} IN ({placeholders})", chunk)
+
+
+def rebuild():
+    """Drops every index row and re-creates them from the inventory tables. Returns the row count."""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(_insert_sql(''))
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def build_match_query(text):
+    """
+    Turns free text into an AND of prefix terms, so 'dell lat' and 'LAP-2507' behave
+    like the old icontains search on word starts. Returns '' if there is nothing to match.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if connection.vendor == 'sqlite':
+        return ' AND '.join(f'"{token}"*' for token in tokens)
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def legacy_filter(search_query):
+    """The original OR-of-icontains predicate; used on backends without a search index."""
+    return (
+        Q(item_name__icontains=search_query) |
+        Q(uid_no__icontains=search_query) |
+        Q(serial_number__icontains=search_query) |
+        Q(description__icontains=search_query) |
+        Q(location__name__icontains=search_query) |
+        Q(project__name__icontains=search_query) |
+        Q(category__icontains=search_query) |
+        Q(cpu__icontains=search_query) |
+        Q(gpu__icontains=search_query) |
+        Q(os__icontains=search_query) |
+        Q(installed_software__icontains=search_query) |
+        Q(status__icontains=search_query)
+    )
+
+
+def search(queryset, search_query):
+    """
+    Filters an InventoryItem queryset down to matches for `search_query`, ordered by relevance
+    (best first, then item name). Adds a `search_rank` attribute where an index is available.
+    """
+    if not is_supported():
+        return queryset.filter(legacy_filter(search_query)).distinct()
+
+    match = build_match_query(search_query)
+    if not match:
+        return queryset.none()
+
+    item_table = queryset.model._meta.db_table
+    if connection.vendor == 'sqlite':
+        weights = ', '.join(str(weight) for _, _, weight, _ in SEARCH_COLUMNS)
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f"{SEARCH_TABLE}.rowid = {item_table}.id", f"{SEARCH_TABLE} MATCH %s"],
+            params=[match],
+            # bm25() is lower-is-better
+            select={'search_rank': f"bm25({SEARCH_TABLE}, {weights})"},
+        ).order_by('search_rank', 'item_name', 'id')
+
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f"{SEARCH_TABLE}.item_id = {item_table}.id",
+               f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s)"],
+        params=[match],
+        select={'search_rank': f"-ts_rank({SEARCH_TABLE}.document, to_tsquery('simple', %s))"},
+        select_params=[match],
+    ).order_by('search_rank', 'item_name', 'id')
@@ -0,0 +1,110 @@
+# inventory_management/inventory/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import pagecache, refdata, search, summary, thumbnails
+from .models import InventoryItem, InventoryLog, Location, Project
+
+
+# --- Keep the full-text search index in step with the inventory tables ---
+
+@receiver(post_save, sender=InventoryItem)
+def index_saved_item(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_items([instance.pk])
+
+
+@receiver(post_delete, sender=InventoryItem)
+def unindex_deleted_item(sender, instance, **kwargs):
+    search.remove_items([instance.pk])
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Project)
+def reindex_renamed_reference(sender, instance, created=False, raw=False, **kwargs):
+    # Location/project names are indexed with each item, so a rename touches their items.
+    if created or raw:
+        return
+    field = 'location' if sender is Location else 'project'
+    search.index_items(InventoryItem.objects.filter(**{field: instance}).values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Location)
+@receiver(pre_delete, sender=Project)
+def remember_referencing_items(sender, instance, **kwargs):
+    field = 'location' if sender is Location else 'project'
+    instance._search_item_ids = list(InventoryItem.objects.filter(**{field: instance}).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Project)
+def reindex_orphaned_items(sender, instance, **kwargs):
+    # SET_NULL has cleared the FK on these items by now; re-index them without the old name.
+    search.index_items(getattr(instance, '_search_item_ids', []))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Project)
+def invalidate_reference_cache(sender, instance, raw=False, **kwargs):
+    refdata.invalidate()
+
+
+# --- Incremental InventorySummary counters ---
+
+@receiver(pre_save, sender=InventoryItem)
+def capture_summary_state(sender, instance, raw=False, **kwargs):
+    # Instances loaded with .only()/.defer() have no snapshot of their old buckets yet.
+    if not raw and not instance._state.adding and getattr(instance, '_summary_snapshot', None) is None:
+        instance._summary_snapshot = summary.load_state(instance)
+
+
+@receiver(post_save, sender=InventoryItem)
+def count_saved_item(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        summary.item_saved(instance, created)
+
+
+@receiver(post_delete, sender=InventoryItem)
+def uncount_deleted_item(sender, instance, **kwargs):
+    summary.item_deleted(instance)
+
+
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Project)
+def merge_orphaned_bucket(sender, instance, **kwargs):
+    summary.reference_deleted('location' if sender is Location else 'project', instance.pk)
+
+
+# --- Image thumbnails ---
+
+@receiver(post_save, sender=InventoryItem)
+def schedule_thumbnails(sender, instance, raw=False, **kwargs):
+    # Items loaded without their image columns can't have changed the image.
+    if raw or {'image', 'thumbnails'} & instance.get_deferred_fields():
+        return
+    if thumbnails.needs_thumbnails(instance):
+        thumbnails.schedule([instance.image.name])
+
+
+# --- Rendered-page cache ---
+
+@receiver(post_save, sender=InventoryItem)
+@receiver(post_delete, sender=InventoryItem)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_cached_pages(sender, instance, raw=False, **kwargs):
+    pagecache.invalidate()
+
+
+# Only saves: log rows are deleted in bulk (archive.py, the admin), and a post_delete receiver
+# would bump the generation once per row. Those paths call pagecache.invalidate() once instead.
+@receiver(post_save, sender=InventoryLog)
+def invalidate_cached_item_pages(sender, instance, raw=False, **kwargs):
+    # Logins, logouts and exports don't show up on any cached page.
+    if instance.item_id or instance.uid_no:
+        pagecache.invalidate()
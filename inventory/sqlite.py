@@ -0,0 +1,102 @@
+# inventory_management/inventory/sqlite.py
+#
+# Connection-time tuning for SQLite, applied to every new connection by the connection_created
+# signal (see apps.py). Configured by settings.INVENTORY_SQLITE; set it to None to keep SQLite's
+# defaults. Keys map to PRAGMAs:
+#
+#   'JOURNAL_MODE': 'WAL'      readers no longer block behind a writer (and vice versa)
+#   'SYNCHRONOUS':  'NORMAL'   with WAL, fsync at checkpoints instead of every commit; a power
+#                              cut can lose the last transactions but never corrupts the file
+#   'BUSY_TIMEOUT': 5000       ms to wait for a lock before "database is locked"
+#   'MMAP_SIZE':    268435456  bytes of the file read through memory-mapping
+#   'CACHE_SIZE':   -65536     page cache per connection; negative values are KiB (64 MiB)
+#   'TEMP_STORE':   'MEMORY'   temporary B-trees (sorts, DISTINCT) kept in memory
+#
+# journal_mode is stored in the database file; the rest are per connection. So that migrate,
+# shell or any other one-off command doesn't switch a checked-out or copied database file to
+# WAL, journal_mode is only set by server processes: runserver, or a process not started through
+# manage.py/django-admin (gunicorn, uvicorn). Periodic upkeep (optimize, checkpoints,
+# incremental vacuum) is the sqlite_maintenance command.
+
+import os
+import sys
+
+from django.conf import settings
+
+# busy_timeout first: switching journal_mode needs a lock other connections may briefly hold.
+PRAGMAS = (
+    ('BUSY_TIMEOUT', 'busy_timeout'),
+    ('JOURNAL_MODE', 'journal_mode'),
+    ('SYNCHRONOUS', 'synchronous'),
+    ('MMAP_SIZE', 'mmap_size'),
+    ('CACHE_SIZE', 'cache_size'),
+    ('TEMP_STORE', 'temp_store'),
+)
+DEFAULT_PROFILE = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT': 5000,
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'CACHE_SIZE': -64 * 1024,
+    'TEMP_STORE': 'MEMORY',
+}
+# Management commands that serve requests and so get the full profile.
+SERVER_COMMANDS = {'runserver'}
+ALLOWED_WORDS = {'WAL', 'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'OFF', 'NORMAL', 'FULL', 'EXTRA',
+                 'DEFAULT', 'FILE'}
+
+
+def get_profile():
+    profile = getattr(settings, 'INVENTORY_SQLITE', DEFAULT_PROFILE)
+    return None if profile is None else {**DEFAULT_PROFILE, **profile}
+
+
+def pragma_statements(profile):
+    statements = []
+    for key, pragma in PRAGMAS:
+        value = profile.get(key)
+        if value is None:
+            continue
+        # PRAGMA values can't be bound as parameters: only accept known words and integers.
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = str(value)
+        elif str(value).upper() in ALLOWED_WORDS:
+            value = str(value).upper()
+        else:
+            raise ValueError(f"Invalid INVENTORY_SQLITE {key}: {value!r}")
+        statements.append(f"PRAGMA {pragma} = {value}")
+    return statements
+
+
+def running_command(argv=None):
+    """The manage.py/django-admin subcommand this process runs, or None for any other process."""
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1 and os.path.basename(argv[0]) in ('manage.py', 'django-admin', '__main__.py'):
+        return argv[1]
+    return None
+
+
+def apply_profile(sender, connection, **kwargs):
+    """connection_created receiver."""
+    if connection.vendor != 'sqlite':
+        return
+    profile = get_profile()
+    if profile is None:
+        return
+    command = running_command()
+    if command is not None and command not in SERVER_COMMANDS:
+        profile = {**profile, 'JOURNAL_MODE': None}
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(profile):
+            cursor.execute(statement)
+
+
+def current_settings(connection):
+    """{pragma: value} as the connection sees them, for reporting."""
+    values = {}
+    with connection.cursor() as cursor:
+        for _, pragma in PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+            row = cursor.fetchone()  # mmap_size has no row for in-memory databases
+            values[pragma] = row[0] if row else None
+    return values
@@ -0,0 +1,107 @@
+# inventory_management/inventory/storage.py
+#
+# Content-addressed media storage. An upload to images/photo.jpg is stored as
+#
+#     images/3f/3fa4...<sha256>.../photo.jpg
+#
+# The SHA-256 is computed while the upload is written to a temporary file, in the same single
+# pass, and the file is then moved into its hash directory. Uploading identical bytes again (the
+# same vendor PDF against hundreds of items) stores nothing new: the name already stored for that
+# hash is returned. A '.name' file in the hash directory records that name.
+#
+# Names that already lie inside a hash directory, such as the thumbnails written next to an
+# original, are saved verbatim. Files are immutable under their hash, which is what lets the
+# media view (media.py) hand them out with year-long cache headers.
+
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+ADDRESSED = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})/')
+MARKER = '.name'
+TEMP_DIR = '.incoming'
+
+
+def content_hash(name):
+    """The SHA-256 a content-addressed name was stored under, or None for other names."""
+    match = ADDRESSED.search(name)
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if content_hash(name):
+            return super().save(name, content, max_length=max_length)
+        return self._save_addressed(name.replace('\\', '/'), content, max_length)
+
+    def _save_addressed(self, name, content, max_length):
+        directory, filename = posixpath.split(name)
+        filename = self.get_valid_name(filename)
+
+        incoming = self.path(TEMP_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+            digest = digest.hexdigest()
+
+            hash_dir = posixpath.join(directory, digest[:2], digest)
+            existing = self._stored_name(hash_dir)
+            if existing:
+                return existing
+
+            final = posixpath.join(hash_dir, self._fit(filename, len(hash_dir) + 1, max_length))
+            full_path = self.path(final)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if self.directory_permissions_mode is not None:
+                os.chmod(os.path.dirname(full_path), self.directory_permissions_mode)
+            os.replace(temp_path, full_path)
+            temp_path = None
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+            marker_path = self.path(posixpath.join(hash_dir, MARKER))
+            try:
+                with open(marker_path, 'x') as marker:
+                    marker.write(posixpath.basename(final))
+            except FileExistsError:
+                # Either the same bytes were stored concurrently under another name (both copies
+                # are valid and the first marker stands), or the marked file was deleted.
+                if self._stored_name(hash_dir) is None:
+                    with open(marker_path, 'w') as marker:
+                        marker.write(posixpath.basename(final))
+            return final
+        finally:
+            if temp_path is not None:
+                os.unlink(temp_path)
+
+    def _stored_name(self, hash_dir):
+        try:
+            with open(self.path(posixpath.join(hash_dir, MARKER))) as marker:
+                name = posixpath.join(hash_dir, marker.read().strip())
+        except FileNotFoundError:
+            return None
+        return name if self.exists(name) else None
+
+    def _fit(self, filename, prefix_length, max_length):
+        """Shortens the file name's stem so the whole stored name fits the model field."""
+        if max_length is None or prefix_length + len(filename) <= max_length:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        room = max_length - prefix_length - len(ext)
+        if room < 1:
+            raise SuspiciousFileOperation(f"Storage can not find an available filename for '{filename}'.")
+        return stem[:room] + ext
@@ -0,0 +1,152 @@
+# inventory_management/inventory/summary.py
+#
+# Incremental maintenance of InventorySummary. Every write path turns its effect into
+# per-bucket (item count, quantity) deltas and applies them with F() increments, so the
+# dashboard panel reads O(number of buckets) rows. `reconcile_inventory_summary` recomputes
+# the table from scratch and repairs any drift.
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from . import pagecache
+from .models import InventoryItem, InventorySummary
+
+DIMENSIONS = ('status', 'category', 'location', 'project')
+# Item attribute holding each dimension's bucket key.
+DIMENSION_ATTRS = {'status': 'status', 'category': 'category', 'location': 'location_id', 'project': 'project_id'}
+
+
+def _key(value):
+    return '' if value is None else str(value)
+
+
+def load_state(item):
+    """Bucket fields as currently stored, for instances loaded without them."""
+    return InventoryItem.objects.filter(pk=item.pk).values(*InventoryItem.SUMMARY_FIELDS).first()
+
+
+class SummaryDelta:
+    """Accumulates bucket deltas from any number of item changes before writing them."""
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: [0, 0])
+
+    def add(self, state, sign=1):
+        """Counts (sign=1) or uncounts (sign=-1) an item in the given snapshot state."""
+        if state is None:
+            return
+        for dimension in DIMENSIONS:
+            bucket = self.deltas[(dimension, _key(state[DIMENSION_ATTRS[dimension]]))]
+            bucket[0] += sign
+            bucket[1] += sign * (state['quantity'] or 0)
+
+    def change(self, old_state, new_state):
+        self.add(old_state, -1)
+        self.add(new_state, 1)
+
+    def apply(self):
+        """One F() UPDATE per touched bucket; new buckets are inserted."""
+        with transaction.atomic():
+            for (dimension, key), (count, quantity) in self.deltas.items():
+                if not count and not quantity:
+                    continue
+                bucket = InventorySummary.objects.filter(dimension=dimension, key=key)
+                changes = {'item_count': F('item_count') + count, 'quantity_total': F('quantity_total') + quantity}
+                if bucket.update(**changes):
+                    continue
+                try:
+                    with transaction.atomic():
+                        InventorySummary.objects.create(dimension=dimension, key=key,
+                                                        item_count=count, quantity_total=quantity)
+                except IntegrityError:
+                    # Created concurrently since our UPDATE; add to that row instead.
+                    bucket.update(**changes)
+        self.deltas.clear()
+
+
+def item_saved(item, created):
+    old_state = None if created else getattr(item, '_summary_snapshot', None)
+    new_state = item.summary_state() or load_state(item)
+    delta = SummaryDelta()
+    delta.change(old_state, new_state)
+    delta.apply()
+    item._summary_snapshot = new_state
+
+
+def item_deleted(item):
+    delta = SummaryDelta()
+    delta.add(getattr(item, '_summary_snapshot', None) or item.summary_state(), -1)
+    delta.apply()
+
+
+def items_created(items):
+    delta = SummaryDelta()
+    for item in items:
+        state = item.summary_state()
+        delta.add(state)
+        item._summary_snapshot = state
+    delta.apply()
+
+
+def reference_deleted(dimension, pk):
+    """A location/project was deleted and SET_NULL moved its items to the '' bucket."""
+    with transaction.atomic():
+        row = InventorySummary.objects.filter(dimension=dimension, key=_key(pk)).first()
+        if row is None:
+            return
+        row.delete()
+        delta = SummaryDelta()
+        delta.deltas[(dimension, '')] = [row.item_count, row.quantity_total]
+        delta.apply()
+
+
+def compute():
+    """Exact bucket totals straight from InventoryItem: {(dimension, key): (count, quantity)}."""
+    totals = {}
+    for dimension in DIMENSIONS:
+        attr = DIMENSION_ATTRS[dimension]
+        rows = InventoryItem.objects.order_by().values(attr).annotate(items=Count('id'), quantity=Sum('quantity'))
+        for row in rows:
+            totals[(dimension, _key(row[attr]))] = (row['items'], row['quantity'] or 0)
+    return totals
+
+
+def reconcile(fix=True):
+    """Compares the summary table with a full recomputation; returns [(dimension, key, stored, actual)]."""
+    with transaction.atomic():
+        actual = compute()
+        stored = {(row.dimension, row.key): (row.item_count, row.quantity_total)
+                  for row in InventorySummary.objects.all()}
+        drift = [
+            (dimension, key, stored.get((dimension, key), (0, 0)), actual.get((dimension, key), (0, 0)))
+            for dimension, key in sorted(set(actual) | set(stored))
+            if stored.get((dimension, key), (0, 0)) != actual.get((dimension, key), (0, 0))
+        ]
+        if fix and drift:
+            InventorySummary.objects.all().delete()
+            InventorySummary.objects.bulk_create([
+                InventorySummary(dimension=dimension, key=key, item_count=count, quantity_total=quantity)
+                for (dimension, key), (count, quantity) in actual.items()
+            ])
+            pagecache.invalidate()
+    return drift
+
+
+def panel(locations, projects):
+    """Summary rows grouped for display, with location/project ids replaced by names."""
+    names = {
+        'location': {str(location.pk): location.name for location in locations},
+        'project': {str(project.pk): project.name for project in projects},
+    }
+    groups = {dimension: [] for dimension in DIMENSIONS}
+    for row in InventorySummary.objects.filter(item_count__gt=0):
+        if row.dimension in names:
+            label = names[row.dimension].get(row.key, 'Unassigned' if not row.key else f"#{row.key}")
+        else:
+            label = row.key or 'None'
+        groups[row.dimension].append({'label': label, 'items': row.item_count, 'quantity': row.quantity_total})
+    for rows in groups.values():
+        rows.sort(key=lambda row: -row['items'])
+    return [(dict(InventorySummary.DIMENSION_CHOICES)[dimension], groups[dimension]) for dimension in DIMENSIONS]
@@ -1,3 +1,1623 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import archive, labels, logsink, pagecache, refdata, search, sqlite, summary, uidstatus
+from .forms import AddItemForm, CachedModelChoiceField, InventoryFilterForm, TransferForm
+from .disposals import dispose_items
+from .importers import InventoryImporter
+from .models import (
+    CacheGeneration, InventoryItem, InventoryLog, InventorySummary, ItemChange, Location, LogArchive, Project,
+    UIDCategorySequence, VersionConflict,
+)
+from .querybudget import QueryBudgetExceeded, QueryBudgetMiddleware, fingerprint, query_budget
+from .storage import content_hash as storage_hash
+from .transfers import transfer_items
+
+# The manifest storage needs collectstatic output, which test runs don't have.
+render_settings = override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+# Test transactions never commit, so on_commit log records would never be written.
+sync_log_sink = override_settings(INVENTORY_LOG_SINK={'MODE': 'sync'})
+# Views requested by these tests fail them when they exceed their declared @query_budget.
+strict_query_budgets = override_settings(INVENTORY_QUERY_BUDGET={'ENABLED': True, 'RAISE': True})
+# Rolled-back test transactions reuse ids and generation numbers, so a page cached by one test
+# could be served to the next.
+no_page_cache = override_settings(INVENTORY_PAGE_CACHE={'ENABLED': False})
+# Thumbnails rendered inline, before the test looks for them and removes its MEDIA_ROOT.
+sync_thumbnails = override_settings(INVENTORY_THUMBNAILS={'MODE': 'sync'})
+
+
+@strict_query_budgets
+@no_page_cache
+class UIDAllocatorTests(TestCase):
+    def test_reserve_block_returns_contiguous_ranges(self):
+        first = UIDCategorySequence.objects.reserve_block('LAP', '2501', 10)
+        second = UIDCategorySequence.objects.reserve_block('LAP', '2501', 5)
+        self.assertEqual(first, 1)
+        self.assertEqual(second, 11)
+        self.assertEqual(UIDCategorySequence.objects.get(category_prefix='LAP', year_month='2501').last_sequence_number, 15)
+
+    def test_save_and_bulk_create_share_the_sequence(self):
+        single = InventoryItem.objects.create(item_name='Dell XPS', category='Laptop')
+        units = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem.objects.build_units(InventoryItem(item_name='ThinkPad', category='Laptop'), 3)
+        )
+        year_month = timezone.now().strftime('%y%m')
+        self.assertEqual(single.uid_no, f"LAP-{year_month}-0001")
+        self.assertEqual([item.uid_no for item in units],
+                         [f"LAP-{year_month}-000{n}" for n in (2, 3, 4)])
+        self.assertTrue(all(item.pk for item in units))
+        self.assertEqual(InventoryLog.objects.filter(action='added', item__in=units).count(), 3)
+
+    def test_add_item_creates_identical_units(self):
+        user = User.objects.create_user('clerk', password='pw')
+        location = Location.objects.create(name='Warehouse')
+        self.client.force_login(user)
+        response = self.client.post(reverse('inventory:add_item'), {
+            'item_name': 'Monitor 24"', 'category': 'Monitor', 'location': location.pk,
+            'status': 'Available', 'quantity': 1, 'units': 4,
+        })
+        self.assertRedirects(response, reverse('inventory:dashboard'), fetch_redirect_response=False)
+        uids = list(InventoryItem.objects.filter(category='Monitor').values_list('uid_no', flat=True))
+        self.assertEqual(len(uids), 4)
+        self.assertEqual(len(set(uids)), 4)
+
+
+class InventoryImporterTests(TestCase):
+    def setUp(self):
+        Location.objects.create(name='Warehouse')
+        Project.objects.create(name='Apollo')
+
+    def test_csv_import_reports_bad_rows(self):
+        data = (
+            "Item Name,Category,Location,Project,Status,Quantity\n"
+            "ThinkPad,Laptop,warehouse,Apollo,In Use,1\n"
+            "Mystery,Toaster,Warehouse,,,1\n"
+            "Dell 24,MON,Basement,,,2\n"
+            "HP 27,Monitor,,,Available,3\n"
+        )
+        result = InventoryImporter(batch_size=2).run(io.BytesIO(data.encode()), 'items.csv')
+        self.assertEqual(result.rows_read, 4)
+        self.assertEqual(result.created, 2)
+        self.assertEqual([row for row, _ in result.errors], [3, 4])
+        laptop = InventoryItem.objects.get(item_name='ThinkPad')
+        self.assertEqual((laptop.location.name, laptop.project.name, laptop.status), ('Warehouse', 'Apollo', 'In Use'))
+        self.assertEqual(InventoryLog.objects.filter(action='added').count(), 2)
+
+    def test_xlsx_import_with_create_missing(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['Item Name', 'Category', 'Location', 'Serial Number'])
+        sheet.append(['Core switch', 'Networking Device', 'Server Room', 'SN-1'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        result = InventoryImporter(create_missing=True).run(buffer, 'items.xlsx')
+        self.assertEqual((result.created, result.error_count), (1, 0))
+        self.assertEqual(InventoryItem.objects.get(serial_number='SN-1').location.name, 'Server Room')
+
+
+@strict_query_budgets
+@no_page_cache
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='pw')
+        self.client.force_login(self.user)
+        warehouse = Location.objects.create(name='Warehouse')
+        InventoryItem.objects.create(item_name='ThinkPad', category='Laptop', location=warehouse)
+        InventoryItem.objects.create(item_name='Switch', category='Networking Device')
+
+    def test_csv_export_selected_columns(self):
+        response = self.client.get(reverse('inventory:export_inventory_excel'),
+                                   {'format': 'csv', 'columns': 'item_name,location'})
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.splitlines(), ['Item Name,Location', 'Switch,N/A', 'ThinkPad,Warehouse'])
+
+    def test_jsonl_and_xlsx_exports(self):
+        response = self.client.get(reverse('inventory:export_inventory_excel'), {'format': 'jsonl'})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record['item_name'] for record in records], ['Switch', 'ThinkPad'])
+        self.assertIsNone(records[0]['location'])
+
+        response = self.client.get(reverse('inventory:export_inventory_excel'))
+        workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:2], ('Item Name', 'UID No'))
+        self.assertEqual(len(rows), 3)
+
+    def test_unknown_column_is_rejected(self):
+        response = self.client.get(reverse('inventory:export_inventory_excel'), {'columns': 'added_by'})
+        self.assertRedirects(response, reverse('inventory:dashboard'), fetch_redirect_response=False)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.lab = Location.objects.create(name='Design Lab')
+        self.laptop = InventoryItem.objects.create(item_name='ThinkPad X1', category='Laptop', location=self.lab,
+                                                   description='Spare loaner')
+        self.monitor = InventoryItem.objects.create(item_name='Dell UltraSharp', category='Monitor',
+                                                    installed_software='thinkpad dock firmware')
+
+    def matches(self, text):
+        return list(search.search(InventoryItem.objects.all(), text))
+
+    def test_ranks_name_matches_above_text_matches(self):
+        self.assertEqual(self.matches('thinkpad'), [self.laptop, self.monitor])
+        self.assertEqual(self.matches('think x1'), [self.laptop])
+        self.assertEqual(self.matches(self.monitor.uid_no), [self.monitor])
+        self.assertEqual(self.matches('!!'), [])
+
+    def test_index_follows_saves_renames_and_deletes(self):
+        self.assertEqual(self.matches('design'), [self.laptop])
+        self.lab.name = 'Studio'
+        self.lab.save()
+        self.assertEqual(self.matches('design'), [])
+        self.assertEqual(self.matches('studio'), [self.laptop])
+
+        self.laptop.item_name = 'Latitude 7440'
+        self.laptop.save()
+        self.assertEqual(self.matches('latitude'), [self.laptop])
+
+        self.laptop.delete()
+        self.assertEqual(self.matches('latitude'), [])
+
+    def test_matches_word_prefixes_not_substrings(self):
+        # Unlike the icontains search it replaced (still used without an index), see migration 0012.
+        self.assertEqual(self.matches('ultra'), [self.monitor])
+        self.assertEqual(self.matches('sharp'), [])
+        self.assertEqual(self.matches('dell think'), [self.monitor])
+        self.assertEqual(self.matches('dell loaner'), [])
+        self.assertEqual(list(InventoryItem.objects.filter(search.legacy_filter('sharp'))), [self.monitor])
+
+    def test_bulk_created_items_are_searchable(self):
+        InventoryItem.objects.bulk_create_with_uids([InventoryItem(item_name='Catalyst switch', category='Networking Device')])
+        self.assertEqual(len(self.matches('catalyst')), 1)
+
+
+@render_settings
+@strict_query_budgets
+@no_page_cache
+class DashboardPaginationTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('viewer', password='pw'))
+        InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Asset {n:02d}", category='Laptop', description='x' * 500) for n in range(25)
+        )
+
+    def walk(self, params):
+        names, query = [], None
+        while True:
+            response = self.client.get(reverse('inventory:dashboard') + (f'?{query}' if query else ''), params)
+            names.extend(item.item_name for item in response.context['items'])
+            query = response.context['next_page_query']
+            params = {}
+            if not query:
+                return names, response
+
+    def test_keyset_pages_cover_every_item_once(self):
+        names, _ = self.walk({})
+        self.assertEqual(names, [f"Asset {n:02d}" for n in range(25)])
+        names, _ = self.walk({'sort': '-item_name'})
+        self.assertEqual(names, [f"Asset {n:02d}" for n in reversed(range(25))])
+
+    def test_previous_cursor_returns_to_prior_page(self):
+        first = self.client.get(reverse('inventory:dashboard'))
+        second = self.client.get(reverse('inventory:dashboard') + '?' + first.context['next_page_query'])
+        back = self.client.get(reverse('inventory:dashboard') + '?' + second.context['previous_page_query'])
+        self.assertEqual(list(back.context['items']), list(first.context['items']))
+        self.assertEqual(back.context['previous_page_query'], '')
+
+    def test_rows_are_projected_and_not_counted_exactly(self):
+        response = self.client.get(reverse('inventory:dashboard'), {'cursor': 'garbage'})
+        item = response.context['items'].object_list[0]
+        self.assertIn('installed_software', item.get_deferred_fields())
+        self.assertEqual(len(item.description_preview), 120)
+        self.assertEqual(str(response.context['total_estimate']), '25')
+
+    def test_search_results_page_by_relevance(self):
+        names, response = self.walk({'search': 'asset'})
+        self.assertEqual(len(names), 25)
+        self.assertEqual(len(set(names)), 25)
+
+
+@render_settings
+@strict_query_budgets
+class LogBrowserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='pw')
+        self.client.force_login(self.user)
+        self.item = InventoryItem.objects.create(item_name='Printer', category='Printer')
+        InventoryLog.objects.bulk_create(
+            InventoryLog(item=self.item, uid_no=self.item.uid_no, action='updated', user=self.user, details=f"edit {n}")
+            for n in range(60)
+        )
+        InventoryLog.objects.create(action='login', details='hello', user=self.user)
+
+    def test_logs_are_paged_and_filterable(self):
+        response = self.client.get(reverse('inventory:inventory_logs'))
+        self.assertEqual(len(response.context['logs']), 50)
+        older = self.client.get(reverse('inventory:inventory_logs') + '?' + response.context['next_page_query'])
+        self.assertEqual(len(older.context['logs']), 11)
+        self.assertFalse(older.context['logs'].has_next)
+
+        response = self.client.get(reverse('inventory:inventory_logs'), {'action': 'login', 'user': 'auditor'})
+        self.assertEqual([log.details for log in response.context['logs']], ['hello'])
+        response = self.client.get(reverse('inventory:inventory_logs'),
+                                   {'uid_no': self.item.uid_no, 'date_from': timezone.now().date().isoformat()})
+        self.assertEqual(len(response.context['logs']), 50)
+        self.assertIn('uid_no=', response.context['next_page_query'])
+
+    def test_item_timeline_is_fetched_in_pages(self):
+        url = reverse('inventory:item_log_timeline', args=[self.item.pk])
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['entries']), 20)
+        seen = len(first['entries'])
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.client.get(url, {'cursor': cursor}).json()
+            seen += len(page['entries'])
+            cursor = page['next_cursor']
+        self.assertEqual(seen, 60)
+
+
+@strict_query_budgets
+class TransferEngineTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('mover', password='pw'))
+        self.old = Location.objects.create(name='Old Site')
+        self.new = Location.objects.create(name='New Site')
+        self.project = Project.objects.create(name='Apollo')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Desk {n}", category='Desktop PC', location=self.old) for n in range(200)
+        )
+
+    def post(self, entries):
+        return self.client.post(reverse('inventory:transfer_inventory_items'),
+                                json.dumps({'items': entries}), content_type='application/json')
+
+    def test_bulk_transfer_uses_a_fixed_number_of_queries(self):
+        entries = [{'id': str(item.pk), 'new_location': str(self.new.pk), 'project_id': str(self.project.pk)}
+                   for item in self.items]
+        entries.append({'id': '999999', 'new_location': str(self.new.pk)})
+        entries.append({'id': str(self.items[0].pk), 'new_location': '424242'})  # duplicate of the first entry
+
+        # session + user + items + locations + projects + update + log insert + 600 change rows
+        # (split by SQLite's 999-parameter limit) + search index + one F() update (or insert) per
+        # summary bucket touched + the page cache generation bump; none of it depends on the number
+        # of items. The six bucket updates share one fingerprint, which the query budget middleware reports.
+        with self.assertNumQueries(34), self.assertLogs('inventory.querybudget', 'WARNING'):
+            response = self.post(entries)
+
+        body = response.json()
+        self.assertTrue(body['success'])
+        self.assertEqual(len(body['failed_items']), 2)
+        self.assertEqual(InventoryItem.objects.filter(location=self.new, project=self.project, status='Assigned').count(), 200)
+        log = InventoryLog.objects.filter(action='transferred', item=self.items[5]).get()
+        self.assertIn("from 'Old Site' to 'New Site'", log.details)
+        self.assertIn("to 'Apollo'", log.details)
+        self.assertEqual(
+            sorted(log.changes.values_list('field', 'old_value', 'new_value')),
+            [('location', 'Old Site', 'New Site'), ('project', None, 'Apollo'), ('status', 'Available', 'Assigned')],
+        )
+
+    def test_thousands_of_items_move_in_one_transfer(self):
+        items = self.items + InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Chair {n}", category='Other', location=self.old) for n in range(4800)
+        )
+        InventoryItem.objects.filter(pk__in=[item.pk for item in items[::7]]).update(version=2)
+        transferred, failed = transfer_items([{'id': item.pk, 'new_location': self.new.pk} for item in items])
+        self.assertEqual((len(transferred), failed), (5000, []))
+        self.assertEqual(InventoryItem.objects.filter(location=self.new).count(), 5000)
+        self.assertEqual(InventoryItem.objects.filter(version=3).count(), len(items[::7]))
+
+    def test_unknown_references_are_reported_per_item(self):
+        response = self.post([{'id': str(self.items[0].pk), 'new_location': str(self.new.pk), 'project_id': '777'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['failed_items'][0]['reason'], "Project with ID 777 not found.")
+
+
+class LogSinkTests(TestCase):
+    # A long interval keeps the background thread idle so the test controls flushing.
+    queued = {'MODE': 'buffered', 'BATCH_SIZE': 1000, 'FLUSH_INTERVAL': 3600}
+
+    def setUp(self):
+        self.user = User.objects.create_user('clerk', password='pw')
+        self.item = InventoryItem.objects.create(item_name='Router', category='Networking Device')
+
+    def test_buffered_records_are_written_on_flush(self):
+        with override_settings(INVENTORY_LOG_SINK=self.queued):
+            before = timezone.now()
+            logsink.record(self.user, self.item, 'updated', 'first', uid_no=self.item.uid_no)
+            logsink.record(None, None, 'logout', 'second')
+            self.assertFalse(InventoryLog.objects.exists())
+            self.assertEqual(logsink.flush(), 2)
+        logs = list(InventoryLog.objects.order_by('id'))
+        self.assertEqual([(log.action, log.user, log.item) for log in logs],
+                         [('updated', self.user, self.item), ('logout', None, None)])
+        self.assertLess(logs[0].timestamp, logs[1].timestamp)
+        self.assertGreaterEqual(logs[0].timestamp, before)
+
+    def test_records_for_items_deleted_before_flush_keep_their_uid(self):
+        uid = self.item.uid_no
+        with override_settings(INVENTORY_LOG_SINK=self.queued):
+            logsink.record(self.user, self.item, 'updated', 'edit', uid_no=uid)
+            self.item.delete()
+            logsink.flush()
+        log = InventoryLog.objects.get()
+        self.assertIsNone(log.item)
+        self.assertEqual(log.uid_no, uid)
+
+    def test_failed_batch_stays_queued_until_a_write_succeeds(self):
+        with override_settings(INVENTORY_LOG_SINK={**self.queued, 'RETRIES': 1}):
+            logsink.record(self.user, self.item, 'updated', 'edit 0')
+            logsink.record(self.user, self.item, 'updated', 'edit 1')
+            with mock.patch.object(logsink, '_write', side_effect=DatabaseError('locked')), \
+                    self.assertLogs('inventory.logsink', 'ERROR'):
+                self.assertEqual(logsink.flush(), 0)
+            logsink.record(self.user, self.item, 'updated', 'edit 2')
+            self.assertEqual(logsink.flush(), 3)
+        self.assertEqual(list(InventoryLog.objects.order_by('id').values_list('details', flat=True)),
+                         ['edit 0', 'edit 1', 'edit 2'])
+
+    def test_batch_is_dropped_to_the_error_log_after_its_retries(self):
+        with override_settings(INVENTORY_LOG_SINK={**self.queued, 'RETRIES': 1}):
+            logsink.record(self.user, self.item, 'updated', 'unwritable')
+            with mock.patch.object(logsink, '_write', side_effect=DatabaseError('locked')), \
+                    self.assertLogs('inventory.logsink', 'ERROR') as logged:
+                self.assertEqual(logsink.flush(), 0)
+                self.assertEqual(logsink.flush(), 0)
+            self.assertIn('unwritable', logged.output[-1])
+            self.assertEqual(logsink.flush(), 0)
+        self.assertFalse(InventoryLog.objects.exists())
+
+    def test_on_commit_mode_skips_rolled_back_work(self):
+        with override_settings(INVENTORY_LOG_SINK={**self.queued, 'MODE': 'on_commit'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                logsink.record(self.user, self.item, 'updated', 'kept')
+            try:
+                with transaction.atomic():
+                    logsink.record(self.user, self.item, 'updated', 'rolled back')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            logsink.flush()
+        self.assertEqual(list(InventoryLog.objects.values_list('details', flat=True)), ['kept'])
+
+
+@render_settings
+@sync_log_sink
+@strict_query_budgets
+class ItemChangeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('editor', password='pw')
+        self.client.force_login(self.user)
+        self.lab = Location.objects.create(name='Lab')
+        self.store = Location.objects.create(name='Store')
+        self.item = InventoryItem.objects.create(item_name='Workstation', category='Desktop PC', location=self.lab,
+                                                 cpu='i5', quantity=1)
+
+    def test_edit_writes_structured_changes(self):
+        self.client.post(reverse('inventory:edit_item', args=[self.item.pk]), {
+            'item_name': 'Workstation', 'category': 'Desktop PC', 'location': self.store.pk,
+            'status': 'In Use', 'quantity': 1, 'cpu': 'i7',
+        })
+        changes = dict((field, (old, new)) for field, old, new in
+                       ItemChange.objects.for_item(self.item).values_list('field', 'old_value', 'new_value'))
+        self.assertEqual(changes['location'], ('Lab', 'Store'))
+        self.assertEqual(changes['cpu'], ('i5', 'i7'))
+        self.assertEqual(changes['status'], ('Available', 'In Use'))
+        self.assertEqual(ItemChange.objects.for_field('status', since=timezone.now() - timedelta(days=1)).count(), 1)
+        self.assertEqual(ItemChange.objects.get(field='cpu').log.action, 'updated')
+
+    def test_clearing_a_project_records_null(self):
+        self.item.project = Project.objects.create(name='Apollo')
+        self.item.save()
+        self.client.post(reverse('inventory:edit_item', args=[self.item.pk]), {
+            'item_name': 'Workstation', 'category': 'Desktop PC', 'location': self.lab.pk, 'project': '',
+            'uid_no': self.item.uid_no, 'status': 'Available', 'quantity': 1, 'cpu': 'i5', 'version': self.item.version,
+        })
+        self.assertEqual(list(ItemChange.objects.for_item(self.item).values_list('field', 'old_value', 'new_value')),
+                         [('project', 'Apollo', None)])
+        self.assertIn("project: 'Apollo' to 'Empty'", InventoryLog.objects.get(action='updated').details)
+
+    def test_backfill_parses_existing_details(self):
+        InventoryLog.objects.create(
+            item=self.item, action='updated',
+            details="Updated item 'Workstation' (UID: X). Changes: CPU: 'i5' to 'i7'; Operating System: 'Empty' to 'Linux'")
+        InventoryLog.objects.create(
+            item=self.item, action='transferred',
+            details="Item 'Workstation' (UID: X) transferred from 'Lab' to 'Store'. "
+                    "Project changed from 'N/A' to 'N/A'. Status set to 'Assigned'.")
+        call_command('backfill_item_changes', stdout=io.StringIO())
+        call_command('backfill_item_changes', stdout=io.StringIO())  # second run finds nothing new
+        self.assertEqual(
+            sorted(ItemChange.objects.values_list('field', 'old_value', 'new_value')),
+            [('cpu', 'i5', 'i7'), ('location', 'Lab', 'Store'), ('os', None, 'Linux'), ('status', None, 'Assigned')],
+        )
+
+
+@strict_query_budgets
+@no_page_cache
+class InventorySummaryTests(TestCase):
+    def setUp(self):
+        self.lab = Location.objects.create(name='Lab')
+        self.store = Location.objects.create(name='Store')
+
+    def buckets(self, dimension):
+        return {row.key: (row.item_count, row.quantity_total)
+                for row in InventorySummary.objects.filter(dimension=dimension) if row.item_count}
+
+    def test_counters_follow_every_write_path(self):
+        item = InventoryItem.objects.create(item_name='Laptop', category='Laptop', location=self.lab, quantity=3)
+        InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name='Mouse', category='Other', location=self.lab, quantity=10) for _ in range(4))
+        self.assertEqual(self.buckets('location'), {str(self.lab.pk): (5, 43)})
+        self.assertEqual(self.buckets('category'), {'Laptop': (1, 3), 'Other': (4, 40)})
+
+        item.quantity = 2
+        item.status = 'In Repair'
+        item.save()
+        self.assertEqual(self.buckets('status'), {'Available': (4, 40), 'In Repair': (1, 2)})
+
+        mouse = InventoryItem.objects.filter(item_name='Mouse').only('id', 'item_name').first()
+        mouse.item_name = 'Wireless mouse'
+        mouse.save()  # loaded without bucket fields: must not double count
+        transfer_items([{'id': item.pk, 'new_location': self.store.pk}])
+        self.assertEqual(self.buckets('location'), {str(self.lab.pk): (4, 40), str(self.store.pk): (1, 2)})
+        self.assertEqual(self.buckets('status')['Assigned'], (1, 2))
+
+        InventoryItem.objects.filter(item_name='Wireless mouse').get().delete()
+        self.lab.delete()
+        self.assertEqual(self.buckets('location'), {'': (3, 30), str(self.store.pk): (1, 2)})
+        self.assertEqual(summary.reconcile(), [])
+
+    def test_reconcile_reports_and_repairs_drift(self):
+        InventoryItem.objects.create(item_name='Server', category='Server', quantity=1)
+        InventorySummary.objects.filter(dimension='category', key='Server').update(item_count=7)
+        out = io.StringIO()
+        call_command('reconcile_inventory_summary', stdout=out)
+        self.assertIn('category', out.getvalue())
+        self.assertEqual(self.buckets('category'), {'Server': (1, 1)})
+        self.assertEqual(summary.reconcile(fix=False), [])
+
+    @render_settings
+    def test_dashboard_panel_labels_locations_by_name(self):
+        user = User.objects.create_user('viewer', password='pw')
+        self.client.force_login(user)
+        InventoryItem.objects.create(item_name='Laptop', category='Laptop', location=self.lab, quantity=2)
+        response = self.client.get(reverse('inventory:dashboard'))
+        panel = dict(response.context['summary_panel'])
+        self.assertEqual(panel['Location'], [{'label': 'Lab', 'items': 1, 'quantity': 2}])
+
+
+@strict_query_budgets
+@no_page_cache
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.locations = [Location.objects.create(name=f"Room {i}") for i in range(6)]
+        for location in self.locations:
+            InventoryItem.objects.create(item_name='Chair', category='Other', location=location)
+
+    def run_view(self, view, **config):
+        config = {'ENABLED': True, 'N_PLUS_ONE': 5, 'RAISE': False, **config}
+        with override_settings(INVENTORY_QUERY_BUDGET=config):
+            middleware = QueryBudgetMiddleware(lambda request: view(request))
+            request = RequestFactory().get('/probe/')
+            middleware.process_view(request, view, (), {})
+            return middleware(request)
+
+    def test_fingerprint_folds_in_lists_and_numbers(self):
+        self.assertEqual(fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s) LIMIT 21'),
+                         fingerprint('SELECT 1 FROM t WHERE id IN (%s) LIMIT 50'))
+
+    def test_headers_and_n_plus_one_report(self):
+        def lazy_view(request):
+            names = [item.location.name for item in InventoryItem.objects.all()]
+            return HttpResponse(', '.join(names))
+
+        with self.assertLogs('inventory.querybudget', 'WARNING') as logs:
+            response = self.run_view(lazy_view)
+        self.assertEqual(response['X-Query-Count'], '7')
+        self.assertIn('*6', response['X-Query-Repeated'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['repeated'][0]['times'], 6)
+
+        def joined_view(request):
+            names = [item.location.name for item in InventoryItem.objects.select_related('location')]
+            return HttpResponse(', '.join(names))
+
+        response = self.run_view(joined_view)
+        self.assertEqual(response['X-Query-Count'], '1')
+        self.assertFalse(response.has_header('X-Query-Repeated'))
+
+    def test_declared_budget_raises_when_exceeded(self):
+        @query_budget(3)
+        def lazy_view(request):
+            return HttpResponse(str([item.location.name for item in InventoryItem.objects.all()]))
+
+        with self.assertLogs('inventory.querybudget', 'WARNING'):
+            self.assertEqual(self.run_view(lazy_view)['X-Query-Budget'], '3')
+            with self.assertRaises(QueryBudgetExceeded):
+                self.run_view(lazy_view, RAISE=True)
+
+    @render_settings
+    def test_dashboard_reports_counts_within_budget(self):
+        self.client.force_login(User.objects.create_user('viewer', password='pw'))
+        response = self.client.get(reverse('inventory:dashboard'))
+        self.assertEqual(response['X-Query-Budget'], '12')
+        self.assertLessEqual(int(response['X-Query-Count']), 12)
+
+
+class BenchmarkToolingTests(TestCase):
+    def test_generator_builds_consistent_dataset_and_clears_it(self):
+        call_command('generate_inventory_data', items=120, logs_per_item=2, locations=3, projects=2,
+                     batch_size=50, stdout=io.StringIO())
+        items = InventoryItem.objects.filter(serial_number__startswith='SYN')
+        self.assertEqual(items.count(), 120)
+        self.assertEqual(InventoryLog.objects.filter(action='added').count(), 120)
+        self.assertGreater(InventoryLog.objects.exclude(action='added').count(), 120)
+        self.assertEqual(summary.reconcile(fix=False), [])
+        self.assertTrue(search.search(InventoryItem.objects.all(), 'thinkpad').exists())
+
+        call_command('generate_inventory_data', items=0, clear=True, stdout=io.StringIO())
+        self.assertFalse(InventoryItem.objects.exists())
+        self.assertFalse(InventoryLog.objects.exists())
+        self.assertFalse(Location.objects.exists())
+        self.assertEqual(summary.reconcile(fix=False), [])
+
+    def test_view_benchmark_reports_json(self):
+        call_command('generate_inventory_data', items=30, locations=2, projects=1, stdout=io.StringIO())
+        out = io.StringIO()
+        logs = InventoryLog.objects.count()
+        call_command('benchmark_views', repeat=2, only=['dashboard', 'search', 'item_details', 'transfer', 'add_item'],
+                     stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['items'], 30)
+        self.assertFalse(report['page_cache'])
+        self.assertEqual(set(report['views']), {'dashboard', 'search', 'item_details', 'transfer', 'add_item'})
+        # The write scenarios were rolled back.
+        self.assertEqual((InventoryItem.objects.count(), InventoryLog.objects.count()), (30, logs))
+        for name, result in report['views'].items():
+            self.assertEqual(result['status'], 302 if name == 'add_item' else 200)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['queries'], 0)
+
+
+# Checks the refdata generation on every use, so tests control when the cache is stale.
+@override_settings(INVENTORY_REFDATA_CHECK_INTERVAL=0)
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        self.lab = Location.objects.create(name='Lab')
+        self.apollo = Project.objects.create(name='Apollo')
+
+    @override_settings(INVENTORY_REFDATA_CHECK_INTERVAL=60)
+    def test_forms_render_and_validate_from_the_cache(self):
+        refdata.get()
+        with self.assertNumQueries(0):
+            for form in (AddItemForm(), InventoryFilterForm(), TransferForm()):
+                form.as_p()
+            field = CachedModelChoiceField(Location)
+            self.assertEqual(field.clean(str(self.lab.pk)), self.lab)
+
+        # Created without signals, as if by another worker whose bump we haven't seen yet.
+        attic = Location.objects.bulk_create([Location(name='Attic')])[0]
+        self.assertEqual(field.clean(str(attic.pk)).name, 'Attic')
+        with self.assertRaises(ValidationError):
+            field.clean('987654')
+
+    def test_save_and_delete_invalidate_the_cache(self):
+        self.assertEqual([location.name for location in refdata.locations()], ['Lab'])
+        generation = CacheGeneration.objects.current(refdata.GENERATION)
+        Location.objects.create(name='Annex')
+        self.assertEqual([location.name for location in refdata.locations()], ['Annex', 'Lab'])
+        self.apollo.delete()
+        self.assertEqual(refdata.projects(), ())
+        self.assertEqual(CacheGeneration.objects.current(refdata.GENERATION), generation + 2)
+
+    def test_other_workers_changes_are_picked_up_after_the_interval(self):
+        refdata.get()
+        Location.objects.filter(pk=self.lab.pk).update(name='Laboratory')  # no signals
+        CacheGeneration.objects.bump(refdata.GENERATION)  # what the other worker's signal does
+        with override_settings(INVENTORY_REFDATA_CHECK_INTERVAL=60):
+            self.assertEqual(refdata.locations()[0].name, 'Lab')
+        self.assertEqual(refdata.locations()[0].name, 'Laboratory')
+
+
+@strict_query_budgets
+class JsonApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('scanner', password='pw')
+        self.client.force_login(self.user)
+        self.lab = Location.objects.create(name='Lab')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Laptop {n:02d}", category='Laptop', location=self.lab) for n in range(25)
+        )
+
+    def get(self, name, **params):
+        return self.client.get(reverse(f'inventory:{name}'), params)
+
+    def test_bulk_lookup_by_uid_keeps_request_order_and_reports_missing(self):
+        uids = [self.items[3].uid_no, 'NOPE-0001', self.items[1].uid_no]
+        with self.assertNumQueries(3):
+            body = self.get('api_items', uids=','.join(uids), fields='uid_no,location,status').json()
+        self.assertEqual(body['results'], [
+            {'uid_no': self.items[3].uid_no, 'location': 'Lab', 'status': 'Available'},
+            {'uid_no': self.items[1].uid_no, 'location': 'Lab', 'status': 'Available'},
+        ])
+        self.assertEqual(body['not_found'], ['NOPE-0001'])
+
+        body = self.get('api_items', ids=f"{self.items[0].pk},0", fields='item_name').json()
+        self.assertEqual(body, {'results': [{'item_name': 'Laptop 00'}], 'not_found': [0]})
+
+    def test_listing_is_cursor_paginated_with_sparse_fields(self):
+        names, cursor = [], None
+        while True:
+            params = {'fields': 'item_name', 'limit': 10}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.get('api_items', **params).json()
+            self.assertTrue(all(set(row) == {'item_name'} for row in body['results']))
+            names += [row['item_name'] for row in body['results']]
+            cursor = body['next']
+            if not cursor:
+                break
+        self.assertEqual(names, [f"Laptop {n:02d}" for n in range(25)])
+
+        logs = self.get('api_logs', action='added', ordering='-timestamp', limit=5).json()
+        self.assertEqual(len(logs['results']), 5)
+        self.assertEqual(logs['results'][0]['action'], 'added')
+        self.assertEqual(self.get('api_locations').json()['results'], [{'id': self.lab.pk, 'name': 'Lab'}])
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_datetimes_without_offset_are_in_the_current_time_zone(self):
+        stamp = timezone.make_aware(datetime(2025, 3, 1, 9, 0), timezone.get_fixed_timezone(330))
+        InventoryItem.objects.filter(pk=self.items[0].pk).update(updated_at=stamp)
+        InventoryItem.objects.exclude(pk=self.items[0].pk).update(updated_at=stamp - timedelta(hours=1))
+        body = self.get('api_items', updated_since='2025-03-01T09:00:00', fields='item_name').json()
+        self.assertEqual(body['results'], [{'item_name': 'Laptop 00'}])
+        body = self.get('api_items', updated_since='2025-03-01T03:30:00Z', fields='item_name').json()
+        self.assertEqual(body['results'], [{'item_name': 'Laptop 00'}])
+
+    def test_errors_are_json(self):
+        self.assertEqual(self.get('api_items', fields='item_name,secret').status_code, 400)
+        self.assertEqual(self.get('api_items', ordering='description').status_code, 400)
+        self.assertEqual(self.get('api_items', cursor='garbage').status_code, 400)
+        self.assertEqual(self.get('api_logs', since='yesterday').status_code, 400)
+        self.assertEqual(self.get('api_logs', since='2025-13-01T00:00:00').status_code, 400)
+        self.assertEqual(self.get('api_items', updated_since='2025-02-30T10:00').status_code, 400)
+        self.client.logout()
+        response = self.get('api_projects')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+
+def jpeg_upload(name='photo.jpg', size=(1200, 800), color=(200, 30, 30)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@sync_thumbnails
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media_settings = override_settings(MEDIA_ROOT=self.media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def thumbnail_edge(self, name):
+        from PIL import Image
+
+        with Image.open(os.path.join(self.media, name)) as image:
+            return max(image.size)
+
+    def test_thumbnails_follow_the_current_image(self):
+        item = InventoryItem.objects.create(item_name='Camera', image=jpeg_upload())
+        item.refresh_from_db()
+        self.assertEqual(item.thumbnails['source'], item.image.name)
+        self.assertEqual(self.thumbnail_edge(item.thumbnails['small']), 96)
+        self.assertEqual(self.thumbnail_edge(item.thumbnails['medium']), 320)
+        self.assertTrue(item.small_image_url.endswith('.jpg'))
+        self.assertIn('.small96.', item.small_image_url)
+        first = dict(item.thumbnails)
+
+        item.image = jpeg_upload(color=(10, 200, 10))
+        item.save()
+        item.refresh_from_db()
+        self.assertEqual(item.thumbnails['source'], item.image.name)
+        self.assertNotEqual(item.thumbnails['small'], first['small'])
+
+        # Until thumbnails exist for the current image, the original is shown.
+        InventoryItem.objects.filter(pk=item.pk).update(thumbnails={})
+        item.refresh_from_db()
+        self.assertEqual(item.small_image_url, item.image.url)
+
+    def test_units_share_one_set_and_backfill_uses_a_process_pool(self):
+        template = InventoryItem(item_name='Monitor', category='Monitor', image=jpeg_upload('screen.png'))
+        units = InventoryItem.objects.bulk_create_with_uids(InventoryItem.objects.build_units(template, 3))
+        self.assertEqual(len(set(InventoryItem.objects.filter(pk__in=[u.pk for u in units])
+                                 .values_list('thumbnails__small', flat=True))), 1)
+
+        with self.assertLogs('inventory.thumbnails', 'ERROR'):
+            broken = InventoryItem.objects.create(item_name='Broken', image=SimpleUploadedFile('bad.jpg', b'junk'))
+        InventoryItem.objects.update(thumbnails={})
+        out, err = io.StringIO(), io.StringIO()
+        call_command('generate_thumbnails', processes=2, stdout=out, stderr=err)
+        self.assertIn('Rendered 1 image(s) (1 failed) for 4 item(s)', out.getvalue())
+        self.assertIn('bad', err.getvalue())
+        for unit in InventoryItem.objects.filter(pk__in=[u.pk for u in units]):
+            self.assertIn('.medium320.', unit.medium_image_url)
+        broken.refresh_from_db()
+        self.assertEqual(broken.small_image_url, broken.image.url)
+
+
+@strict_query_budgets
+@sync_thumbnails
+class ContentAddressedMediaTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media_settings = override_settings(MEDIA_ROOT=self.media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_identical_uploads_are_stored_once(self):
+        import hashlib
+
+        body = b'%PDF-1.4 vendor datasheet' * 1000
+        first = InventoryItem.objects.create(item_name='A', document=SimpleUploadedFile('datasheet.pdf', body))
+        second = InventoryItem.objects.create(item_name='B', document=SimpleUploadedFile('copy of sheet.pdf', body))
+        digest = hashlib.sha256(body).hexdigest()
+        self.assertEqual(first.document.name, f'documents/{digest[:2]}/{digest}/datasheet.pdf')
+        self.assertEqual(second.document.name, first.document.name)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.media, 'documents', digest[:2], digest))),
+                         ['.name', 'datasheet.pdf'])
+        self.assertEqual(os.listdir(os.path.join(self.media, '.incoming')), [])
+
+        long_name = InventoryItem.objects.create(item_name='C', document=SimpleUploadedFile('x' * 300 + '.pdf', b'other'))
+        self.assertLessEqual(len(long_name.document.name), 255)
+        self.assertTrue(long_name.document.name.endswith('.pdf'))
+
+    def test_thumbnails_live_in_the_originals_hash_directory(self):
+        item = InventoryItem.objects.create(item_name='Camera', image=jpeg_upload())
+        item.refresh_from_db()
+        directory = os.path.dirname(item.image.name)
+        self.assertEqual(os.path.dirname(item.thumbnails['small']), directory)
+
+    def test_serving_supports_conditional_and_range_requests(self):
+        item = InventoryItem.objects.create(item_name='A', document=SimpleUploadedFile('notes.txt', b'0123456789'))
+        url = item.document.url
+        self.assertRedirects(self.client.get(url), f"/login/?next={url}", fetch_redirect_response=False)
+        self.client.force_login(User.objects.create_user('viewer', password='pw'))
+
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=31536000, immutable')
+        etag = response['ETag']
+        self.assertIn(storage_hash(item.document.name), etag)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(partial.streaming_content), b'2345')
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=20-').status_code, 416)
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"').status_code, 200)
+
+        directory = os.path.dirname(url)
+        self.assertEqual(self.client.get(f'{directory}/.name').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+
+        with override_settings(INVENTORY_MEDIA={'SENDFILE': 'x-accel-redirect', 'ACCEL_PREFIX': '/protected/'}):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/' + item.document.name)
+        self.assertEqual(response.content, b'')
+
+    def test_legacy_files_are_moved_and_deduplicated(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import FileSystemStorage
+
+        legacy = FileSystemStorage()
+        for name in ('documents/manual.pdf', 'documents/manual_v2.pdf'):
+            legacy.save(name, ContentFile(b'same manual'))
+        InventoryItem.objects.bulk_create([
+            InventoryItem(item_name='A', uid_no='A-1', document='documents/manual.pdf'),
+            InventoryItem(item_name='B', uid_no='B-1', document='documents/manual_v2.pdf'),
+        ])
+        out = io.StringIO()
+        call_command('dedupe_media', delete_originals=True, stdout=out)
+        self.assertIn('Moved 2 file(s) into 1 stored file(s)', out.getvalue())
+        names = set(InventoryItem.objects.values_list('document', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(storage_hash(names.pop()))
+        self.assertFalse(legacy.exists('documents/manual.pdf'))
+
+
+class SQLiteProfileTests(TestCase):
+    def test_pragma_statements_validate_values(self):
+        self.assertEqual(sqlite.pragma_statements({'BUSY_TIMEOUT': 100, 'JOURNAL_MODE': 'wal'}),
+                         ['PRAGMA busy_timeout = 100', 'PRAGMA journal_mode = WAL'])
+        with self.assertRaises(ValueError):
+            sqlite.pragma_statements({'SYNCHRONOUS': 'OFF; DROP TABLE inventory_inventoryitem'})
+        with self.assertRaises(ValueError):
+            sqlite.pragma_statements({'MMAP_SIZE': True})
+
+    def test_profile_is_applied_to_connections(self):
+        from django.db import connection
+
+        values = sqlite.current_settings(connection)
+        # The test database lives in memory, so journal_mode and mmap_size can't be checked here.
+        self.assertEqual(values['synchronous'], 1)  # NORMAL
+        self.assertEqual(values['temp_store'], 2)  # MEMORY
+        self.assertEqual(values['cache_size'], -64 * 1024)
+        self.assertEqual(values['busy_timeout'], 5000)
+
+        with override_settings(INVENTORY_SQLITE=None):
+            self.assertIsNone(sqlite.get_profile())
+        with override_settings(INVENTORY_SQLITE={'SYNCHRONOUS': 'FULL'}):
+            self.assertEqual(sqlite.get_profile()['SYNCHRONOUS'], 'FULL')
+            self.assertEqual(sqlite.get_profile()['TEMP_STORE'], 'MEMORY')
+
+    def test_only_server_processes_change_the_journal_mode(self):
+        def applied(argv):
+            connection = mock.MagicMock(vendor='sqlite')
+            with mock.patch.object(sqlite.sys, 'argv', argv):
+                sqlite.apply_profile(None, connection)
+            cursor = connection.cursor.return_value.__enter__.return_value
+            return [call.args[0] for call in cursor.execute.call_args_list]
+
+        self.assertIn('PRAGMA journal_mode = WAL', applied(['/srv/venv/bin/gunicorn', 'inventory_management.wsgi']))
+        self.assertIn('PRAGMA journal_mode = WAL', applied(['manage.py', 'runserver']))
+        for argv in (['manage.py', 'migrate'], ['/usr/bin/django-admin', 'shell'], ['manage.py', 'test']):
+            statements = applied(argv)
+            self.assertNotIn('PRAGMA journal_mode = WAL', statements)
+            self.assertIn('PRAGMA synchronous = NORMAL', statements)
+
+    def test_maintenance_command_reports(self):
+        out = io.StringIO()
+        call_command('sqlite_maintenance', stdout=out)
+        self.assertIn('optimize done', out.getvalue())
+        out = io.StringIO()
+        call_command('sqlite_maintenance', analyze=True, checkpoint='truncate', stdout=out)
+        self.assertIn('ANALYZE done', out.getvalue())
+
+
+@render_settings
+@strict_query_budgets
+@no_page_cache
+class QueryPlanTests(TestCase):
+    """EXPLAIN QUERY PLAN for the hot queries behind the views: none of them may fall back to a
+    full scan or a temporary B-tree sort of the item, log or change tables."""
+
+    WATCHED_TABLES = ('inventory_inventoryitem', 'inventory_inventorylog', 'inventory_itemchange')
+
+    def setUp(self):
+        self.user = User.objects.create_user('planner', password='pw')
+        self.client.force_login(self.user)
+        location = Location.objects.create(name='Plan Room')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            [InventoryItem(item_name=f"Plan Asset {n}", category='Laptop', serial_number=f'PLAN-{n}',
+                           location=location) for n in range(30)],
+            user=self.user,
+        )
+        self.item = self.items[0]
+
+    def plan(self, sql, params=()):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def problems(self, plan):
+        found = []
+        # Full-text matches are ranked by relevance, which no index can provide; only the matched rows are sorted.
+        ranked_search = any('VIRTUAL TABLE' in step for step in plan)
+        for step in plan:
+            table = next((t for t in self.WATCHED_TABLES if f' {t}' in f' {step}'), None)
+            if 'TEMP B-TREE' in step and 'ORDER BY' in step and not ranked_search:
+                found.append(step)
+            elif table and step.startswith('SCAN') and 'INDEX' not in step:
+                found.append(step)
+        return found
+
+    def assertIndexedPlan(self, sql, params=()):
+        plan = self.plan(sql, params)
+        self.assertEqual(self.problems(plan), [], f"{sql}\n" + "\n".join(plan))
+
+    def assertViewQueriesIndexed(self, url, params=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params or {})
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        selects = [query['sql'] for query in captured.captured_queries
+                   if query['sql'].startswith('SELECT') and any(t in query['sql'] for t in self.WATCHED_TABLES)]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            self.assertIndexedPlan(sql)
+
+    def test_dashboard_orderings_and_pages(self):
+        url = reverse('inventory:dashboard')
+        for sort, _ in InventoryFilterForm.SORT_CHOICES:
+            with self.subTest(sort=sort):
+                self.assertViewQueriesIndexed(url, {'sort': sort} if sort else {})
+                cursor = self.client.get(url, {'sort': sort}).context['items'].next_cursor
+                self.assertViewQueriesIndexed(url, {'sort': sort, 'cursor': cursor})
+        self.assertViewQueriesIndexed(url, {'search': 'Plan'})
+
+    def test_item_pages(self):
+        self.assertViewQueriesIndexed(reverse('inventory:status_check'), {'uid_no': self.item.uid_no})
+        self.assertViewQueriesIndexed(reverse('inventory:item_details', args=[self.item.pk]))
+        self.assertViewQueriesIndexed(reverse('inventory:item_log_timeline', args=[self.item.pk]))
+        self.assertViewQueriesIndexed(reverse('inventory:edit_item', args=[self.item.pk]))
+        self.assertViewQueriesIndexed(reverse('inventory:export_inventory_excel'))
+
+    def test_log_filters(self):
+        url = reverse('inventory:inventory_logs')
+        today = timezone.localdate().isoformat()
+        for params in ({}, {'action': 'added'}, {'uid_no': self.item.uid_no}, {'item': self.item.pk},
+                       {'user': self.user.username}, {'date_from': today, 'date_to': today}):
+            with self.subTest(params=params):
+                self.assertViewQueriesIndexed(url, params)
+
+    def test_model_lookups(self):
+        lookups = [
+            InventoryItem.objects.all()[:20],  # Meta.ordering
+            InventoryItem.objects.filter(serial_number='PLAN-3').order_by(),
+            InventoryItem.objects.filter(status='Available').order_by('pk')[:20],
+            InventoryItem.objects.filter(category='Laptop').order_by('pk')[:20],
+            InventoryLog.objects.filter(uid_no=self.item.uid_no)[:20],
+            InventoryLog.objects.filter(action='added')[:20],
+            InventoryLog.objects.filter(timestamp__gte=timezone.now() - timedelta(days=1))[:20],
+        ]
+        for queryset in lookups:
+            with self.subTest(query=str(queryset.query)):
+                sql, params = queryset.query.sql_with_params()
+                self.assertIndexedPlan(sql, params)
+
+
+@render_settings
+@strict_query_budgets
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        archive_settings = override_settings(INVENTORY_LOG_ARCHIVE={'DIRECTORY': self.directory, 'RETENTION_DAYS': 90})
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+        self.user = User.objects.create_user('archivist', password='pw')
+        self.item = InventoryItem.objects.create(item_name='Old Scanner', category='Other')
+        now = timezone.now()
+        self.old = [now - timedelta(days=400 + n * 10) for n in range(6)]
+        InventoryLog.objects.bulk_create(
+            [InventoryLog(item=self.item, uid_no=self.item.uid_no, action='updated', user=self.user,
+                          details=f"old edit {n}", timestamp=moment) for n, moment in enumerate(self.old)]
+            + [InventoryLog(action='login', user=self.user, details='old login', timestamp=self.old[0])]
+        )
+        self.recent = InventoryLog.objects.filter(timestamp__gte=now - timedelta(days=1)).count()
+
+    def test_old_rows_move_to_monthly_files(self):
+        out = io.StringIO()
+        call_command('archive_inventory_logs', batch_size=2, stdout=out)
+        self.assertIn('Archived 7 log entries', out.getvalue())
+        self.assertFalse(InventoryLog.objects.filter(timestamp__lt=timezone.now() - timedelta(days=90)).exists())
+        self.assertEqual(InventoryLog.objects.count(), self.recent)
+
+        archives = list(LogArchive.objects.all())
+        self.assertEqual(sum(entry.rows for entry in archives), 7)
+        for entry in archives:
+            self.assertEqual(os.path.getsize(os.path.join(self.directory, entry.file_name)), entry.size)
+
+        history = archive.read(uid_no=self.item.uid_no)
+        self.assertEqual([log['details'] for log in history], [f"old edit {n}" for n in range(6)])
+        self.assertEqual(history[0]['user'], 'archivist')
+        self.assertEqual(history[0]['item_name'], 'Old Scanner')
+        self.assertEqual(len(archive.read(since=self.old[2], until=self.old[0])), 2)
+        self.assertEqual([log['details'] for log in archive.read(action='login')], ['old login'])
+
+    def test_a_batch_is_deleted_without_per_row_signals(self):
+        moment = timezone.now() - timedelta(days=800)
+        logs = InventoryLog.objects.bulk_create(
+            InventoryLog(item=self.item, uid_no=self.item.uid_no, action='updated', details=f"bulk {n}", timestamp=moment)
+            for n in range(100)
+        )
+        change = ItemChange.objects.create(item=self.item, log=logs[0], field='status', new_value='In Use')
+        generation = CacheGeneration.objects.current(pagecache.GENERATION)
+        # read batch + manifest lookup + savepoint + unlink changes + delete + generation bump +
+        # manifest insert + release + the final empty read, whatever the batch size
+        with self.assertNumQueries(9):
+            archive.archive_logs(before=moment + timedelta(seconds=1), batch_size=500)
+        self.assertEqual(CacheGeneration.objects.current(pagecache.GENERATION), generation + 1)
+        self.assertFalse(InventoryLog.objects.filter(details__startswith='bulk').exists())
+        change.refresh_from_db()
+        self.assertIsNone(change.log_id)
+
+    def test_uncommitted_tail_is_ignored_and_replaced(self):
+        archive.archive_logs(before=self.old[3] + timedelta(seconds=1))
+        entry = LogArchive.objects.get(month=archive.month_of(self.old[3]))
+        path = os.path.join(self.directory, entry.file_name)
+        with open(path, 'ab') as handle:
+            handle.write(b'\x1f\x8b partial member from a crashed run')
+
+        self.assertEqual(len(list(archive.iter_month(entry))), entry.rows)
+        archive.archive_logs(before=timezone.now() - timedelta(days=90))
+        self.assertEqual(len(archive.read(uid_no=self.item.uid_no)), 6)
+        for entry in LogArchive.objects.all():
+            self.assertEqual(os.path.getsize(os.path.join(self.directory, entry.file_name)), entry.size)
+
+    def test_logs_page_includes_archived_months(self):
+        call_command('archive_inventory_logs', stdout=io.StringIO())
+        self.client.force_login(self.user)
+        url = reverse('inventory:inventory_logs')
+        response = self.client.get(url, {'uid_no': self.item.uid_no})
+        self.assertIsNone(response.context['archived_logs'])
+
+        response = self.client.get(url, {'uid_no': self.item.uid_no, 'include_archived': 'on'})
+        self.assertEqual(len(response.context['archived_logs']), 6)
+        self.assertContains(response, 'old edit 5')
+
+        response = self.client.get(url, {'include_archived': 'on'})
+        self.assertIsNone(response.context['archived_logs'])
+        self.assertContains(response, 'searched by UID or date range')
+
+
+@render_settings
+@override_settings(INVENTORY_PAGE_CACHE={'ENABLED': True})
+@strict_query_budgets
+class PageCacheTests(TestCase):
+    def setUp(self):
+        from django.conf import settings
+        from django.core.cache import cache
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('reader', password='pw')
+        self.client.force_login(self.user)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'a' * 32
+        self.location = Location.objects.create(name='Cached Room')
+        self.item = InventoryItem.objects.create(item_name='Cached Laptop', category='Laptop', location=self.location)
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response['X-Page-Cache'], response.content.decode()
+
+    def test_repeated_reads_are_served_from_cache(self):
+        url = reverse('inventory:dashboard')
+        self.assertEqual(self.get(url)[0], 'miss')
+        state, content = self.get(url)
+        self.assertEqual(state, 'hit')
+        self.assertIn('Cached Laptop', content)
+        self.assertEqual(self.get(url, {'sort': 'status'})[0], 'miss')
+
+        other = User.objects.create_user('other', password='pw')
+        self.client.force_login(other)
+        self.assertEqual(self.get(url)[0], 'miss')
+
+        counts = pagecache.stats()['dashboard']
+        self.assertEqual((counts['hits'], counts['misses']), (1, 3))
+
+    def test_writes_invalidate_pages(self):
+        dashboard = reverse('inventory:dashboard')
+        details = reverse('inventory:item_details', args=[self.item.pk])
+        self.get(dashboard)
+        self.get(details)
+
+        self.item.item_name = 'Renamed Laptop'
+        self.item.save()
+        state, content = self.get(details)
+        self.assertEqual(state, 'miss')
+        self.assertIn('Renamed Laptop', content)
+
+        annex = Location.objects.create(name='Annex')
+        self.get(dashboard)
+        transfer_items([{'id': self.item.pk, 'new_location': annex.pk}], user=self.user)
+        state, content = self.get(dashboard)
+        self.assertEqual(state, 'miss')
+        self.assertIn('Annex', content)
+
+        self.get(dashboard)
+        InventoryItem.objects.bulk_create_with_uids([InventoryItem(item_name='Bulk Monitor', category='Monitor')])
+        self.assertIn('Bulk Monitor', self.get(dashboard)[1])
+
+        self.get(dashboard)
+        InventoryLog.objects.create(action='login', user=self.user)
+        self.assertEqual(self.get(dashboard)[0], 'hit')
+
+    def test_flash_messages_bypass_the_cache(self):
+        url = reverse('inventory:dashboard')
+        self.get(url)
+        self.client.post(reverse('inventory:delete_item_by_pk', args=[self.item.pk]))  # queues a success message
+        self.assertEqual(self.get(url)[0], 'bypass')
+        self.assertEqual(self.get(url)[0], 'miss')
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('inventory:page_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        self.get(reverse('inventory:dashboard'))
+        data = self.client.get(url).json()
+        self.assertTrue(data['enabled'])
+        self.assertEqual(data['views']['dashboard']['misses'], 1)
+
+
+@strict_query_budgets
+@override_settings(INVENTORY_REFDATA_CHECK_INTERVAL=0)
+class UIDStatusTests(TestCase):
+    def setUp(self):
+        uidstatus.clear()
+        self.addCleanup(uidstatus.clear)
+        self.client.force_login(User.objects.create_user('scanner', password='pw'))
+        self.room = Location.objects.create(name='Scan Room')
+        self.project = Project.objects.create(name='Tagging')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Tagged {n}", category='Monitor', location=self.room,
+                          project=self.project if n % 2 else None) for n in range(50)
+        )
+        self.uids = [item.uid_no for item in self.items]
+        self.url = reverse('inventory:api_status')
+
+    def post(self, uids):
+        return self.client.post(self.url, json.dumps({'uids': uids}), content_type='application/json')
+
+    def test_batch_resolves_with_one_query_and_reports_missing(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.post(self.uids + ['NOPE-1'])
+        self.assertEqual(response.status_code, 200)
+        lookups = [q['sql'] for q in captured.captured_queries if 'FROM "inventory_inventoryitem"' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn('"uid_no" IN (', lookups[0])
+
+        body = response.json()
+        self.assertEqual((body['found'], body['not_found']), (50, 1))
+        self.assertIsNone(body['items']['NOPE-1'])
+        self.assertEqual(body['items'][self.uids[1]], {'status': 'Available', 'location': 'Scan Room', 'project': 'Tagging'})
+        self.assertNotIn(b', ', response.content)  # compact separators
+
+        response = self.client.get(self.url, {'uids': f'{self.uids[0]},NOPE-1'})
+        self.assertEqual(response.json()['items'][self.uids[0]]['project'], None)
+
+    def test_repeat_lookups_hit_the_cache_until_an_item_changes(self):
+        self.post(self.uids)
+        with self.assertNumQueries(4):  # session + user + generation + refdata generation
+            self.post(self.uids[:10])
+        self.assertGreaterEqual(uidstatus.stats()['hits'], 10)
+
+        item = self.items[3]
+        item.status = 'In Repair'
+        item.save()
+        self.assertEqual(self.post([item.uid_no]).json()['items'][item.uid_no]['status'], 'In Repair')
+
+        item.delete()
+        self.assertIsNone(self.post([item.uid_no]).json()['items'][item.uid_no])
+
+    def test_lru_is_bounded(self):
+        with override_settings(INVENTORY_UID_STATUS={'CACHE_SIZE': 20}):
+            self.post(self.uids)
+        self.assertEqual(uidstatus.stats()['size'], 20)
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.client.post(self.url, 'not json', content_type='application/json').status_code, 400)
+        with override_settings(INVENTORY_UID_STATUS={'MAX_UIDS': 10}):
+            self.assertEqual(self.post(self.uids).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.post(self.uids[:1]).status_code, 401)
+
+
+def decode_code128(row):
+    """Decodes one pixel row (0 = black) through a Code128 set B barcode back to its text."""
+    runs = []
+    for pixel in row:
+        dark = pixel == 0
+        if runs and runs[-1][0] == dark:
+            runs[-1][1] += 1
+        else:
+            runs.append([dark, 1])
+    runs = [count for dark, count in runs[1:-1]]  # drop the quiet zones
+    module = min(runs)  # every symbol has a one-module element
+    widths = ''.join(str(count // module) for count in runs)
+    symbols = [labels.CODE128_PATTERNS.index(widths[start:start + 6]) for start in range(0, len(widths) - 7, 6)]
+    start, *values, checksum = symbols
+    assert start == labels.CODE128_START_B and widths[-7:] == labels.CODE128_PATTERNS[labels.CODE128_STOP]
+    assert checksum == (start + sum(position * value for position, value in enumerate(values, 1))) % 103
+    return ''.join(chr(value + 32) for value in values)
+
+
+@render_settings
+@override_settings(INVENTORY_LABELS={'COLUMNS': 2, 'ROWS': 2, 'WORKERS': 1, 'MAX_LABELS': 20})
+@strict_query_budgets
+class LabelSheetTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('printer', password='pw'))
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Intake Laptop {n}", category='Laptop', location=Location.objects.get_or_create(name='Dock')[0])
+            for n in range(6)
+        )
+        self.uids = [item.uid_no for item in self.items]
+        self.url = reverse('inventory:print_labels')
+
+    def test_code128_barcode_round_trips(self):
+        from PIL import Image
+
+        sheet_layout = labels.layout('code128')
+        png = labels.render_sheet([(self.uids[0], 'Intake Laptop 0')], sheet_layout, 'png')
+        image = Image.open(io.BytesIO(png)).convert('L')
+        margin, (cell_width, cell_height) = sheet_layout['margin'], sheet_layout['cell']
+        row = [image.getpixel((x, margin + cell_height // 4)) for x in range(margin, margin + cell_width)]
+        self.assertEqual(decode_code128(row), self.uids[0])
+
+        with self.assertRaises(ValueError):
+            labels.code128_modules('café')
+
+    def test_pdf_is_streamed_one_page_per_sheet(self):
+        import re
+        import zlib
+
+        response = self.client.post(self.url, {'uids': '\n'.join(self.uids), 'format': 'pdf', 'symbology': 'code128'})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)  # header, two sheets of four labels, trailer
+        pdf = b''.join(chunks)
+        self.assertTrue(pdf.startswith(b'%PDF-1.4') and pdf.endswith(b'%%EOF\n'))
+        self.assertIn(b'/Count 2', pdf)
+
+        # Every xref offset points at its object, and startxref at the table.
+        xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        self.assertTrue(pdf[xref:].startswith(b'xref\n'))
+        for number, offset in enumerate(re.findall(rb'(\d{10}) 00000 n', pdf), 1):
+            self.assertTrue(pdf[int(offset):].startswith(f'{number} 0 obj'.encode()))
+
+        width, height = labels.layout()['size']
+        match = re.search(rb'/Width (\d+) /Height (\d+) .*?/Length (\d+) >>\nstream\n', pdf)
+        self.assertEqual((int(match.group(1)), int(match.group(2))), (width, height))
+        data = pdf[match.end():match.end() + int(match.group(3))]
+        self.assertEqual(len(zlib.decompress(data)), (width + 7) // 8 * height)
+
+    def test_uid_list_keeps_order_and_reports_unknown_uids(self):
+        from django.contrib.messages import get_messages
+
+        response = self.client.get(self.url, {'uids': f'{self.uids[2]}, NOPE-1, {self.uids[0]}', 'format': 'png'})
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'\x89PNG'))
+        self.assertIn('NOPE-1', [str(m) for m in get_messages(response.wsgi_request)][0])
+
+    def test_dashboard_search_selects_labels_and_many_png_sheets_are_zipped(self):
+        import zipfile
+
+        InventoryItem.objects.create(item_name='Projector', category='Other')
+        response = self.client.get(self.url, {'search': 'laptop', 'format': 'png'})
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['labels-001.png', 'labels-002.png'])
+
+    def test_limits_and_empty_selections_render_the_form(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Print Asset Labels')
+        response = self.client.get(self.url, {'search': 'nothing-matches-this', 'format': 'pdf'})
+        self.assertContains(response, 'no labels to print')
+        response = self.client.post(self.url, {'uids': ','.join(f'X-{n}' for n in range(21)), 'format': 'pdf',
+                                               'symbology': 'code128'})
+        self.assertContains(response, 'At most 20 labels')
+
+    def test_process_pool_renders_the_same_sheets_in_order(self):
+        rows = [(uid, 'Laptop') for uid in self.uids]
+        sheet_layout = labels.layout()
+        inline = list(labels.render_sheets(rows, sheet_layout, 'png', workers=1))
+        pooled = list(labels.render_sheets(rows, sheet_layout, 'png', workers=2))
+        self.assertEqual(len(pooled), 2)
+        self.assertEqual(pooled, inline)
+
+
+@strict_query_budgets
+class AsyncApiTests(TestCase):
+    def setUp(self):
+        uidstatus.clear()
+        self.addCleanup(uidstatus.clear)
+        user = User.objects.create_user('scanner', password='pw')
+        self.client.force_login(user)
+        self.async_client.force_login(user)
+        self.lab = Location.objects.create(name='Lab')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Laptop {n:02d}", category='Laptop', location=self.lab, quantity=n) for n in range(25)
+        )
+        for item in self.items[:3]:
+            InventoryLog.objects.create(item=item, action='Created', user=user)
+
+    def walk(self, get, name, params):
+        pages, query = [], urlencode(params)
+        while query is not None:
+            body = get(f"{reverse(f'inventory:{name}')}?{query}")
+            pages.append(body['results'])
+            query = body.get('next')
+        return pages
+
+    async def test_async_twins_answer_like_the_sync_endpoints(self):
+        uids = f"{self.items[4].uid_no},NOPE-1,{self.items[2].uid_no}"
+        cases = [
+            ('items', {'uids': uids, 'fields': 'uid_no,location,quantity'}),
+            ('items', {'fields': 'item_name', 'limit': 7, 'sort': '-quantity'}),
+            ('logs', {'limit': 2}),
+            ('dashboard', {'limit': 10, 'sort': '-created_at'}),
+            ('dashboard', {'search': 'laptop', 'limit': 10}),
+            ('status', {'uids': uids}),
+        ]
+        for name, params in cases:
+            with self.subTest(name, **params):
+                expected = await sync_to_async(self.client.get)(reverse(f'inventory:api_{name}'), params)
+                response = await self.async_client.get(reverse(f'inventory:async_api_{name}'), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    def test_dashboard_pages_follow_next_links(self):
+        def get_sync(url):
+            return self.client.get(url).json()
+
+        async def get_async(url):
+            return (await self.async_client.get(url)).json()
+
+        for params in ({'limit': 10}, {'limit': 10, 'sort': '-updated_at'}, {'search': 'laptop', 'limit': 10}):
+            with self.subTest(**params):
+                pages = self.walk(get_sync, 'api_dashboard', params)
+                self.assertEqual([len(page) for page in pages], [10, 10, 5])
+                self.assertEqual(len({row['id'] for page in pages for row in page}), 25)
+                self.assertEqual(self.walk(async_to_sync(get_async), 'async_api_dashboard', params), pages)
+
+    async def test_asgi_application_only_serves_the_async_api(self):
+        from asgiref.testing import ApplicationCommunicator
+        from inventory_management.asgi import application
+
+        async def status(path):
+            scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                     'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+                     'root_path': '', 'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 1),
+                     'server': ('testserver', 80)}
+            communicator = ApplicationCommunicator(application, scope)
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+            start = await communicator.receive_output(5)
+            await communicator.receive_output(5)
+            return start['status']
+
+        self.assertEqual(await status(reverse('inventory:export_inventory_excel')), 404)
+        self.assertEqual(await status(reverse('inventory:async_api_logs')), 401)
+
+    async def test_errors_and_csrf(self):
+        url = reverse('inventory:async_api_status')
+        client = AsyncClient(enforce_csrf_checks=True)
+        await sync_to_async(client.force_login)(await User.objects.aget(username='scanner'))
+        response = await client.post(url, json.dumps({'uids': [self.items[0].uid_no]}), content_type='application/json')
+        self.assertEqual(response.json()['found'], 1)
+
+        self.assertEqual((await self.async_client.get(url)).status_code, 400)
+        self.assertEqual((await self.async_client.get(reverse('inventory:async_api_dashboard'), {'sort': 'x'})).status_code, 400)
+        self.assertEqual((await self.async_client.post(reverse('inventory:async_api_items'))).status_code, 405)
+        self.assertEqual((await AsyncClient().get(reverse('inventory:async_api_logs'))).status_code, 401)
+
+
+@strict_query_budgets
+class DisposalTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('clerk', password='pw')
+        self.client.force_login(self.user)
+        self.store = Location.objects.create(name='Store')
+        self.items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Cable {n}", category='Cable', location=self.store, quantity=5) for n in range(40)
+        )
+        self.uids = [item.uid_no for item in self.items]
+
+    def quantity(self, uid):
+        return InventoryItem.objects.filter(uid_no=uid).values_list('quantity', flat=True).first()
+
+    def test_batch_reduces_deletes_and_reports_failures(self):
+        old_log = InventoryLog.objects.create(item=self.items[1], uid_no=self.uids[1], action='updated')
+        disposed, failed = dispose_items([
+            {'uid_no': self.uids[0], 'quantity': 2, 'reason': 'Broken'},
+            {'uid_no': self.uids[1], 'quantity': 5},
+            {'uid_no': self.uids[2], 'quantity': 6},
+            {'uid_no': 'NOPE-1', 'quantity': 1},
+            {'uid_no': self.uids[0], 'quantity': 1},
+            {'uid_no': self.uids[3], 'quantity': 0},
+        ], user=self.user)
+
+        self.assertEqual([(row['uid_no'], row['remaining']) for row in disposed], [(self.uids[0], 3), (self.uids[1], 0)])
+        self.assertEqual({row['uid_no'] for row in failed}, {self.uids[0], self.uids[2], self.uids[3], 'NOPE-1'})
+        self.assertIn('Only 5 available', next(row['reason'] for row in failed if row['uid_no'] == self.uids[2]))
+        self.assertEqual((self.quantity(self.uids[0]), self.quantity(self.uids[1]), self.quantity(self.uids[2])),
+                         (3, None, 5))
+
+        reduced = InventoryLog.objects.get(action='quantity_reduced')
+        self.assertEqual((reduced.item, reduced.user), (self.items[0], self.user))
+        self.assertIn('by 2. New quantity: 3. Reason: Broken.', reduced.details)
+        self.assertEqual(list(reduced.changes.values_list('field', 'old_value', 'new_value')), [('quantity', '5', '3')])
+        deleted = InventoryLog.objects.get(action='deleted')
+        self.assertEqual((deleted.item, deleted.uid_no), (None, self.uids[1]))
+        self.assertIn('Original Quantity: 5. Reason: No reason provided.', deleted.details)
+        old_log.refresh_from_db()
+        self.assertIsNone(old_log.item)
+
+        self.assertEqual(summary.reconcile(fix=False), [])
+        self.assertFalse(search.search(InventoryItem.objects.all(), 'Cable').filter(uid_no=self.uids[1]).exists())
+
+    def test_guard_stops_disposing_more_than_is_left(self):
+        dispose_items([{'uid_no': self.uids[0], 'quantity': 3}])
+        disposed, failed = dispose_items([{'uid_no': self.uids[0], 'quantity': 3}])
+        self.assertEqual(disposed, [])
+        self.assertIn('Only 2 available', failed[0]['reason'])
+        self.assertEqual(self.quantity(self.uids[0]), 2)
+
+    def test_backends_without_returning_use_row_counts(self):
+        with mock.patch('inventory.disposals.supports_update_returning', return_value=False):
+            disposed, failed = dispose_items([{'uid_no': self.uids[0], 'quantity': 2},
+                                              {'uid_no': self.uids[1], 'quantity': 6}])
+        self.assertEqual([(row['uid_no'], row['remaining']) for row in disposed], [(self.uids[0], 3)])
+        self.assertIn('Only 5 available', failed[0]['reason'])
+
+    def test_large_batches_are_decremented_in_chunks(self):
+        items = InventoryItem.objects.bulk_create_with_uids(
+            InventoryItem(item_name=f"Plug {n}", category='Cable', location=self.store, quantity=3) for n in range(400)
+        )
+        entries = [{'uid_no': item.uid_no, 'quantity': 3 if n % 2 else 1} for n, item in enumerate(items)]
+        entries[-1]['quantity'] = 4  # more than is left
+        disposed, failed = dispose_items(entries)
+        self.assertEqual((len(disposed), [row['uid_no'] for row in failed]), (399, [items[-1].uid_no]))
+        self.assertEqual(InventoryItem.objects.filter(item_name__startswith='Plug').count(), 201)
+        self.assertEqual(set(InventoryItem.objects.filter(item_name__startswith='Plug').values_list('quantity', flat=True)),
+                         {2, 3})
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def count(uids):
+            entries = [{'uid_no': uid, 'quantity': 1 + n % 5} for n, uid in enumerate(uids)]
+            from django.db import connection
+            from django.test.utils import CaptureQueriesContext
+            with CaptureQueriesContext(connection) as captured:
+                dispose_items(entries, user=self.user)
+            return len(captured.captured_queries)
+
+        self.assertEqual(count(self.uids[:10]), count(self.uids[10:40]))
+        self.assertEqual(InventoryItem.objects.count(), 32)  # every fifth entry took the whole quantity
+
+    @render_settings
+    def test_views(self):
+        response = self.client.post(reverse('inventory:delete_item_general'),
+                                    {'uid_no': self.uids[0], 'quantity': 2, 'reason_for_deletion': 'Lost'}, follow=True)
+        self.assertContains(response, f'Quantity of item with UID {self.uids[0]} reduced.')
+        self.assertEqual(self.quantity(self.uids[0]), 3)
+        response = self.client.post(reverse('inventory:delete_item_general'), {'uid_no': self.uids[0], 'quantity': 4})
+        self.assertContains(response, 'Only 3 available')
+
+        rows = f"{self.uids[1]}\n{self.uids[2]}, 5, Scrapped\nNOPE-1, 1\n"
+        response = self.client.post(reverse('inventory:delete_items_batch'),
+                                    {'rows': rows, 'reason_for_deletion': 'Audit'})
+        self.assertContains(response, 'Deleted 2 item(s): 1 fully, 1 by reducing their quantity.')
+        self.assertContains(response, 'Item with UID &quot;NOPE-1&quot; not found.')
+        self.assertTrue(InventoryLog.objects.filter(uid_no=self.uids[1], details__endswith='Reason: Audit.').exists())
+        self.assertTrue(InventoryLog.objects.filter(uid_no=self.uids[2], details__endswith='Reason: Scrapped.').exists())
+
+        response = self.client.post(reverse('inventory:delete_items_batch'), {'rows': f"{self.uids[3]}, two"})
+        self.assertContains(response, 'Line 1: quantity')
+        self.assertEqual(self.quantity(self.uids[3]), 5)
+
+
+@strict_query_budgets
+@no_page_cache
+class ItemVersionTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('editor', password='pw'))
+        self.lab = Location.objects.create(name='Lab')
+        self.annex = Location.objects.create(name='Annex')
+        self.item = InventoryItem.objects.create(item_name='Plotter', category='Printer', location=self.lab)
+
+    def edit_data(self, **changes):
+        return {'item_name': 'Plotter', 'category': 'Printer', 'uid_no': self.item.uid_no, 'location': self.lab.pk,
+                'status': 'Available', 'quantity': 1, 'version': 1, **changes}
+
+    def test_saves_bump_the_version_and_stale_instances_conflict(self):
+        stale = InventoryItem.objects.get(pk=self.item.pk)
+        self.item.status = 'In Use'
+        self.item.save()
+        self.item.save(update_fields=['status'])
+        self.assertEqual(InventoryItem.objects.get(pk=self.item.pk).version, 3)
+
+        stale.item_name = 'Old plotter'
+        with self.assertRaises(VersionConflict):
+            stale.save()
+        self.assertEqual(stale.version, 1)
+        self.assertEqual(InventoryItem.objects.values_list('item_name', 'version').get(), ('Plotter', 3))
+
+    @render_settings
+    def test_edit_form_reports_a_conflict_and_can_save_over_it(self):
+        url = reverse('inventory:edit_item', args=[self.item.pk])
+        self.assertContains(self.client.get(url), 'name="version" value="1"')
+        self.item.location = self.annex
+        self.item.save()
+
+        response = self.client.post(url, self.edit_data(item_name='Plotter XL'))
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'was changed by someone else', status_code=409)
+        self.assertContains(response, 'differ from the current ones in: item name, location', status_code=409)
+        self.assertContains(response, 'name="version" value="2"', status_code=409)
+        self.assertEqual(InventoryItem.objects.get().item_name, 'Plotter')
+
+        response = self.client.post(url, self.edit_data(item_name='Plotter XL', version=2))
+        self.assertRedirects(response, reverse('inventory:item_details', args=[self.item.pk]), fetch_redirect_response=False)
+        self.assertEqual(InventoryItem.objects.values_list('item_name', 'location', 'version').get(),
+                         ('Plotter XL', self.lab.pk, 3))
+
+    def test_transfers_check_versions_without_locking(self):
+        other = InventoryItem.objects.create(item_name='Scanner', category='Printer', location=self.lab)
+        self.item.status = 'In Repair'
+        self.item.save()
+
+        transferred, failed = transfer_items([
+            {'id': self.item.pk, 'new_location': self.annex.pk, 'version': 1},
+            {'id': other.pk, 'new_location': self.annex.pk, 'version': 1},
+        ])
+        self.assertEqual([item.pk for item in transferred], [other.pk])
+        self.assertEqual(failed, [{'id': self.item.pk, 'conflict': True, 'version': 2,
+                                   'reason': f"Item with ID {self.item.pk} was changed by someone else; reload and try again."}])
+        self.assertEqual(InventoryItem.objects.get(pk=other.pk).version, 2)
+
+        response = self.client.post(reverse('inventory:transfer_inventory_items'), json.dumps(
+            {'items': [{'id': self.item.pk, 'new_location': self.annex.pk, 'version': 1}]}), content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(InventoryItem.objects.get(pk=self.item.pk).location, self.lab)
+        self.assertFalse(InventoryLog.objects.filter(action='transferred', item=self.item).exists())
+
+    def test_transfer_notices_a_write_between_its_read_and_update(self):
+        from django.db import connection
+        from django.db.models import F
+
+        def interloper(execute, sql, params, many, context):
+            # Another writer moves the item just before the transfer's UPDATE runs.
+            if sql.startswith('UPDATE "inventory_inventoryitem" SET "location_id"') and not fired:
+                fired.append(True)
+                InventoryItem.objects.filter(pk=self.item.pk).update(status='In Use', version=F('version') + 1)
+            return execute(sql, params, many, context)
+
+        fired = []
+        with connection.execute_wrapper(interloper):
+            transferred, failed = transfer_items([{'id': self.item.pk, 'new_location': self.annex.pk}])
+        self.assertEqual((transferred, [failure['version'] for failure in failed]), ([], [2]))
+        self.assertEqual(InventoryItem.objects.values_list('status', 'location', 'version').get(),
+                         ('In Use', self.lab.pk, 2))
+        self.assertFalse(InventoryLog.objects.filter(action='transferred').exists())
+
+    def test_disposals_bump_the_version(self):
+        self.item.quantity = 3
+        self.item.save()
+        dispose_items([{'uid_no': self.item.uid_no, 'quantity': 1}])
+        self.assertEqual(InventoryItem.objects.values_list('quantity', 'version').get(), (2, 3))
@@ -0,0 +1,155 @@
+# inventory_management/inventory/thumbnails.py
+#
+# Downscaled copies of item images, so list pages don't ship multi-megabyte phone photos.
+# Configured by settings.INVENTORY_THUMBNAILS:
+#
+#   'MODE': 'background'  generate on a worker thread once the saving transaction commits
+#           'sync'        generate inline (tests, management commands)
+#   'SIZES': {'small': 96, 'medium': 320}   longest edge in pixels per named size
+#   'QUALITY': JPEG quality
+#
+# Thumbnails are stored next to the original as <stem>.<size><edge>.<content hash>.jpg. The
+# hash is taken from the original's bytes, so a replaced image gets new names (and browsers
+# never see a stale cached file), and units sharing one upload share one set of thumbnails.
+# Each item records its thumbnails in InventoryItem.thumbnails, together with the image name
+# they were made from; until that matches the current image, templates show the original.
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+from . import pagecache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'background',
+    'SIZES': {'small': 96, 'medium': 320},
+    'QUALITY': 82,
+}
+HASH_LENGTH = 16
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_THUMBNAILS', {})}
+
+
+def thumbnail_name(source, size, edge, digest):
+    # The edge length is part of the name so that resizing a size in SIZES renders new files.
+    stem, _ = os.path.splitext(source)
+    return f"{stem}.{size}{edge}.{digest[:HASH_LENGTH]}.jpg"
+
+
+def render(source, sizes=None, quality=None, storage=default_storage):
+    """
+    Writes the thumbnails of one stored image and returns {'source': name, size: thumbnail name, ...}.
+    Touches no database, so it can run in a worker process.
+    """
+    from PIL import Image, ImageOps
+
+    config = get_config()
+    sizes = sizes or config['SIZES']
+    quality = quality or config['QUALITY']
+
+    digest = hashlib.sha256()
+    data = io.BytesIO()
+    with storage.open(source, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+            data.write(chunk)
+    digest = digest.hexdigest()
+    data.seek(0)
+
+    result = {'source': source}
+    with Image.open(data) as original:
+        # Phone photos are stored sideways with an EXIF rotation flag; bake it in.
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        for size, edge in sizes.items():
+            name = thumbnail_name(source, size, edge, digest)
+            if not storage.exists(name):
+                copy = image.copy()
+                copy.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                copy.save(buffer, 'JPEG', quality=quality, optimize=True)
+                saved = storage.save(name, ContentFile(buffer.getvalue()))
+                if saved != name:
+                    # A concurrent render won the race; keep the canonical name, drop ours.
+                    storage.delete(saved)
+            result[size] = name
+    return result
+
+
+def store(result):
+    """Records rendered thumbnails on every item still showing that image. Returns rows updated."""
+    from .models import InventoryItem
+
+    # Conditional on the image, so a thumbnail set never lands on an item whose image changed meanwhile.
+    updated = InventoryItem.objects.filter(image=result['source']).update(thumbnails=result)
+    if updated:
+        pagecache.invalidate()
+    return updated
+
+
+def generate(source):
+    try:
+        result = render(source)
+    except Exception:
+        logger.exception("Could not create thumbnails for %s.", source)
+        # Remember the failure, so the item isn't retried on every save; the original is shown.
+        result = {'source': source}
+    return store(result)
+
+
+class ThumbnailWorker:
+    """Single background thread per process, recreated after a fork."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def submit(self, source):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inventory-thumbnails')
+                self._pid = os.getpid()
+            return self._executor.submit(self._run, source)
+
+    def _run(self, source):
+        try:
+            return generate(source)
+        finally:
+            connections.close_all()
+
+
+worker = ThumbnailWorker()
+
+
+def needs_thumbnails(item):
+    return bool(item.image) and (item.thumbnails or {}).get('source') != item.image.name
+
+
+def schedule(sources):
+    """Queues thumbnail generation for these image names once the current transaction commits."""
+    sources = sorted(set(filter(None, sources)))
+    if not sources:
+        return
+    if get_config()['MODE'] == 'sync':
+        for source in sources:
+            generate(source)
+        return
+
+    def submit_all():
+        for source in sources:
+            worker.submit(source)
+    transaction.on_commit(submit_all)
@@ -0,0 +1,163 @@
+# inventory_management/inventory/transfers.py
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import pagecache, search, summary
+from .models import InventoryItem, InventoryLog, ItemChange, Location, Project
+
+TRANSFER_STATUS = 'Assigned'
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def transfer_items(entries, user=None):
+    """
+    Moves a batch of items to new locations/projects with a fixed number of queries and
+    without row locks: one SELECT for all items and one lookup each for locations and
+    projects (read outside the transaction), then one versioned UPDATE per distinct
+    (location, project) target and one bulk insert each for the log entries and their
+    structured ItemChange rows.
+
+    `entries` are dicts with 'id', 'new_location', optional 'project_id' and optional
+    'version', as posted by the dashboard. An item is only moved if it is still at that
+    version (or, without one, at the version read here); otherwise it is reported as a
+    conflict. Returns (transferred items, failed entries as {'id', 'reason'}, plus
+    'conflict': True and 'version' for conflicts).
+    """
+    failed = []
+    requested = {}
+    for entry in entries:
+        item_id = entry.get('id')
+        new_location_id = entry.get('new_location')
+        project_id = entry.get('project_id')
+        if not item_id or not new_location_id:
+            failed.append({'id': item_id, 'reason': 'Missing item ID or new location ID'})
+            continue
+        pk = _as_id(item_id)
+        if pk is None:
+            failed.append({'id': item_id, 'reason': f"Item with ID {item_id} not found."})
+        elif pk in requested:
+            failed.append({'id': item_id, 'reason': "Item listed more than once in this transfer."})
+        else:
+            requested[pk] = (item_id, new_location_id, project_id, _as_id(entry.get('version')))
+
+    if not requested:
+        return [], failed
+
+    # Plain reads: the versioned UPDATEs below notice anything that changes after them, so
+    # concurrent transfers and edits never wait on each other's locks.
+    items = InventoryItem.objects.filter(pk__in=list(requested)).only(
+        'id', 'item_name', 'uid_no', 'status', 'category', 'quantity', 'location_id', 'project_id', 'version'
+    ).order_by().in_bulk()
+
+    location_ids = {_as_id(location) for _, location, _, _ in requested.values()}
+    location_ids |= {item.location_id for item in items.values()}
+    project_ids = {_as_id(project) for _, _, project, _ in requested.values() if project}
+    project_ids |= {item.project_id for item in items.values()}
+    location_ids.discard(None)
+    project_ids.discard(None)
+    location_names = dict(Location.objects.filter(pk__in=location_ids).values_list('pk', 'name'))
+    project_names = dict(Project.objects.filter(pk__in=project_ids).values_list('pk', 'name'))
+
+    def conflict(item_id, item):
+        failed.append({'id': item_id, 'conflict': True, 'version': item.version if item else None,
+                       'reason': f"Item with ID {item_id} was changed by someone else; reload and try again."})
+
+    targets = {}  # (location_id, project_id) -> [item, ...]
+    for pk, (item_id, new_location_id, project_id, version) in requested.items():
+        item = items.get(pk)
+        location_pk = _as_id(new_location_id)
+        project_pk = _as_id(project_id) if project_id else None
+        if item is None:
+            failed.append({'id': item_id, 'reason': f"Item with ID {item_id} not found."})
+        elif version is not None and version != item.version:
+            conflict(item_id, item)
+        elif location_pk not in location_names:
+            failed.append({'id': item_id, 'reason': f"New location with ID {new_location_id} not found."})
+        elif project_id and project_pk not in project_names:
+            failed.append({'id': item_id, 'reason': f"Project with ID {project_id} not found."})
+        else:
+            targets.setdefault((location_pk, project_pk), []).append(item)
+
+    with transaction.atomic():
+        now = timezone.now()
+        counters = summary.SummaryDelta()
+        logs = []
+        log_changes = []
+        transferred = []
+        for (location_pk, project_pk), group in targets.items():
+            by_version = {}
+            for item in group:
+                by_version.setdefault(item.version, []).append(item.pk)
+            # One UPDATE per version read (usually one): a (pk, version) OR per item would exceed
+            # SQLite's expression depth limit on large transfers.
+            matched = sum(
+                InventoryItem.objects.filter(pk__in=pks, version=version).update(
+                    location_id=location_pk, project_id=project_pk, status=TRANSFER_STATUS, updated_at=now,
+                    version=F('version') + 1,
+                )
+                for version, pks in by_version.items()
+            )
+            if matched < len(group):
+                # Some rows moved on since they were read; ours carry this UPDATE's timestamp.
+                current = {pk: (version, updated_at) for pk, version, updated_at in InventoryItem.objects.filter(
+                    pk__in=[item.pk for item in group]).values_list('pk', 'version', 'updated_at')}
+                stale = [item for item in group if current.get(item.pk) != (item.version + 1, now)]
+                for item in stale:
+                    item_id = requested[item.pk][0]
+                    if item.pk in current:
+                        item.version = current[item.pk][0]
+                        conflict(item_id, item)
+                    else:
+                        failed.append({'id': item_id, 'reason': f"Item with ID {item_id} not found."})
+                stale_pks = {item.pk for item in stale}
+                group = [item for item in group if item.pk not in stale_pks]
+            for item in group:
+                old_location = location_names.get(item.location_id)
+                old_project = project_names.get(item.project_id)
+                new_location = location_names[location_pk]
+                new_project = project_names.get(project_pk)
+                logs.append(InventoryLog(
+                    user=user if user and user.is_authenticated else None,
+                    item=item,
+                    uid_no=item.uid_no,
+                    action='transferred',
+                    details=(f"Item '{item.item_name}' (UID: {item.uid_no}) transferred "
+                             f"from '{old_location or 'N/A'}' to '{new_location}'. "
+                             f"Project changed from '{old_project or 'N/A'}' to '{new_project or 'N/A'}'. "
+                             f"Status set to '{TRANSFER_STATUS}'."),
+                ))
+                log_changes.append([
+                    (field, old, new) for field, old, new in (
+                        ('location', old_location, new_location),
+                        ('project', old_project, new_project),
+                        ('status', item.status, TRANSFER_STATUS),
+                    ) if old != new
+                ])
+                old_state = item.summary_state()
+                item.location_id, item.project_id, item.status = location_pk, project_pk, TRANSFER_STATUS
+                item.version += 1
+                counters.change(old_state, item.summary_state())
+                transferred.append(item)
+
+        # Written with the moves rather than through logsink, so they commit or roll back together.
+        InventoryLog.objects.bulk_create(logs, batch_size=500)
+        ItemChange.objects.bulk_create(
+            [change for log, changes in zip(logs, log_changes) for change in ItemChange.for_log(log, changes)],
+            batch_size=500,
+        )
+        # update() skips the save() signals: re-index the moved items, shift their summary buckets
+        # and expire the cached pages showing them.
+        search.index_items([item.pk for item in transferred])
+        counters.apply()
+        if transferred:
+            pagecache.invalidate()
+
+    return transferred, failed
@@ -0,0 +1,134 @@
+# inventory_management/inventory/uidstatus.py
+#
+# Batch UID -> (status, location, project) resolution for the scanner endpoints (api.status and
+# its async twin asyncapi.status, which uses aresolve()).
+# UIDs not seen recently are fetched with one uid_no IN (...) query; results, including
+# "no such UID", are kept in a per-process LRU of settings.INVENTORY_UID_STATUS['CACHE_SIZE']
+# entries.
+#
+# The LRU remembers the 'inventory' CacheGeneration it was filled at (see pagecache.py), which
+# every item save, delete, transfer and bulk insert bumps; a lookup that finds the generation
+# moved on starts from an empty cache, so no worker answers from before a committed write.
+# Location and project ids are cached, not names: names come from refdata at response time.
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import pagecache, refdata
+from .models import CacheGeneration, InventoryItem
+
+DEFAULTS = {
+    'CACHE_SIZE': 20000,
+    'MAX_UIDS': 5000,
+}
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # uid -> (status, location_id, project_id), or None when not found
+_generation = None
+_counters = {'hits': 0, 'misses': 0, 'resets': 0}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'INVENTORY_UID_STATUS', {})}
+
+
+def _cached(generation, uids):
+    """({uid: cached entry}, [uids to fetch]), first emptying the cache if `generation` moved on."""
+    global _generation
+    found = {}
+    missing = []
+    with _lock:
+        if generation != _generation:
+            if _entries:
+                _counters['resets'] += 1
+            _entries.clear()
+            _generation = generation
+        for uid in uids:
+            if uid in _entries:
+                _entries.move_to_end(uid)
+                found[uid] = _entries[uid]
+            else:
+                missing.append(uid)
+        _counters['hits'] += len(found)
+        _counters['misses'] += len(missing)
+    return found, missing
+
+
+def _missing_query(missing):
+    # (uid_no, status, location_id, project_id) rows; everything after the UID is what gets cached.
+    return (InventoryItem.objects.filter(uid_no__in=missing).order_by()
+            .values_list('uid_no', 'status', 'location_id', 'project_id'))
+
+
+def _store(generation, missing, rows, found):
+    size = get_config()['CACHE_SIZE']
+    with _lock:
+        # Skip storing if another thread has already moved the cache to a newer generation.
+        store = _generation == generation
+        for uid in missing:
+            found[uid] = rows.get(uid)
+            if store:
+                _entries[uid] = found[uid]
+        while len(_entries) > size:
+            _entries.popitem(last=False)
+    return found
+
+
+def _lookup(uids):
+    generation = CacheGeneration.objects.current(pagecache.GENERATION)
+    found, missing = _cached(generation, uids)
+    if missing:
+        rows = {row[0]: row[1:] for row in _missing_query(missing)}
+        _store(generation, missing, rows, found)
+    return found
+
+
+async def _alookup(uids):
+    generation = await CacheGeneration.objects.acurrent(pagecache.GENERATION)
+    found, missing = _cached(generation, uids)
+    if missing:
+        rows = {row[0]: row[1:] async for row in _missing_query(missing)}
+        _store(generation, missing, rows, found)
+    return found
+
+
+def _describe(uids, found, snapshot):
+    result = {}
+    for uid in uids:
+        entry = found[uid]
+        if entry is None:
+            result[uid] = None
+            continue
+        status, location_id, project_id = entry
+        location = snapshot.location_by_pk.get(location_id)
+        project = snapshot.project_by_pk.get(project_id)
+        result[uid] = {
+            'status': status,
+            'location': location.name if location else None,
+            'project': project.name if project else None,
+        }
+    return result
+
+
+def resolve(uids):
+    """{uid: {'status', 'location', 'project'} or None} for each UID, in the order given."""
+    return _describe(uids, _lookup(uids), refdata.get())
+
+
+async def aresolve(uids):
+    """resolve() for async views."""
+    return _describe(uids, await _alookup(uids), await refdata.aget())
+
+
+def stats():
+    with _lock:
+        return {**_counters, 'size': len(_entries), 'generation': _generation}
+
+
+def clear():
+    global _generation
+    with _lock:
+        _entries.clear()
+        _generation = None
@@ -1,7 +1,7 @@
 # inventory_management/inventory/urls.py
 
 from django.urls import path
-from . import views
+from . import api, asyncapi, views
 
 app_name = 'inventory' # THIS IS CRUCIAL FOR NAMESPACING
 
@@ -10,18 +10,23 @@ urlpatterns = [
     path('', views.dashboard_view, name='dashboard'),
 
     path('add/', views.add_item, name='add_item'),
+    path('import/', views.import_items, name='import_items'),
 
     # Deletion views:
     # 1. Delete specific item by its primary key (from dashboard or item details)
     path('delete/<int:pk>/', views.delete_item_by_pk, name='delete_item_by_pk'),
     # 2. Delete item by UID (general form)
     path('delete_item_general/', views.delete_item_general, name='delete_item_general'),
+    # 3. Delete or reduce many items at once from "UID, quantity, reason" rows
+    path('delete_item_general/batch/', views.delete_items_batch, name='delete_items_batch'),
 
     # Status check views:
     # 1. Status check by UID (general form, renamed for clarity)
     path('status_check/', views.status_check, name='status_check'),
     # 2. Display specific item details by primary key (e.g., from dashboard click)
     path('item_details/<int:pk>/', views.item_details, name='item_details'), # Renamed for clarity
+    path('item_details/<int:pk>/logs/', views.item_log_timeline, name='item_log_timeline'),
+    path('cache/stats/', views.page_cache_stats, name='page_cache_stats'),
 
     # User Authentication views:
     path('login/', views.user_login, name='login'),
@@ -38,6 +43,7 @@ urlpatterns = [
     path('export/', views.export_inventory_excel, name='export_inventory_excel'),
     # Note: transfer_items_to_excel was for generating an Excel to fill out manually.
     # The AJAX transfer handles updates directly now. You might keep this if you still need it.
+    path('labels/', views.print_labels, name='print_labels'),
     path('transfer-items-to-excel/', views.transfer_items_to_excel, name='transfer_items_to_excel'),
 
     # Inventory Transfer view (AJAX POST endpoint)
@@ -45,4 +51,18 @@ urlpatterns = [
 
     # NEW: Logs View
     path('logs/', views.inventory_logs, name='inventory_logs'),
+
+    # JSON API (see api.py)
+    path('api/items/', api.items, name='api_items'),
+    path('api/locations/', api.locations, name='api_locations'),
+    path('api/projects/', api.projects, name='api_projects'),
+    path('api/logs/', api.logs, name='api_logs'),
+    path('api/status/', api.status, name='api_status'),
+    path('api/dashboard/', api.dashboard, name='api_dashboard'),
+
+    # Async twins of the read endpoints, for ASGI deployments (see asyncapi.py)
+    path('api/async/items/', asyncapi.items, name='async_api_items'),
+    path('api/async/logs/', asyncapi.logs, name='async_api_logs'),
+    path('api/async/dashboard/', asyncapi.dashboard, name='async_api_dashboard'),
+    path('api/async/status/', asyncapi.status, name='async_api_status'),
 ]
\ No newline at end of file
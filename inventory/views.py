@@ -2,22 +2,25 @@
 
 import json
 import re
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from urllib.parse import urlencode
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.db import transaction
-from django.db.models import Count, Q, F
+from django.db.models.functions import Substr
 from django.db import models
 from django.views.decorators.http import require_POST
 from .models import InventoryItem
 
 # Pagination imports
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from .pagination import InvalidCursor, KeysetPaginator, LookaheadPage, estimated_count
 
 
 # Ensure all necessary forms are imported
@@ -26,30 +29,38 @@ from .forms import (
     RegisterForm,
     AddItemForm,
     EditItemForm,
+    ImportItemsForm,
     DeleteItemForm,
+    BatchDisposalForm,
     StatusCheckForm,
     ModifyItemForm,
     InventoryFilterForm,
+    LabelSheetForm,
+    LogFilterForm,
     TransferForm
 )
 
 # Import all models needed
-from .models import InventoryItem, Location, Project, InventoryLog, UIDCategorySequence
+from .models import InventoryItem, Location, Project, InventoryLog, UIDCategorySequence, VersionConflict
+from . import archive, labels, logsink, pagecache, refdata, search, summary, uidstatus
+from .importers import InventoryImporter
+from .transfers import transfer_items
+from .disposals import dispose_items
+from .querybudget import query_budget
+from .exporters import EXPORT_FORMATS, STREAM_WRITERS, iter_export_rows, parse_columns
 # Assuming Category is NOT a separate model, otherwise you'd import it here too.
 from django.contrib.auth.models import User
 
-# For Excel export
-import openpyxl
+# For the transfer template workbook
 from openpyxl.styles import Font
 from openpyxl import Workbook
-import mimetypes
 
 import logging
 logger = logging.getLogger(__name__)
 
 
 # --- Helper function to create log entries ---
-def create_log_entry(user, item_obj, action, details=None, uid_number_for_log=None):
+def create_log_entry(user, item_obj, action, details=None, uid_number_for_log=None, changes=None):
     """
     Creates a new log entry in the InventoryLog model.
     :param user: The User object performing the action. Can be None for actions like logout if model allows.
@@ -57,6 +68,7 @@ def create_log_entry(user, item_obj, action, details=None, uid_number_for_log=No
     :param action: The type of action (e.g., 'added', 'deleted', 'updated').
     :param details: Additional details for the log entry.
     :param uid_number_for_log: Explicit UID to store in log, especially if item_obj is None.
+    :param changes: Optional list of (field name, old value, new value) stored as ItemChange rows.
     """
     log_uid = uid_number_for_log
     if item_obj and item_obj.uid_no:
@@ -68,16 +80,9 @@ def create_log_entry(user, item_obj, action, details=None, uid_number_for_log=No
         if match:
             log_uid = match.group(1)
 
-    # Ensure the 'user' field in InventoryLog is correctly set if you named it 'user' and not 'acted_by'.
-    # Based on your provided code, it's 'acted_by' (though your log function parameter is 'user').
-    # Let's assume your InventoryLog model has 'user' as the ForeignKey to User.
-    InventoryLog.objects.create(
-        user=user if user and user.is_authenticated else None,
-        item=item_obj, # This can now be None due to models.SET_NULL (assuming your model is configured this way)
-        uid_no=log_uid, # Store the UID directly in the log for historical purposes
-        action=action,
-        details=details
-    )
+    # The sink (settings.INVENTORY_LOG_SINK) either writes now or queues the record for a
+    # background bulk insert, keeping the INSERT off the request path.
+    logsink.record(user, item_obj, action, details, uid_no=log_uid, changes=changes)
 
 # ---------------- User Auth ----------------
 
@@ -132,69 +137,68 @@ def user_register(request):
 
 # ---------------- Dashboard & Filtering ----------------
 
+# Columns the dashboard table actually renders; everything else (installed_software, cpu, ...) stays in the DB.
+DASHBOARD_COLUMNS = ('id', 'item_name', 'uid_no', 'serial_number', 'quantity', 'status', 'category',
+                     'created_at', 'updated_at', 'document', 'image', 'thumbnails', 'location', 'location__name',
+                     'project', 'version')
+DASHBOARD_PAGE_SIZE = 10
+
+@query_budget(12)
 @login_required
+@pagecache.cached_page('dashboard')
 def dashboard_view(request):
     # CORRECTED: Removed 'category' from select_related here.
     # It seems your InventoryItem.category is a CharField, not a ForeignKey.
-    items = InventoryItem.objects.all().order_by('item_name').select_related('location', 'project')
+    items = (InventoryItem.objects.select_related('location').only(*DASHBOARD_COLUMNS)
+             .annotate(description_preview=Substr('description', 1, 120)))
     filter_form = InventoryFilterForm(request.GET)
 
     search_query = ''
+    sort = ''
     if filter_form.is_valid():
         search_query = filter_form.cleaned_data.get('search', '')
+        sort = filter_form.cleaned_data.get('sort', '')
         if search_query:
-            items = items.filter(
-                Q(item_name__icontains=search_query) |
-                Q(uid_no__icontains=search_query) |
-                Q(serial_number__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(location__name__icontains=search_query) |
-                Q(project__name__icontains=search_query) |
-                # CORRECTED: If category is a CharField, you cannot use __name or __prefix
-                # You must access it directly like this:
-                Q(category__icontains=search_query) |
-                # If you have a 'prefix' field directly on InventoryItem and it's also a CharField:
-                # Q(prefix__icontains=search_query) |
-                # If 'prefix' was meant to be a field on a *related* Category model, and category is a CharField,
-                # then this line (Q(category__prefix__icontains=search_query)) is also incorrect.
-                # Assuming `category` is a single CharField for the item's category:
-                # (You will need to ensure your InventoryItem model does not have a `prefix` field
-                # or adjust this line based on its actual type).
-                # For now, I'm commenting out the problematic `category__prefix` and adjusting `category__name`.
-                # If your Category model existed and had a prefix, the original was correct, but then
-                # InventoryItem.category *would* be a ForeignKey, which the error disproves.
-                # So, I'm assuming 'category' is a CharField and 'prefix' logic needs to be re-evaluated.
-                # If 'prefix' is a separate field on InventoryItem, then add: Q(prefix__icontains=search_query)
-                # If there's no 'prefix' field at all, remove this Q entirely.
-                # For safety, removing `category__prefix` and just using `category__icontains`.
-                # If `UIDCategorySequence` is used for category prefixes for UID generation,
-                # this Q clause might not be for searching `InventoryItem.category` but rather for related UID logic.
-                # However, the error refers to `InventoryItem.category`.
-                Q(cpu__icontains=search_query) |
-                Q(gpu__icontains=search_query) |
-                Q(os__icontains=search_query) |
-                Q(installed_software__icontains=search_query) |
-                Q(status__icontains=search_query)
-            ).distinct()
-
-    paginator = Paginator(items, 10)
-    page = request.GET.get('page')
-    try:
-        items_page = paginator.page(page)
-    except PageNotAnInteger:
-        items_page = paginator.page(1)
-    except EmptyPage:
-        items_page = paginator.page(paginator.num_pages)
-
+            # Ranked full-text index lookup (falls back to the icontains chain where unsupported).
+            items = search.search(items, search_query)
+
+    # No COUNT(*) and no OFFSET scans: keyset pages seek on (sort column, id); only relevance-ranked
+    # search results, which can't be seeked, use numbered pages that look one row ahead.
+    base_params = {key: value for key, value in (('search', search_query), ('sort', sort)) if value}
+    if search_query and not sort:
+        try:
+            page_number = int(request.GET.get('page', 1))
+        except ValueError:
+            page_number = 1
+        items_page = LookaheadPage(items, page_number, DASHBOARD_PAGE_SIZE)
+        next_params = {**base_params, 'page': items_page.number + 1}
+        previous_params = {**base_params, 'page': items_page.number - 1}
+    else:
+        paginator = KeysetPaginator(items, DASHBOARD_PAGE_SIZE, ordering=sort or 'item_name')
+        try:
+            items_page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            items_page = paginator.page()
+        next_params = {**base_params, 'cursor': items_page.next_cursor}
+        previous_params = {**base_params, 'cursor': items_page.previous_cursor}
+
+    locations = refdata.locations()
+    projects = refdata.projects()
     context = {
         'items': items_page,
+        'summary_panel': summary.panel(locations, projects),
+        'next_page_query': urlencode(next_params) if items_page.has_next else '',
+        'previous_page_query': urlencode(previous_params) if items_page.has_previous else '',
+        # The dashboard's "Print Labels" button prints every item of the current search, not just this page.
+        'labels_query': urlencode({**base_params, 'format': 'pdf'}),
+        'total_estimate': estimated_count(items) if settings.INVENTORY_DASHBOARD_ESTIMATE_TOTAL else None,
         'filter_form': filter_form,
         'search_query': search_query,
         'current_time': timezone.now(),
         'user': request.user,
         'transfer_form': TransferForm(),
-        'locations': Location.objects.all(),
-        'projects': Project.objects.all(),
+        'locations': locations,
+        'projects': projects,
     }
     return render(request, 'inventory/dashboard.html', context)
 
@@ -206,6 +210,15 @@ def add_item(request):
         form = AddItemForm(request.POST, request.FILES)
         if form.is_valid():
             item = form.save(commit=False)
+            units = form.cleaned_data.get('units') or 1
+            if units > 1:
+                # One UID block reservation and two bulk inserts instead of one save() per unit.
+                created = InventoryItem.objects.bulk_create_with_uids(
+                    InventoryItem.objects.build_units(item, units), user=request.user
+                )
+                messages.success(request, f"{units} units of '{item.item_name}' added successfully! "
+                                          f"(UIDs {created[0].uid_no} to {created[-1].uid_no})")
+                return redirect('inventory:dashboard')
             item.added_by = request.user
             item.save()
             create_log_entry(request.user, item, 'added',
@@ -223,44 +236,67 @@ def add_item(request):
     return render(request, 'inventory/add_item.html', {'form': form})
 
 @login_required
-@transaction.atomic
+def import_items(request):
+    result = None
+    if request.method == 'POST':
+        form = ImportItemsForm(request.POST, request.FILES)
+        if form.is_valid():
+            uploaded = form.cleaned_data['file']
+            importer = InventoryImporter(
+                user=request.user,
+                create_missing=form.cleaned_data['create_missing'],
+                dry_run=form.cleaned_data['dry_run'],
+            )
+            try:
+                result = importer.run(uploaded, uploaded.name)
+            except ValueError as e:
+                messages.error(request, str(e))
+            except Exception as e:
+                messages.error(request, f"An unexpected error occurred during import: {e}")
+                logger.exception(f"Error importing inventory file {uploaded.name}")
+            else:
+                verb = "validated" if form.cleaned_data['dry_run'] else "imported"
+                summary = (f"{result.created} of {result.rows_read} row(s) {verb} in {result.elapsed:.2f}s "
+                           f"({result.rows_per_second:.0f} rows/s).")
+                if result.error_count:
+                    messages.warning(request, f"{summary} {result.error_count} row(s) had errors.")
+                else:
+                    messages.success(request, summary)
+                if not form.cleaned_data['dry_run'] and result.created:
+                    create_log_entry(request.user, None, 'imported',
+                                     f"Imported {result.created} item(s) from '{uploaded.name}'.",
+                                     uid_number_for_log='N/A')
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f"{field.replace('_', ' ').title()}: {error}")
+    else:
+        form = ImportItemsForm()
+    return render(request, 'inventory/import_items.html', {'form': form, 'result': result})
+
+@login_required
 def delete_item_general(request):
     if request.method == 'POST':
         form = DeleteItemForm(request.POST)
         if form.is_valid():
             uid = form.cleaned_data['uid_no']
-            quantity = form.cleaned_data['quantity']
-            reason = form.cleaned_data['reason_for_deletion']
+            entry = {'uid_no': uid, 'quantity': form.cleaned_data['quantity'],
+                     'reason': form.cleaned_data['reason_for_deletion']}
 
             try:
-                item = get_object_or_404(InventoryItem, uid_no=uid)
-                item_name = item.item_name
-                item_uid = item.uid_no
-                current_quantity = item.quantity
-
-                if quantity > current_quantity:
-                    messages.error(request, f"Cannot delete {quantity} of item {uid}. Only {current_quantity} available.")
+                # A guarded UPDATE rather than read-subtract-save, so concurrent deletions can't lose one.
+                disposed, failed = dispose_items([entry], user=request.user)
+                if failed:
+                    messages.error(request, failed[0]['reason'])
                     return render(request, 'inventory/delete_item_general.html', {'form': form})
 
-                log_details = ""
-                if quantity == current_quantity:
-                    log_details = (f"Item '{item_name}' (UID: {item_uid}) fully deleted. "
-                                   f"Original Quantity: {current_quantity}. Reason: {reason or 'No reason provided'}.")
-                    create_log_entry(request.user, None, 'deleted', log_details, uid_number_for_log=item_uid)
-                    item.delete()
-                    messages.success(request, f'Item with UID {uid} fully deleted. {log_details}')
+                log_details = disposed[0]['details']
+                if disposed[0]['remaining']:
+                    messages.success(request, f'Quantity of item with UID {uid} reduced. {log_details}')
                 else:
-                    item.quantity -= quantity
-                    item.save()
-                    log_details = (f"Reduced quantity of '{item_name}' (UID: {item_uid}) by {quantity}. "
-                                   f"New quantity: {item.quantity}. Reason: {reason or 'No reason provided'}.")
-                    create_log_entry(request.user, item, 'quantity_reduced', log_details, uid_number_for_log=item_uid)
-                    messages.success(f'Quantity of item with UID {uid} reduced. {log_details}')
-
+                    messages.success(request, f'Item with UID {uid} fully deleted. {log_details}')
                 return redirect('inventory:dashboard')
 
-            except InventoryItem.DoesNotExist:
-                messages.error(request, f'Item with UID "{uid}" not found.')
             except Exception as e:
                 messages.error(request, f"An unexpected error occurred: {e}")
                 logger.exception(f"Error during general item deletion for UID: {uid}")
@@ -276,6 +312,31 @@ def delete_item_general(request):
         form = DeleteItemForm()
     return render(request, 'inventory/delete_item_general.html', {'form': form})
 
+@login_required
+def delete_items_batch(request):
+    # "UID, quantity, reason" rows disposed together in a handful of queries (see disposals.py).
+    failed = []
+    if request.method == 'POST':
+        form = BatchDisposalForm(request.POST)
+        if form.is_valid():
+            try:
+                disposed, failed = dispose_items(form.entries(), user=request.user)
+            except Exception as e:
+                messages.error(request, f"An unexpected error occurred: {e}")
+                logger.exception("Error during batch item deletion.")
+                return render(request, 'inventory/delete_items_batch.html', {'form': form})
+
+            deleted = sum(1 for row in disposed if not row['remaining'])
+            if disposed:
+                messages.success(request, f"Deleted {len(disposed)} item(s): {deleted} fully, "
+                                          f"{len(disposed) - deleted} by reducing their quantity.")
+            if not failed:
+                return redirect('inventory:dashboard')
+            messages.warning(request, f"{len(failed)} row(s) were not deleted; see below.")
+    else:
+        form = BatchDisposalForm()
+    return render(request, 'inventory/delete_items_batch.html', {'form': form, 'failed': failed})
+
 @login_required
 @transaction.atomic
 def delete_item_by_pk(request, pk):
@@ -320,6 +381,27 @@ def modify_item(request):
     }
     return render(request, 'inventory/modify_item.html', context)
 
+def _edit_conflict(request, pk, form):
+    """Re-renders the edit form after a conflicting save: the submitted values over the current version."""
+    current = get_object_or_404(InventoryItem.objects.select_related('location', 'project'), pk=pk)
+    # The form was bound to the item as loaded for this request, so changed_data is measured against the newer version.
+    differing = [InventoryItem._meta.get_field(name).verbose_name for name in form.changed_data
+                 if name in form.Meta.fields and name not in request.FILES]
+    messages.error(request, (
+        f'Item "{current.item_name}" (UID: {current.uid_no}) was changed by someone else while you were editing it, '
+        f'so your changes were not saved.'
+        + (f" Your values differ from the current ones in: {', '.join(differing)}." if differing else '')
+        + ' Check the item and save again to keep your values.'
+    ))
+    data = request.POST.copy()
+    data['version'] = current.version
+    return render(request, 'inventory/edit_item.html',
+                  {'form': EditItemForm(data, instance=current), 'item': current}, status=409)
+
+# Saving an edit also writes the audit log, field changes, summary counter deltas and the
+# page cache generation bumps (one for the item, one for its log entry); the versioned save
+# runs in its own savepoint.
+@query_budget(34)
 @login_required
 def edit_item(request, pk):
     # Removed 'category' from select_related here, as it's not a ForeignKey
@@ -347,8 +429,11 @@ def edit_item(request, pk):
         form = EditItemForm(request.POST, request.FILES, instance=item)
         if form.is_valid():
             updated_item = form.save(commit=False)
+            # Save on top of the version the form was rendered from, not the one just loaded.
+            updated_item.version = form.cleaned_data['version'] or item.version
 
             changes = []
+            field_changes = []
             for field_name in form.changed_data:
                 try:
                     model_field = InventoryItem._meta.get_field(field_name)
@@ -363,8 +448,8 @@ def edit_item(request, pk):
                 display_current = current_value
 
                 if isinstance(model_field, models.ForeignKey):
-                    display_original = original_value.name if original_value else 'None'
-                    display_current = current_value.name if current_value else 'None'
+                    display_original = original_value.name if original_value else None
+                    display_current = current_value.name if current_value else None
                 elif isinstance(model_field, (models.FileField, models.ImageField)):
                     new_file_uploaded = field_name in request.FILES
                     file_cleared = form.cleaned_data.get(f'clear_{field_name}')
@@ -385,12 +470,21 @@ def edit_item(request, pk):
                 display_current_str = str(current_value) if current_value is not None and current_value != '' else 'Empty'
 
                 changes.append(f"{model_field.verbose_name}: '{display_original_str}' to '{display_current_str}'")
+                field_changes.append((
+                    field_name,
+                    str(display_original) if display_original not in (None, '') else None,
+                    str(display_current) if display_current not in (None, '') else None,
+                ))
 
-            updated_item.save()
+            try:
+                updated_item.save()
+            except VersionConflict:
+                return _edit_conflict(request, pk, form)
 
             if changes:
                 log_details = f"Updated item '{updated_item.item_name}' (UID: {updated_item.uid_no}). Changes: {'; '.join(changes)}"
-                create_log_entry(request.user, updated_item, 'updated', log_details, uid_number_for_log=updated_item.uid_no)
+                create_log_entry(request.user, updated_item, 'updated', log_details, uid_number_for_log=updated_item.uid_no,
+                                 changes=field_changes)
                 messages.success(request, f'Item "{updated_item.item_name}" (UID: {updated_item.uid_no}) updated successfully! Changes: {", ".join(changes)}')
             else:
                 messages.info(request, 'No changes detected for the item.')
@@ -410,38 +504,27 @@ def edit_item(request, pk):
     return render(request, 'inventory/edit_item.html', context)
 
 
-@login_required
+# Single-UID lookup page; scanners checking many tags use the batch api/status/ endpoint.
+@query_budget(8)
 @login_required
 def status_check(request):
-    print("--- status_check view entered ---") # Debug print
-    print(f"Request method: {request.method}") # Debug print
-
     item_status_data = None
-    form = StatusCheckForm() # Initialize an empty form for initial GET request
-
-    if request.method == 'GET':
-        print(f"Request GET data: {request.GET}") # CRITICAL DEBUG PRINT
+    form = StatusCheckForm()
 
+    # Only a submitted lookup is validated, so the empty page doesn't open with form errors.
+    if 'uid_no' in request.GET:
         form = StatusCheckForm(request.GET)
         if form.is_valid():
             uid_no = form.cleaned_data['uid_no']
-            print(f"Form is valid. UID No: {uid_no}") # Debug print
-
             try:
-                # CHANGE THIS LINE: Use InventoryItem instead of Item
-                item_status_data = InventoryItem.objects.get(uid_no=uid_no)
-                print(f"Item found: {item_status_data.item_name}") # Debug print
+                item_status_data = InventoryItem.objects.select_related('location', 'project').get(uid_no=uid_no)
                 messages.success(request, f"Status found for UID: {uid_no}")
-            except InventoryItem.DoesNotExist: # Also change this exception
-                item_status_data = None
-                print(f"Item with UID {uid_no} not found.") # Debug print
+            except InventoryItem.DoesNotExist:
                 messages.error(request, f"No item found with UID: {uid_no}")
             except Exception as e:
-                item_status_data = None
-                print(f"An error occurred while fetching item: {e}") # Debug print
                 messages.error(request, f"An error occurred: {e}")
+                logger.exception(f"Error during status check for UID: {uid_no}")
         else:
-            print(f"Form is NOT valid. Errors: {form.errors}") # Debug print
             # Django will automatically include form.errors in the context if you pass the form
             messages.error(request, "Please correct the errors below.")
 
@@ -449,72 +532,115 @@ def status_check(request):
         'form': form,
         'item_status_data': item_status_data,
     }
-    print("--- Exiting status_check view ---") # Debug print
     return render(request, 'inventory/status_check.html', context)
+
+def _item_stamp(request, pk):
+    return InventoryItem.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
+@query_budget(6)
 @login_required
+@pagecache.cached_page('item_details', stamp=_item_stamp)
 def item_details(request, pk):
     # Removed 'category' from select_related here, as it's not a ForeignKey
     item = get_object_or_404(InventoryItem.objects.select_related('location', 'project'), pk=pk)
-    log_entries = InventoryLog.objects.filter(item=item).order_by('-timestamp')
+    # The log timeline is fetched page by page from item_log_timeline, so this view's cost
+    # doesn't grow with the item's history.
     context = {
         'item': item,
-        'log_entries': log_entries
     }
     return render(request, 'inventory/item_details.html', context)
 
 
-# ---------------- Excel Export ----------------
+@staff_member_required
+def page_cache_stats(request):
+    """Hit/miss counters of the rendered-page cache (see pagecache.py) and this worker's UID status LRU."""
+    return JsonResponse({'enabled': pagecache.get_config()['ENABLED'], 'views': pagecache.stats(),
+                         'uid_status': uidstatus.stats()})
+
+
+# ---------------- Asset Labels ----------------
 
+@query_budget(4)
 @login_required
-def export_inventory_excel(request):
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-    filename = f"inventory_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    response['Content-Disposition'] = f'attachment; filename={filename}'
+def print_labels(request):
+    # Label sheets for a UID list (POSTed from the form, or ?uids=) or for the dashboard's current
+    # search/sort (?search=&sort=&format=pdf, linked from the dashboard). Sheets are rendered in a
+    # process pool and streamed as they finish (see labels.py).
+    data = request.POST if request.method == 'POST' else request.GET
+    if not any(key in data for key in ('uids', 'search', 'sort', 'format')):
+        return render(request, 'inventory/labels.html', {'form': LabelSheetForm()})
+    form = LabelSheetForm(data)
+    if not form.is_valid():
+        return render(request, 'inventory/labels.html', {'form': form})
+
+    uids = form.cleaned_data['uids']
+    limit = labels.get_config()['MAX_LABELS']
+    if len(uids) > limit:
+        messages.error(request, f"At most {limit} labels can be printed at once; narrow the selection.")
+        return render(request, 'inventory/labels.html', {'form': form})
+    items = InventoryItem.objects.exclude(uid_no=None)
+    if uids:
+        items = items.filter(uid_no__in=uids).order_by()
+    elif form.cleaned_data['search']:
+        items = search.search(items, form.cleaned_data['search'])
+        if form.cleaned_data['sort']:
+            items = items.order_by(form.cleaned_data['sort'], 'id')
+    else:
+        items = items.order_by(form.cleaned_data['sort'] or 'item_name', 'id')
+
+    rows = list(items.values_list('uid_no', 'item_name')[:limit + 1])
+    if uids:
+        # Print in the order the UIDs were given (e.g. the order units were scanned in).
+        names = dict(rows)
+        rows = [(uid, names[uid]) for uid in uids if uid in names]
+    if not rows:
+        messages.warning(request, "No items match; there are no labels to print.")
+        return render(request, 'inventory/labels.html', {'form': form})
+    if len(rows) > limit:
+        messages.error(request, f"At most {limit} labels can be printed at once; narrow the selection.")
+        return render(request, 'inventory/labels.html', {'form': form})
+    if uids and len(rows) < len(uids):
+        missing = [uid for uid in uids if uid not in names]
+        messages.warning(request, f"No item has UID {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}; "
+                                  f"printed {len(rows)} of {len(uids)} labels.")
+
+    content_type, extension, chunks = labels.stream(rows, form.cleaned_data['format'],
+                                                    form.cleaned_data['symbology'])
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = (f"attachment; filename=labels_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+                                       f".{extension}")
+    return response
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Inventory Data"
 
-    headers = [
-        "Item Name", "UID No", "Serial Number", "Quantity",
-        "Location", "Status", "Description", "Project", "Added By", "Date Added",
-        "Last Modified", "CPU", "GPU", "OS", "Installed Software"
-    ]
-    sheet.append(headers)
+# ---------------- Excel Export ----------------
 
-    header_font = Font(bold=True)
-    for cell in sheet[1]:
-        cell.font = header_font
+@query_budget(8)
+@login_required
+def export_inventory_excel(request):
+    # ?format=xlsx|csv|jsonl and ?columns=item_name,uid_no,... pick the output; rows are streamed
+    # from a values_list() iterator so memory stays flat regardless of inventory size.
+    export_format = request.GET.get('format', 'xlsx').lower()
+    if export_format not in EXPORT_FORMATS:
+        messages.error(request, f"Unsupported export format '{export_format}'.")
+        return redirect('inventory:dashboard')
+    try:
+        columns = parse_columns(request.GET.get('columns'))
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('inventory:dashboard')
 
-    # Removed 'category' from select_related here.
-    items = InventoryItem.objects.all().select_related('location', 'project', 'added_by').order_by('item_name')
-    for item in items:
-        row_data = [
-            item.item_name,
-            # item.category.name if item.category else 'N/A', # If category is CharField, this will be item.category
-            item.uid_no,
-            item.serial_number if item.serial_number else 'N/A',
-            item.quantity,
-            item.location.name if item.location else 'N/A',
-            item.status,
-            item.description if item.description else 'N/A',
-            item.project.name if item.project else 'N/A',
-            item.added_by.username if item.added_by else 'N/A',
-            item.date_added.strftime('%Y-%m-%d %H:%M:%S'),
-            item.last_modified.strftime('%Y-%m-%d %H:%M:%S'),
-            item.cpu if item.cpu else 'N/A',
-            item.gpu if item.gpu else 'N/A',
-            item.os if item.os else 'N/A',
-            item.installed_software if item.installed_software else 'N/A'
-        ]
-        sheet.append(row_data)
+    items = InventoryItem.objects.order_by('item_name', 'id')
+    rows = iter_export_rows(items, columns)
 
-    workbook.save(response)
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(STREAM_WRITERS[export_format](rows, columns), content_type=content_type)
+    filename = f"inventory_export_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename={filename}'
 
-    create_log_entry(request.user, None, 'exported', f"Inventory data exported to Excel by {request.user.username}.", uid_number_for_log='N/A')
-    messages.success(request, "Inventory data exported to Excel successfully!")
+    create_log_entry(request.user, None, 'exported',
+                     f"Inventory data exported to {export_format.upper()} by {request.user.username}.",
+                     uid_number_for_log='N/A')
+    messages.success(request, "Inventory data exported successfully!")
     return response
 
 @login_required
@@ -549,65 +675,28 @@ def transfer_inventory_items(request):
         if not items_to_transfer_data:
             return JsonResponse({'success': False, 'message': 'No items provided for transfer.'}, status=400)
 
-        transferred_count = 0
-        failed_items = []
-
-        with transaction.atomic():
-            for item_data in items_to_transfer_data:
-                item_id = item_data.get('id')
-                new_location_id = item_data.get('new_location')
-                project_id = item_data.get('project_id')
-
-                if not item_id or not new_location_id:
-                    failed_items.append({'id': item_id, 'reason': 'Missing item ID or new location ID'})
-                    continue
-
-                try:
-                    item = InventoryItem.objects.select_for_update().get(id=item_id)
-                    old_location = item.location.name if item.location else 'N/A'
-                    old_project = item.project.name if item.project else 'N/A'
-
-                    new_location = Location.objects.get(id=new_location_id)
-                    new_project = None
-                    if project_id:
-                        new_project = Project.objects.get(id=project_id)
-
-                    item.location = new_location
-                    item.status = 'Assigned'
-                    item.project = new_project
-
-                    item.save()
-                    transferred_count += 1
-
-                    log_details = (f"Item '{item.item_name}' (UID: {item.uid_no}) transferred "
-                                   f"from '{old_location}' to '{new_location.name}'. "
-                                   f"Project changed from '{old_project}' to '{new_project.name if new_project else 'N/A'}'. "
-                                   f"Status set to '{item.status}'.")
-                    create_log_entry(request.user, item, 'transferred', log_details, uid_number_for_log=item.uid_no)
-
-                except InventoryItem.DoesNotExist:
-                    failed_items.append({'id': item_id, 'reason': f"Item with ID {item_id} not found."})
-                except Location.DoesNotExist:
-                    failed_items.append({'id': item_id, 'reason': f"New location with ID {new_location_id} not found."})
-                except Project.DoesNotExist:
-                    failed_items.append({'id': item_id, 'reason': f"Project with ID {project_id} not found."})
-                except Exception as e:
-                    failed_items.append({'id': item_id, 'reason': f"Error: {str(e)}"})
-                    logger.exception(f"Error processing item {item_id} for transfer.")
+        # Set-based and lock-free: one read per table, one versioned UPDATE per target, one log insert.
+        transferred, failed_items = transfer_items(items_to_transfer_data, user=request.user)
+        transferred_count = len(transferred)
+        conflicts = sum(1 for failure in failed_items if failure.get('conflict'))
+        conflict_message = (f' {conflicts} item(s) were changed by someone else in the meantime; '
+                            f'reload the page to see their current state.') if conflicts else ''
 
         if transferred_count > 0:
             success_message = f'Successfully transferred {transferred_count} asset(s).'
             if failed_items:
-                success_message += f' However, {len(failed_items)} item(s) failed to transfer.'
+                success_message += f' However, {len(failed_items)} item(s) failed to transfer.' + conflict_message
                 messages.warning(request, success_message)
                 return JsonResponse({'success': True, 'message': success_message, 'failed_items': failed_items})
             else:
                 messages.success(request, success_message)
                 return JsonResponse({'success': True, 'message': success_message})
         else:
-            message = 'No assets were successfully transferred. Please check for errors.'
+            message = 'No assets were successfully transferred. Please check for errors.' + conflict_message
             messages.error(request, message)
-            return JsonResponse({'success': False, 'message': message, 'failed_items': failed_items}, status=400)
+            # 409 when only conflicts stood in the way: the same request can succeed after a reload.
+            status = 409 if conflicts == len(failed_items) else 400
+            return JsonResponse({'success': False, 'message': message, 'failed_items': failed_items}, status=status)
 
     except json.JSONDecodeError:
         messages.error(request, 'Invalid JSON request.')
@@ -619,12 +708,92 @@ def transfer_inventory_items(request):
 
 
 # ---------------- Logs View ----------------
+LOG_PAGE_SIZE = 50
+ARCHIVED_LOG_LIMIT = 500
+ITEM_TIMELINE_PAGE_SIZE = 20
+
+def _log_listing(queryset):
+    # Only what the log table renders; the item join is just for its name.
+    return queryset.select_related('user', 'item').only(
+        'id', 'timestamp', 'action', 'details', 'uid_no', 'user__username', 'item__item_name'
+    )
+
+@query_budget(6)
 @login_required
 def inventory_logs(request):
     # CORRECTED: Removed 'item__category' from select_related
-    logs = InventoryLog.objects.all().select_related('user', 'item__location', 'item__project').order_by('-timestamp')
+    logs = _log_listing(InventoryLog.objects.all())
+    filter_form = LogFilterForm(request.GET)
+
+    filter_params = {}
+    data = None
+    since = until = None
+    if filter_form.is_valid():
+        data = filter_form.cleaned_data
+        if data['action']:
+            logs = logs.filter(action=data['action'])
+        if data['user']:
+            logs = logs.filter(user__username=data['user'])
+        if data['uid_no']:
+            logs = logs.filter(uid_no=data['uid_no'])
+        if data['item']:
+            logs = logs.filter(item_id=data['item'])
+        # Compare against datetimes rather than timestamp__date so the timestamp indexes stay usable.
+        if data['date_from']:
+            since = timezone.make_aware(datetime.combine(data['date_from'], time.min))
+            logs = logs.filter(timestamp__gte=since)
+        if data['date_to']:
+            until = timezone.make_aware(datetime.combine(data['date_to'] + timedelta(days=1), time.min))
+            logs = logs.filter(timestamp__lt=until)
+        filter_params = {key: request.GET[key] for key in data if data[key] not in (None, '', False)}
+
+    paginator = KeysetPaginator(logs, LOG_PAGE_SIZE, ordering='-timestamp')
+    try:
+        logs_page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        logs_page = paginator.page()
+
+    # Archived entries are older than the table's, so they follow its last page.
+    archived_logs = None
+    if data and data['include_archived'] and not logs_page.has_next:
+        if data['uid_no'] or since or until:
+            archived_logs = archive.read(
+                uid_no=data['uid_no'] or None, since=since, until=until, action=data['action'] or None,
+                user=data['user'] or None, item=data['item'], limit=ARCHIVED_LOG_LIMIT,
+            )
+        else:
+            messages.info(request, "Archived logs are searched by UID or date range; enter one to include them.")
 
     context = {
-        'logs': logs
+        'logs': logs_page,
+        'archived_logs': archived_logs,
+        'archived_log_limit': ARCHIVED_LOG_LIMIT,
+        'filter_form': filter_form,
+        'next_page_query': urlencode({**filter_params, 'cursor': logs_page.next_cursor}) if logs_page.has_next else '',
+        'previous_page_query': urlencode({**filter_params, 'cursor': logs_page.previous_cursor}) if logs_page.has_previous else '',
     }
-    return render(request, 'inventory/logs.html', context)
\ No newline at end of file
+    return render(request, 'inventory/logs.html', context)
+
+@query_budget(6)
+@login_required
+def item_log_timeline(request, pk):
+    """JSON page of one item's log entries, fetched lazily by the item details page."""
+    logs = InventoryLog.objects.filter(item_id=pk).select_related('user').only(
+        'id', 'timestamp', 'action', 'details', 'user__username'
+    )
+    paginator = KeysetPaginator(logs, ITEM_TIMELINE_PAGE_SIZE, ordering='-timestamp')
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'message': 'Invalid cursor.'}, status=400)
+
+    entries = [
+        {
+            'timestamp': log.timestamp.isoformat(),
+            'user': log.user.username if log.user else 'System',
+            'action': log.action,
+            'details': log.details or '',
+        }
+        for log in page
+    ]
+    return JsonResponse({'success': True, 'entries': entries, 'next_cursor': page.next_cursor})
@@ -3,6 +3,15 @@ ASGI config for inventory_control project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The WSGI application (see the Procfile) serves the site. This one only serves the async JSON
+endpoints under api/async/ (see inventory/asyncapi.py), for a separate pool of uvicorn workers
+that the front proxy routes that prefix to:
+
+    gunicorn inventory_management.asgi:application -k uvicorn.workers.UvicornWorker
+
+Everything else answers 404 here: Django 4.2 reads the sync iterators of streamed responses
+(exports, label sheets, media) into memory before sending them under ASGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
@@ -13,4 +22,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_management.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+ASYNC_PREFIX = '/api/async/'
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and not scope['path'].startswith(ASYNC_PREFIX):
+        await send({'type': 'http.response.start', 'status': 404,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+        await send({'type': 'http.response.body', 'body': b'Not served by the ASGI application.'})
+        return
+    await django_application(scope, receive, send)
@@ -52,10 +52,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Query count/time headers and N+1 warnings; a no-op unless INVENTORY_QUERY_BUDGET is enabled
+    'inventory.querybudget.QueryBudgetMiddleware',
     # Corrected: SessionMiddleware should generally come before WhiteNoise
     # and certainly before AuthenticationMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware', # MOVED UP AND ADDED COMMA
-    'whitenoise.middleware.WhiteNoiseMiddleware', # ADDED COMMA HERE
+    # WhiteNoise, but async-capable so async views stay on the event loop under ASGI
+    'inventory.middleware.AsyncWhiteNoiseMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -95,6 +98,17 @@ DATABASES = {
     }
 }
 
+# PRAGMAs applied to every SQLite connection (see inventory/sqlite.py); None keeps SQLite's defaults.
+# Run `manage.py sqlite_maintenance` periodically (e.g. hourly from cron) alongside it.
+INVENTORY_SQLITE = {
+    'JOURNAL_MODE': 'WAL',
+    'SYNCHRONOUS': 'NORMAL',
+    'BUSY_TIMEOUT': 5000,
+    'MMAP_SIZE': 256 * 1024 * 1024,
+    'CACHE_SIZE': -64 * 1024,
+    'TEMP_STORE': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -116,6 +130,66 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LOGIN_URL = '/login/'
 
+# Audit log writes (see inventory/logsink.py). 'on_commit' queues each record once its
+# transaction commits and a background thread bulk-inserts them; 'sync' writes inline.
+INVENTORY_LOG_SINK = {
+    'MODE': 'on_commit',
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'RETRIES': 5,
+}
+
+# Log entries older than RETENTION_DAYS are moved to monthly gzip JSONL files in DIRECTORY by
+# `manage.py archive_inventory_logs` (see inventory/archive.py); the logs page can still search them.
+INVENTORY_LOG_ARCHIVE = {
+    'DIRECTORY': os.path.join(BASE_DIR, 'log_archive'),
+    'RETENTION_DAYS': 365,
+    'BATCH_SIZE': 500,
+}
+
+# Per-request query accounting (see inventory/querybudget.py). Off unless the environment sets
+# INVENTORY_QUERY_BUDGET=1 (development): it measures every request and, under ASGI, moves each
+# one onto a thread. The view tests turn on RAISE, so a view exceeding its @query_budget fails them.
+INVENTORY_QUERY_BUDGET = {
+    'ENABLED': os.environ.get('INVENTORY_QUERY_BUDGET') == '1',
+    'N_PLUS_ONE': 5,
+    'RAISE': False,
+}
+
+# How often (seconds) each worker checks whether its cached locations/projects are stale
+# (see inventory/refdata.py); 0 checks on every use.
+INVENTORY_REFDATA_CHECK_INTERVAL = 2.0
+
+# Rendered dashboard/item pages, keyed by user, query string and the inventory generation that
+# every write bumps (see inventory/pagecache.py).
+INVENTORY_PAGE_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+}
+
+# Item image thumbnails (see inventory/thumbnails.py), generated off the request path.
+INVENTORY_THUMBNAILS = {
+    'MODE': 'background',
+    'SIZES': {'small': 96, 'medium': 320},
+}
+
+# Asset-tag sheets (see inventory/labels.py): label grid of the label stock, raster resolution and
+# how many processes render sheets in parallel. QR labels need the optional qrcode package.
+INVENTORY_LABELS = {
+    'PAGE_MM': (210, 297),
+    'MARGIN_MM': 8,
+    'COLUMNS': 3,
+    'ROWS': 8,
+    'DPI': 200,
+    'WORKERS': os.cpu_count() or 1,
+    'MAX_LABELS': 5000,
+}
+
+# Show an estimated item total on the dashboard (planner statistics or a capped count)
+# instead of running an exact COUNT(*) for every page view.
+INVENTORY_DASHBOARD_ESTIMATE_TOTAL = True
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -133,6 +207,17 @@ USE_TZ = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are stored once per SHA-256 of their content (see inventory/storage.py).
+DEFAULT_FILE_STORAGE = 'inventory.storage.ContentAddressedStorage'
+
+# Media serving (see inventory/media.py). Set 'SENDFILE' to 'x-accel-redirect' behind nginx, with
+# an internal location at ACCEL_PREFIX aliased to MEDIA_ROOT, or to 'x-sendfile' behind Apache.
+INVENTORY_MEDIA = {
+    'SENDFILE': None,
+    'ACCEL_PREFIX': '/protected-media/',
+    'MAX_AGE': 3600,
+}
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
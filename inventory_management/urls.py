@@ -14,11 +14,12 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.http import HttpResponse
 
+from inventory.media import serve_media
+
 
 def home(request):
     return HttpResponse("Inventory Management System is up!")
@@ -27,5 +28,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('inventory.urls', namespace='inventory')), # Ensure this line is correct
 ]
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+# Uploaded media, with Range/conditional support and an optional X-Sendfile/X-Accel-Redirect
+# hand-off to the front server (see inventory/media.py); no longer limited to DEBUG, and only
+# for signed-in users.
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+]
\ No newline at end of file